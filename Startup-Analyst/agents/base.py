@@ -1,25 +1,40 @@
 # agents/base.py
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
-import time, json, pathlib
+from typing import Any, Deque, Dict
+import time
 
-LOG_DIR = pathlib.Path("outputs/logs")
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+from config import LOG_AGENT_BUFFER
+from tools.logsink import get_sink
+from tools.tracing import span, current_span
 
 @dataclass
 class BaseAgent:
     name: str
-    logs: List[dict] = field(default_factory=list)
+    # bounded: long-lived agents (worker/batch mode) must not grow without limit
+    logs: Deque[dict] = field(default_factory=lambda: deque(maxlen=LOG_AGENT_BUFFER))
 
     def log(self, event: str, payload: Dict[str, Any]):
-        self.logs.append({
+        rec = {
             "ts": time.time(),
             "agent": self.name,
             "event": event,
             **(payload or {})
-        })
+        }
+        sp = current_span()
+        if sp is not None:
+            rec["trace_id"], rec["span_id"] = sp.trace_id, sp.span_id
+            sp.add_event(event, **{k: v for k, v in (payload or {}).items() if isinstance(v, (str, int, float, bool))})
+        self.logs.append(rec)
+
+    def span(self, op: str, **attrs):
+        """Timing span for one agent step, nested under the current run span."""
+        return span(f"{self.name}.{op}", kind="agent", agent=self.name, **attrs)
 
     def flush(self, run_id: str):
-        fp = LOG_DIR / f"{run_id}_{self.name}.json"
-        fp.write_text(json.dumps(self.logs, indent=2), encoding="utf-8")
+        """Hand this run's records to the process-wide JSONL sink and clear the local buffer."""
+        if not self.logs:
+            return
+        get_sink().write_many([{"run_id": run_id, **r} for r in self.logs])
+        self.logs.clear()
@@ -1,22 +1,47 @@
+import json
+
 from agents.base import BaseAgent
+from config import SCORING_LLM_BULLETS
 from tools.llm_router import call_llm_json
 from tools.jsonio import parse_json_or_repair
+from tools.scoring import DEFAULT_WEIGHTS, extract_features, score_features, template_bullets
 
-SCORING_SCHEMA = '{"breakdown":{"founders":0,"traction":0,"unit_econ":0,"market":0},"total":0.0,"bullets":["..."]}'
+BULLETS_SCHEMA = '{"bullets":["..."]}'
 
 class DealScoringAgent(BaseAgent):
-    def __init__(self, weights=None):
+    def __init__(self, weights=None, llm_bullets: bool = SCORING_LLM_BULLETS):
         super().__init__(name="deal_scoring")
-        self.weights = weights or {"founders":0.30,"traction":0.25,"unit_econ":0.25,"market":0.20}
+        self.weights = weights or dict(DEFAULT_WEIGHTS)
+        self.llm_bullets = llm_bullets
 
-    def score(self, facts: dict, verification: dict):
-        context = f"FACTS:\n{facts}\n\nVERIFICATION:\n{verification}\n\nWEIGHTS:\n{self.weights}"
-        task_hint = (
-            "Score the deal using the provided weights. Be conservative when evidence is unknown or mixed. "
-            "Round sub-scores (founders, traction, unit_econ, market) to integers in [0..100]. "
-            "Compute total as a weighted average, rounded to one decimal. Include 3–6 short bullets."
-        )
-        raw = call_llm_json(task_hint=task_hint, schema=SCORING_SCHEMA, context=context)
-        out = parse_json_or_repair(raw)
-        self.log("score_llm", {"total": out.get("total") if isinstance(out, dict) else None})
+    def score(self, facts: dict, verification: dict, risks=None, finance=None):
+        """
+        Sub-scores and the weighted total are computed locally (tools/scoring.py);
+        the LLM, when enabled, only writes the rationale bullets from those numbers.
+        """
+        feats = extract_features(facts, verification, risks, finance)
+        out = score_features(feats, self.weights)
+        out["features"] = feats
+        bullets = None
+        if self.llm_bullets:
+            context = json.dumps({
+                "score": {k: out[k] for k in ("breakdown", "total", "risk_penalty", "weights")},
+                "features": feats,
+                "claims": [{"claim": c.get("claim"), "status": c.get("status")}
+                           for c in (verification or {}).get("checks", [])[:10] if isinstance(c, dict)],
+                "risks": [{"severity": r.get("severity"), "message": r.get("message")}
+                          for r in (risks or [])[:8] if isinstance(r, dict)],
+            }, ensure_ascii=False, default=str)
+            task_hint = (
+                "Explain this already-computed deal score in 3–6 short bullets: what drives each sub-score, "
+                "what evidence is missing or refuted, and what would move the total. Do not recompute numbers."
+            )
+            try:
+                raw = call_llm_json(task_hint=task_hint, schema=BULLETS_SCHEMA, context=context)
+                parsed = parse_json_or_repair(raw)
+                bullets = [str(b) for b in (parsed.get("bullets") or []) if b] if isinstance(parsed, dict) else None
+            except Exception as e:
+                self.log("score_bullets_error", {"error": str(e)})
+        out["bullets"] = bullets or template_bullets(out, feats)
+        self.log("score_local", {"total": out["total"], "llm_bullets": bool(bullets)})
         return out
@@ -3,6 +3,9 @@ from agents.base import BaseAgent
 from tools.llm_router import call_llm_json
 from tools.jsonio import parse_json_or_repair
 from tools.search_multi import multi_search
+from tools.neardup import collapse
+from tools.urls import canonical_url, registrable_domain
+from tools.claim_store import get_store as get_claim_store, normalize as normalize_claim
 
 VERIFY_SCHEMA = '{"checks":[{"claim":"","status":"supported|mixed|refuted|unknown","rationale":"","evidence":[{"url":null,"quote":null}]}]}'
 
@@ -37,37 +40,78 @@ class DeepResearchAgent(BaseAgent):
                 seen.add(s); dedup.append(s)
         return dedup
 
-    def verify(self, claims, local_evidence: list[dict[str,str]] | None = None):
+    def verify(self, claims, local_evidence: list[dict[str,str]] | None = None, company: str | None = None):
         # 1) normalize claims
         claims = self._normalize_claims(claims)
         if not claims:
             self.log("verified", {"n_claims": 0, "evidence_used": 0})
             return {"checks": []}
+        claims = claims[:10]
 
+        # 1b) reuse fresh verdicts for claims seen before (this company, or market claims from any deal)
+        try:
+            store = get_claim_store()
+            cached = store.lookup(claims, company=company)
+        except Exception as e:
+            store, cached = None, {}
+            self.log("claim_store_error", {"error": str(e)})
+        novel = [c for i, c in enumerate(claims) if i not in cached]
+        res = self._verify_novel(novel, local_evidence) if novel else {"checks": []}
+        fresh = self._align(novel, res.get("checks") if isinstance(res, dict) else None)
+        if store is not None and fresh:
+            try:
+                store.put(fresh, company=company)
+            except Exception as e:
+                self.log("claim_store_error", {"error": str(e)})
+
+        if len(fresh) == len(novel):
+            by_claim = dict(zip(novel, fresh))
+            checks = [cached[i] if i in cached else by_claim[c] for i, c in enumerate(claims)]
+        else:
+            checks = [cached[i] for i in sorted(cached)] + fresh
+        out = {**(res if isinstance(res, dict) else {}), "checks": checks}
+        self.log("verified", {"n_claims": len(claims), "cached": len(cached), "novel": len(novel)})
+        return out
+
+    def _align(self, novel: list[str], checks) -> list[dict]:
+        """LLM checks matched back to the claims that were asked, in their order."""
+        checks = [c for c in (checks or []) if isinstance(c, dict)]
+        by_norm = {normalize_claim(str(c.get("claim") or ""))[0]: c for c in checks}
+        keys = [normalize_claim(c)[0] for c in novel]
+        if all(k in by_norm for k in keys):
+            return [{**by_norm[k], "claim": c} for k, c in zip(keys, novel)]
+        if len(checks) == len(novel):
+            return [{**ch, "claim": c} for c, ch in zip(novel, checks)]     # reworded, same order
+        return checks
+
+    def _verify_novel(self, claims: list[str], local_evidence: list[dict[str, str]] | None):
         # 2) fetch web evidence
         web_ev: list[dict[str, str]] = []
-        for c in claims[:10]:
+        for c in claims:
             queries = {c, f"{c} founder", f"{c} revenue", f"{c} market size", f"{c} site:news"}
             for q in queries:
                 web_ev += multi_search(q, k_total=8)
 
-        # 3) merge evidence (web + local)
-        merged: list[dict[str, str]] = []
+        # 3) merge evidence (web + local): exact repeats dropped, then syndicated copies of the
+        #    same story collapsed into one item that counts its sources
+        candidates: list[dict[str, str]] = []
         seen = set()
         for src in (web_ev + (local_evidence or [])):
             url = (src.get("url") or src.get("source") or "local").strip()
             snippet = (src.get("snippet") or src.get("quote") or "").strip()
-            key = (url, snippet[:100])
+            key = (canonical_url(url), snippet[:100])
             if key in seen:
                 continue
             seen.add(key)
-            merged.append({"url": url, "quote": snippet[:260]})
-            if len(merged) >= 25:
-                break
+            candidates.append({"url": url, "quote": snippet})
+        merged = [{**e, "quote": e["quote"][:260]}
+                  for e in collapse(candidates, text=lambda e: e["quote"], domain=lambda e: registrable_domain(e["url"]))[:25]]
 
-        claims_block = "\n".join(f"- {c}" for c in claims[:10])
+        claims_block = "\n".join(f"- {c}" for c in claims)
         context = f"CLAIMS TO VERIFY:\n{claims_block}\n\nEVIDENCE:\n" + "\n\n".join(
-            f"{e['url']}\n{e['quote']}" for e in merged
+            f"{e['url']}" + (f" (same story from {e['corroborating_domains']} sources)"
+                             if e["corroborating_domains"] > 1 else "") + f"\n{e['quote']}"
+            for e in merged
         )
 
         task_hint = (
@@ -76,5 +120,6 @@ class DeepResearchAgent(BaseAgent):
         )
         raw = call_llm_json(task_hint=task_hint, schema=VERIFY_SCHEMA, context=context)
         res = parse_json_or_repair(raw)
-        self.log("verified", {"n_claims": len(claims), "evidence_used": len(merged)})
+        self.log("verify_llm", {"n_claims": len(claims), "evidence_used": len(merged),
+                                "evidence_candidates": len(candidates)})
         return res
@@ -1,6 +1,12 @@
+import json
+import math
+
 from agents.base import BaseAgent
 from tools.llm_router import call_llm_json
 from tools.jsonio import parse_json_or_repair
+from tools.extractors import select_financial, financial_signals
+from tools import finmath
+from config import RUNWAY_CASES
 
 FIN_SCHEMA = """{
   "metrics":{"net_burn_mo":0,"runway_months":0,"zero_cash_date":"YYYY-MM-DD","cac_payback_months":null},
@@ -13,12 +19,51 @@ class FinancialDeepDiveAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="financial_deepdive")
 
-    def analyze(self, tables_or_text: str):
+    def analyze(self, tables_or_text: str, tables=None):
+        """
+        `tables` are tools.extractors.Table objects from the deck. When present, the LLM
+        sees the financial ones as compact JSON next to the extracted facts, and the
+        burn/runway computed from the tables (with tools.finmath sensitivities per
+        RUNWAY_CASES) replaces the LLM's own arithmetic.
+        """
+        picked = select_financial(tables or [])
+        local = financial_signals(picked) if picked else {}
+        context = tables_or_text
+        if picked:
+            context = json.dumps({
+                "tables": [t.to_compact() for t in picked],
+                "computed_from_tables": local,
+                "facts": tables_or_text,
+            }, ensure_ascii=False, default=str)
+
         task_hint = (
             "From the provided financial tables/text, estimate monthly net burn, runway (months), and CAC payback if possible. "
             "State key assumptions, produce base and conservative runway sensitivities, and list notable flags."
         )
-        raw = call_llm_json(task_hint=task_hint, schema=FIN_SCHEMA, context=tables_or_text)
+        if picked:
+            task_hint += " Prefer the figures in 'tables' and 'computed_from_tables' over narrative facts; keep their units."
+        raw = call_llm_json(task_hint=task_hint, schema=FIN_SCHEMA, context=context)
         out = parse_json_or_repair(raw)
-        self.log("finance_llm", {"keys": list(out.keys()) if isinstance(out, dict) else []})
+
+        if local:
+            out = out if isinstance(out, dict) else {}
+            metrics = out.setdefault("metrics", {})
+            if not isinstance(metrics, dict):
+                metrics = out["metrics"] = {}
+            if "net_burn_mo" in local:
+                metrics["net_burn_mo"] = local["net_burn_mo"]["value"]
+                metrics["net_burn_unit"] = local["net_burn_mo"]["unit"]
+            if "runway_months" in local:
+                cash = local["signals"]["cash"]["value"]
+                burn = local["net_burn_mo"]["value"]
+                cases = finmath.runway_months(cash, burn, [g for _, g in RUNWAY_CASES])
+                metrics["runway_months"] = local["runway_months"]
+                metrics["zero_cash_date"] = finmath.zero_cash_date(local["runway_months"])
+                out["sensitivities"] = [{"case": name, "burn_growth_mo": g, "runway_months": round(float(n), 1) if math.isfinite(n) else None,
+                                         "zero_cash_date": finmath.zero_cash_date(n)}
+                                        for (name, g), n in zip(RUNWAY_CASES, cases)]
+            out["computed"] = local
+            out["tables_used"] = [{"source": t.source, "page": t.page, "title": t.title} for t in picked]
+        self.log("finance_llm", {"keys": list(out.keys()) if isinstance(out, dict) else [], "n_tables": len(picked),
+                                 "computed": sorted(local.get("signals", {}))})
         return out
@@ -21,12 +21,14 @@ class IngestionAgent(BaseAgent):
 
     def run(self, inputs: List[str]):
         docs = load_many(inputs)
+        # parsed tables ride along in metadata; keep them out of the vector store
+        tables = [d.metadata.pop("table") for d in docs if "table" in d.metadata]
         vs = build_index(docs)
-        self.log("ingested", {"n_docs": len(docs)})
-        return {"vs": vs, "docs": docs}
+        self.log("ingested", {"n_docs": len(docs), "n_tables": len(tables)})
+        return {"vs": vs, "docs": docs, "tables": tables}
 
     def llm_extract_facts(self, vs, company: str) -> Dict[str, Any]:
-        ctx = vs.similarity_search(f"{company} founders traction unit economics market product legal", k=15)
+        ctx = vs.similarity_search(f"{company} founders traction unit economics market product legal", k=10)
         context = "\n\n".join([d.page_content[:1000] for d in ctx]) or f"COMPANY={company}"
         task_hint = (
             "Extract structured facts about founders, traction, unit_economics, market, product, and legal. "
@@ -60,7 +62,7 @@ class IngestionAgent(BaseAgent):
         return dedup
 
     def llm_mine_claims(self, vs, company: str) -> List[str]:
-        ctx = vs.similarity_search(f"{company} TAM SAM SOM CAC LTV churn GM revenue runway founders", k=12)
+        ctx = vs.similarity_search(f"{company} TAM SAM SOM CAC LTV churn GM revenue runway founders", k=8)
         context = "\n\n".join([d.page_content[:1000] for d in ctx]) or f"COMPANY={company}"
         task_hint = (
             "Extract 10 concise, checkable claims covering TAM/SAM/SOM, growth, CAC, LTV, churn, gross margin, "
@@ -1,21 +1,26 @@
-import json, os
 from agents.base import BaseAgent
-
-STATE_PATH = "outputs/learning_state.json"
+from tools.feedback import get_feedback_store
 
 class LearningLoopAgent(BaseAgent):
+    """Analyst thumbs up/down -> scoring weights (see tools/feedback.py)."""
     def __init__(self):
         super().__init__(name="learning_loop")
-        self.state = self._load()
+        self.store = get_feedback_store()   # shared per process; the log is not re-read per deal
+
+    @property
+    def state(self):
+        return self.store.snapshot()
 
-    def _load(self):
-        if os.path.exists(STATE_PATH):
-            return json.load(open(STATE_PATH,"r",encoding="utf-8"))
-        return {"weights":{"founders":0.30,"traction":0.25,"unit_econ":0.25,"market":0.20}}
+    def weights(self):
+        """Current learned weights, including feedback recorded by other processes."""
+        self.store.refresh()
+        return self.store.weights()
 
-    def feedback(self, thumbs_up: bool, reason: str = ""):
-        self.state.setdefault("feedback", []).append({"ok":thumbs_up, "reason":reason})
-        os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
-        json.dump(self.state, open(STATE_PATH,"w",encoding="utf-8"), indent=2)
-        self.log("feedback", {"ok": thumbs_up})
-        return self.state
+    def feedback(self, thumbs_up: bool, reason: str = "", run_id: str = None, breakdown: dict = None):
+        """
+        Record one verdict on a deal note. Pass the note's score breakdown (sub-scores
+        0..100) so the weights can move; without it only the counts change.
+        """
+        state = self.store.record(thumbs_up, reason, run_id=run_id, breakdown=breakdown)
+        self.log("feedback", {"ok": thumbs_up, "run_id": run_id or ""})
+        return state
@@ -1,32 +1,65 @@
+import json
+
 from agents.base import BaseAgent
 from tools.llm_router import call_llm_json
 from tools.jsonio import parse_json_or_repair
 from tools.search_multi import multi_search
+from tools.sector_store import get_store
 
-LEGAL_SCHEMA = """{
+REQUIREMENTS_SCHEMA = """{
   "requirements":["..."],
+  "citations":[{"url":"","quote":""}]
+}"""
+
+MATCH_SCHEMA = """{
   "matched":["..."],
   "missing":["..."],
   "citations":[{"url":"","quote":""}]
 }"""
 
+def _results_context(results, limit: int = 20) -> str:
+    return "\n\n".join(f"{r.get('title','')}\n{r.get('url','')}\n{r.get('snippet','')}" for r in results[:limit])
+
 class LegalComplianceAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="legal_compliance")
 
-    def check(self, sector: str, geo: str, company: str):
+    def build_requirements(self, sector: str, geo: str):
+        """Sector-wide licences and compliance requirements; stored by tools.sector_store."""
         results = []
-        for q in [f"{sector} regulatory requirements {geo}", f"{sector} license required {geo}", f"{company} compliance {geo}"]:
+        for q in [f"{sector} regulatory requirements {geo}", f"{sector} license required {geo}"]:
             results += multi_search(q, k_total=5)
-        context = "\n\n".join(
-            f"{r.get('title','')}\n{r.get('url','')}\n{r.get('snippet','')}" for r in results[:20]
-        ) or f"SECTOR={sector}\nGEO={geo}\nCOMPANY={company}"
+        context = _results_context(results) or f"SECTOR={sector}\nGEO={geo}"
+        task_hint = f"List regulatory licenses and compliance requirements for {sector} in {geo}, with citations."
+        raw = call_llm_json(task_hint=task_hint, schema=REQUIREMENTS_SCHEMA, context=context)
+        out = parse_json_or_repair(raw)
+        self.log("legal_requirements_llm", {"sector": sector, "geo": geo})
+        if not isinstance(out, dict) or not out.get("requirements"):
+            raise ValueError(f"no requirements for {sector}/{geo}")   # don't store an empty entry
+        return out
 
+    def check(self, sector: str, geo: str, company: str):
+        # sector requirements are shared across deals; only matched/missing is per company
+        kb = get_store().get_or_build("legal_requirements", sector, geo, self.build_requirements)
+        requirements = kb.body.get("requirements") or []
+        results = multi_search(f"{company} compliance {geo}", k_total=5)
+        context = (
+            f"REQUIREMENTS={json.dumps(requirements, ensure_ascii=False)}\n\n"
+            + (_results_context(results) or f"COMPANY={company}")
+        )
         task_hint = (
-            f"List regulatory licenses and compliance requirements for {sector} in {geo}. "
-            "Mark which appear matched vs missing for the company and include citations."
+            f"For {company} ({sector}, {geo}), mark which of REQUIREMENTS appear matched vs missing "
+            "based on the sources, and include citations."
         )
-        raw = call_llm_json(task_hint=task_hint, schema=LEGAL_SCHEMA, context=context)
-        out = parse_json_or_repair(raw)
-        self.log("legal_llm", {"reqs": out.get("requirements") if isinstance(out, dict) else None})
+        raw = call_llm_json(task_hint=task_hint, schema=MATCH_SCHEMA, context=context)
+        delta = parse_json_or_repair(raw)
+        delta = delta if isinstance(delta, dict) else {}
+        out = {
+            "requirements": requirements,
+            "matched": delta.get("matched", []),
+            "missing": delta.get("missing", []),
+            "citations": (kb.body.get("citations") or []) + (delta.get("citations") or []),
+            "kb": kb.meta(),
+        }
+        self.log("legal_llm", {"reqs": requirements, "kb_version": kb.version})
         return out
@@ -1,10 +1,19 @@
+import json
+
 from agents.base import BaseAgent
 from tools.llm_router import call_llm_json
 from tools.jsonio import parse_json_or_repair
 from tools.search_multi import multi_search
+from tools.sector_store import get_store
 
-MARKET_SCHEMA = """{
+SECTOR_MARKET_SCHEMA = """{
   "tam":{"value":0,"currency":"USD","year":2025,"method":"","sources":[{"url":"","quote":""}]},
+  "cagr_pct":0.0,
+  "segments":[{"name":"","share_pct":0.0}],
+  "notes":["..."]
+}"""
+
+COMPANY_MARKET_SCHEMA = """{
   "sam":{"value":0,"currency":"USD","assumptions":["..."]},
   "som":{"value":0,"currency":"USD","assumptions":["..."]},
   "delta_vs_deck":{"tam_pct":0.0,"notes":""}
@@ -14,22 +23,46 @@ class MarketValidationAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="market_validation")
 
-    def size(self, company: str, sector: str):
+    def build_sector_market(self, sector: str, geo: str = "India"):
+        """Sector-level TAM, growth and segments for (sector, geo); stored by tools.sector_store."""
         results = []
         for q in [f"{sector} market size 2025 site:statista.com",
-                  f"{sector} industry India report",
+                  f"{sector} industry {geo} report",
                   f"{sector} TAM SAM SOM"]:
             results += multi_search(q, k_total=6)
 
         context = "\n\n".join(
             f"{r.get('title','')}\n{r.get('url','')}\n{r.get('snippet','')}" for r in results[:25]
-        ) or f"COMPANY={company}\nSECTOR={sector}"
+        ) or f"SECTOR={sector}\nGEO={geo}"
 
         task_hint = (
-            f"Estimate TAM/SAM/SOM for {company} in {sector}. Provide method and assumptions; include citations in TAM. "
-            "Compare against deck claims (if any) and report delta as tam_pct."
+            f"Estimate the {sector} market in {geo}: TAM with method and citations, CAGR, and main segments."
         )
-        raw = call_llm_json(task_hint=task_hint, schema=MARKET_SCHEMA, context=context)
+        raw = call_llm_json(task_hint=task_hint, schema=SECTOR_MARKET_SCHEMA, context=context)
         out = parse_json_or_repair(raw)
-        self.log("market_llm", {"tam": out.get("tam") if isinstance(out, dict) else None})
+        self.log("sector_market_llm", {"sector": sector, "geo": geo})
+        if not isinstance(out, dict) or not isinstance(out.get("tam"), dict):
+            raise ValueError(f"no market sizing for {sector}/{geo}")   # don't store an empty entry
+        return out
+
+    def size(self, company: str, sector: str, geo: str = "India"):
+        # the sector half (TAM, CAGR, segments) is shared across deals; SAM/SOM is per company
+        kb = get_store().get_or_build("market_sizing", sector, geo, self.build_sector_market)
+        context = f"COMPANY={company}\nSECTOR={sector}\nGEO={geo}\nSECTOR_MARKET={json.dumps(kb.body, ensure_ascii=False)}"
+        task_hint = (
+            f"Using SECTOR_MARKET, estimate SAM/SOM for {company} in {sector}. Provide assumptions. "
+            "Compare against deck claims (if any) and report delta as tam_pct."
+        )
+        raw = call_llm_json(task_hint=task_hint, schema=COMPANY_MARKET_SCHEMA, context=context)
+        delta = parse_json_or_repair(raw)
+        delta = delta if isinstance(delta, dict) else {}
+        out = {
+            "tam": kb.body.get("tam"),
+            "sam": delta.get("sam"),
+            "som": delta.get("som"),
+            "delta_vs_deck": delta.get("delta_vs_deck"),
+            "sector_market": {k: v for k, v in kb.body.items() if k != "tam"},
+            "kb": kb.meta(),
+        }
+        self.log("market_llm", {"tam": out.get("tam"), "kb_version": kb.version})
         return out
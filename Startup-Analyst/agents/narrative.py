@@ -44,7 +44,7 @@ class NarrativeAgent(BaseAgent):
     def extract(self, vs, company: str):
         """Extract structured narrative (scalability, fundraising, etc.)."""
         ctx = vs.similarity_search(
-            f"{company} scalability fundraising funding ask problem solved why now", k=12
+            f"{company} scalability fundraising funding ask problem solved why now", k=8
         )
         context = "\n\n".join(d.page_content[:1200] for d in ctx) or f"COMPANY={company}"
         task_hint = (
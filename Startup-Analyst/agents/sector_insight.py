@@ -2,6 +2,7 @@ from agents.base import BaseAgent
 from tools.jsonio import parse_json_or_repair
 from tools.json_sanitize import sanitize_currency_percent
 from tools.llm_router import call_llm_json
+from tools.sector_store import get_store
 
 SECTOR_SCHEMA = """{
   "kpis":["..."],
@@ -9,18 +10,34 @@ SECTOR_SCHEMA = """{
   "snippets":["..."]
 }"""
 
+SECTOR_TASK = (
+    "Output sector KPIs, numeric baselines (target as number only), and slide-ready snippets. "
+    "For each baseline include: kpi, target, unit (USD/%/mo), period (monthly/quarterly)."
+)
+
 class SectorInsightAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="sector_insight")
 
-    def load(self, sector: str, extra_context: str = ""):
-        context = f"SECTOR={sector}\n{extra_context}"
-        task_hint = (
-            "Output sector KPIs, numeric baselines (target as number only), and slide-ready snippets. "
-            "For each baseline include: kpi, target, unit (USD/%/mo), period (monthly/quarterly)."
-        )
-        raw = call_llm_json(task_hint=task_hint, schema=SECTOR_SCHEMA, context=context)
+    def build_knowledge(self, sector: str, geo: str = "India"):
+        """Company-independent KPIs/baselines for (sector, geo); stored by tools.sector_store."""
+        context = f"SECTOR={sector}\nGEO={geo}"
+        raw = call_llm_json(task_hint=SECTOR_TASK, schema=SECTOR_SCHEMA, context=context)
         raw = sanitize_currency_percent(raw)
         out = parse_json_or_repair(raw)
-        self.log("sector_llm", {"sector": sector})
+        self.log("sector_llm", {"sector": sector, "geo": geo})
+        if not isinstance(out, dict) or not out.get("kpis"):
+            raise ValueError(f"no sector KPIs for {sector}/{geo}")   # don't store an empty entry
         return out
+
+    def load(self, sector: str, extra_context: str = "", geo: str = "India"):
+        if extra_context:
+            # company-specific context can't be shared; build fresh
+            context = f"SECTOR={sector}\n{extra_context}"
+            raw = call_llm_json(task_hint=SECTOR_TASK, schema=SECTOR_SCHEMA, context=context)
+            out = parse_json_or_repair(sanitize_currency_percent(raw))
+            self.log("sector_llm", {"sector": sector})
+            return out
+        kb = get_store().get_or_build("sector_insight", sector, geo, self.build_knowledge)
+        self.log("sector_kb", {"sector": sector, "geo": geo, "version": kb.version})
+        return {**kb.body, "kb": kb.meta()}
@@ -1,20 +1,84 @@
+import json
+import threading
+
 from agents.base import BaseAgent
+from config import GEMINI_MODEL_ID, TERM_SWEEP_PRE, TERM_SWEEP_RAISE, TERM_SWEEP_ESOP
 from tools.llm_router import call_llm_json
 from tools.jsonio import parse_json_or_repair
+from tools import finmath
+
+TERMS_SCHEMA = '{"clauses":["..."],"plain":["..."]}'
+
+# clause commentary depends only on the round's stage, so it is generated once per
+# stage per process (and kept on disk by tools.llm_cache across processes)
+_COMMENTARY = {}
+_COMMENTARY_LOCK = threading.Lock()
+
+
+def round_stage(raise_cr: float) -> str:
+    """Rough Indian-market stage for a raise size in ₹ crore."""
+    if raise_cr <= 8:
+        return "seed"
+    if raise_cr <= 60:
+        return "series_a"
+    return "growth"
 
-TERMS_SCHEMA = '{"clauses":["..."],"dilution":[{"holder":"","post_pct":0.0}],"plain":["..."]}'
 
 class TermSheetSimulatorAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="term_sheet")
 
-    def advise(self, pre_money_cr: float, raise_cr: float, esop_refresh: float):
-        context = f"pre_money_cr={pre_money_cr}; raise_cr={raise_cr}; esop_refresh={esop_refresh}"
+    def _commentary(self, stage: str) -> dict:
+        with _COMMENTARY_LOCK:
+            if stage in _COMMENTARY:
+                return _COMMENTARY[stage]
+        from tools import llm_cache
         task_hint = (
-            "Suggest seed/Series-A appropriate clauses and compute post % for Founders, ESOP, and NewInvestor "
-            "(percentage of fully-diluted post-money). Keep plain explanations concise."
+            f"Suggest {stage.replace('_', ' ')} appropriate term-sheet clauses for an Indian startup round "
+            "(liquidation preference, anti-dilution, board, ESOP, pro-rata, vesting) and give concise "
+            "plain-language explanations of each for founders."
         )
-        raw = call_llm_json(task_hint=task_hint, schema=TERMS_SCHEMA, context=context)
+        raw = llm_cache.get(task_hint + TERMS_SCHEMA, stage, GEMINI_MODEL_ID)
+        if raw is None:
+            raw = call_llm_json(task_hint=task_hint, schema=TERMS_SCHEMA, context=f"stage={stage}")
         out = parse_json_or_repair(raw)
-        self.log("terms_llm", {"clauses": len(out.get('clauses', [])) if isinstance(out, dict) else 0})
+        out = out if isinstance(out, dict) else {}
+        if out.get("clauses"):
+            llm_cache.set(task_hint + TERMS_SCHEMA, stage, GEMINI_MODEL_ID, raw)
+            with _COMMENTARY_LOCK:
+                _COMMENTARY[stage] = out
+        return out
+
+    def advise(self, pre_money_cr: float, raise_cr: float, esop_refresh: float):
+        # dilution is exact arithmetic (tools.finmath); the LLM only writes the clause commentary
+        split = finmath.round_split(pre_money_cr, raise_cr, esop_refresh)
+        dilution = [{"holder": h, "post_pct": round(float(split[h]) * 100, 2)}
+                    for h in ("Founders", "ESOP", "NewInvestor")]
+        grid = finmath.sweep([round(pre_money_cr * m, 4) for m in TERM_SWEEP_PRE],
+                             [round(raise_cr * m, 4) for m in TERM_SWEEP_RAISE],
+                             TERM_SWEEP_ESOP)
+        sensitivity = {
+            "axes": {k: grid["axes"][k] for k in ("pre_money", "raise_amt", "esop_refresh")},
+            "founders_post_pct": (grid["Founders"][..., 0] * 100).round(2).tolist(),
+        }
+
+        stage = round_stage(raise_cr)
+        try:
+            commentary = self._commentary(stage)
+        except Exception as e:
+            # the numbers stand on their own; only the commentary is missing
+            commentary = {"error": f"commentary_error: {e}"}
+        out = {
+            "clauses": commentary.get("clauses", []),
+            "dilution": dilution,
+            "plain": commentary.get("plain", []),
+            "round": {"stage": stage, "pre_money_cr": pre_money_cr, "raise_cr": raise_cr,
+                      "esop_refresh": esop_refresh, "post_money_cr": round(float(split["post_money"]), 4),
+                      "effective_pre_money_cr": round(float(split["effective_pre_money"]), 4)},
+            "sensitivity": sensitivity,
+        }
+        if commentary.get("error"):
+            out["error"] = commentary["error"]
+        self.log("terms_llm", {"clauses": len(out["clauses"]), "stage": stage,
+                               "dilution": json.dumps(dilution)})
         return out
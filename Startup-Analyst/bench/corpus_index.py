@@ -0,0 +1,104 @@
+# bench/corpus_index.py
+"""
+Recall vs latency of the portfolio chunk index.
+
+    python -m bench.corpus_index --n 200000 --dim 256 --queries 500 [--kinds flat ivfpq hnsw_sq]
+
+Builds a CorpusIndex of each kind over the same synthetic clustered unit
+vectors (appended through CorpusIndex.add, reloaded memory-mapped), then for
+each nprobe / efSearch setting reports recall@k against exact inner-product
+search, per-query latency (p50 / p95, one query at a time, as the worker
+serves them), index size on disk and build time. Results are also written as
+JSON under outputs/bench/.
+"""
+from __future__ import annotations
+import argparse, json, pathlib, shutil, statistics, tempfile, time
+from typing import Dict, List
+
+import numpy as np
+
+from tools import corpus_index as ci
+
+OUT_DIR = pathlib.Path("outputs/bench")
+SWEEP = {"flat": [None], "ivfpq": [1, 4, 16, 64], "hnsw_sq": [16, 32, 64, 128]}
+
+
+def synthetic(n: int, dim: int, n_queries: int, latent: int = 48, seed: int = 0):
+    """
+    Unit vectors with text-embedding-like structure: clusters of ~200 (chunks of one
+    deck) in a `latent`-dimensional subspace, projected to `dim`, plus isotropic noise.
+    """
+    rng = np.random.default_rng(seed)
+    proj = rng.standard_normal((latent, dim)).astype(np.float32)
+    centres = rng.standard_normal((max(1, n // 200), latent)).astype(np.float32)
+    def draw(m):
+        z = centres[rng.integers(0, len(centres), m)] + 0.5 * rng.standard_normal((m, latent)).astype(np.float32)
+        v = z @ proj + 0.3 * rng.standard_normal((m, dim)).astype(np.float32)
+        return v / np.linalg.norm(v, axis=1, keepdims=True)
+    return draw(n), draw(n_queries)
+
+
+def exact(base, queries, k: int):
+    out = np.empty((len(queries), k), dtype=np.int64)
+    for lo in range(0, len(queries), 256):
+        s = queries[lo:lo + 256] @ base.T
+        top = np.argpartition(-s, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(s, top, axis=1), axis=1)
+        out[lo:lo + 256] = np.take_along_axis(top, order, axis=1)
+    return out
+
+
+def run_kind(kind: str, base, queries, truth, k: int, rerank: int) -> List[Dict]:
+    root = pathlib.Path(tempfile.mkdtemp(prefix=f"corpus_{kind}_"))
+    try:
+        idx = ci.CorpusIndex(root, kind=kind)
+        for lo in range(0, len(base), 50_000):
+            idx.add(base[lo:lo + 50_000], [{"chunk_id": str(i)} for i in range(lo, min(len(base), lo + 50_000))])
+        built = idx.build()
+        idx = ci.CorpusIndex(root, kind=kind)
+        idx.load(mmap=True)
+        rows = []
+        for param in SWEEP[kind]:
+            for rr in ([0, rerank] if kind != "flat" and rerank else [0]):
+                lat, got = [], []
+                for q in queries:
+                    t0 = time.perf_counter()
+                    hits = idx.search([q], k=k, nprobe=param, ef=param, rerank=rr, with_meta=False)[0]
+                    lat.append((time.perf_counter() - t0) * 1000)
+                    got.append([h["row"] for h in hits])
+                recall = statistics.mean(len(set(g) & set(t.tolist())) / k for g, t in zip(got, truth))
+                lat.sort()
+                rows.append({"kind": built.get("kind", kind), "factory": built.get("factory"), "param": param,
+                             "rerank": rr, f"recall@{k}": round(recall, 4),
+                             "p50_ms": round(lat[len(lat) // 2], 3), "p95_ms": round(lat[int(len(lat) * 0.95)], 3),
+                             "index_mb": round(built["bytes"] / 1e6, 1), "build_s": built["seconds"]})
+        return rows
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=300)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--rerank", type=int, default=ci.CORPUS_RERANK)
+    ap.add_argument("--kinds", nargs="+", choices=ci.KINDS, default=list(ci.KINDS))
+    args = ap.parse_args()
+
+    base, queries = synthetic(args.n, args.dim, args.queries)
+    truth = exact(base, queries, args.k)
+    results = []
+    print(f"{'kind':<8} {'factory':<18} {'param':>5} {'rerank':>6} {'recall':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'MB':>7} {'build s':>7}")
+    for kind in args.kinds:
+        for r in run_kind(kind, base, queries, truth, args.k, args.rerank):
+            results.append(r)
+            print(f"{r['kind']:<8} {r['factory']:<18} {str(r['param'] or '-'):>5} {r['rerank']:>6} "
+                  f"{r[f'recall@{args.k}']:>7.3f} {r['p50_ms']:>7.3f} {r['p95_ms']:>7.3f} "
+                  f"{r['index_mb']:>7.1f} {r['build_s']:>7.2f}")
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    out = OUT_DIR / f"corpus_index_{int(time.time())}.json"
+    out.write_text(json.dumps({"args": vars(args), "results": results}, indent=2), encoding="utf-8")
+    print(f"wrote {out}")
@@ -0,0 +1,88 @@
+# bench/decks.py
+"""Synthetic pitch decks of a given page count, written as minimal PDFs (stdlib only)."""
+from __future__ import annotations
+import pathlib, random
+from typing import List
+
+_SLIDES = [
+    ("Problem", "SMBs in India lose {n}% of revenue to manual collections and reconciliation."),
+    ("Solution", "An API-first platform that automates invoicing, payments and credit for {n}k merchants."),
+    ("Traction", "ARR of INR {n} Cr growing {m}% MoM with {k} paying customers and net revenue retention of 1{m}%."),
+    ("Unit Economics", "CAC of INR {k} with LTV of INR {n}k; gross margin {m}% and payback of {n} months."),
+    ("Market", "TAM of USD {n}B, SAM of USD {m}B and SOM of USD {k}M by 2028."),
+    ("Team", "Founder & CEO ex-Razorpay, CTO ex-Google; {n} engineers and {m} in sales."),
+    ("Competition", "Competes with Khatabook, Vyapar and OkCredit; differentiated on credit underwriting."),
+    ("Financials", "Monthly net burn of INR {m} L with cash in bank of INR {n} Cr and {k} months runway."),
+    ("Fundraising", "Raising INR {n} Cr at INR {k} Cr pre-money; {m}% ESOP pool post round."),
+    ("Why Now", "UPI crossed {k}B monthly transactions; account aggregator rails went live in {n} states."),
+]
+
+def _escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _page_lines(i: int, rng: random.Random) -> List[str]:
+    title, body = _SLIDES[i % len(_SLIDES)]
+    fill = dict(n=rng.randint(2, 60), m=rng.randint(3, 40), k=rng.randint(10, 900))
+    lines = [f"{title} ({i + 1})", body.format(**fill)]
+    lines += [body.format(n=rng.randint(2, 60), m=rng.randint(3, 40), k=rng.randint(10, 900)) for _ in range(6)]
+    return lines
+
+def make_pdf(pages: int, seed: int = 0, image_kb: int = 0) -> bytes:
+    """
+    Build a PDF with `pages` slides; deterministic for a given seed. With image_kb > 0
+    every slide also draws an incompressible greyscale image of about that size, to
+    get data-room sized files.
+    """
+    rng = random.Random(seed)
+    objs: List[bytes] = []
+    per = 3 if image_kb > 0 else 2
+    # 1: catalog, 2: pages tree, 3: font; page/content(/image) objects follow
+    kids = " ".join(f"{4 + per * i} 0 R" for i in range(pages))
+    objs.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i in range(pages):
+        ops = ["BT", "/F1 14 Tf", "50 740 Td", "16 TL"]
+        for ln in _page_lines(i, rng):
+            ops.append(f"({_escape(ln)}) Tj T*")
+        ops.append("ET")
+        xobj = ""
+        if image_kb > 0:
+            ops.append("q 400 0 0 200 400 40 cm /Im0 Do Q")
+            xobj = f" /XObject << /Im0 {6 + per * i} 0 R >>"
+        stream = "\n".join(ops).encode("latin-1")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 792] "
+            f"/Resources << /Font << /F1 3 0 R >>{xobj} >> /Contents {5 + per * i} 0 R >>".encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        if image_kb > 0:
+            w = 512
+            h = max(1, image_kb * 1024 // w)
+            pixels = rng.randbytes(w * h)
+            objs.append(b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                        b"/BitsPerComponent 8 /Length %d >>\nstream\n" % (w, h, len(pixels))
+                        + pixels + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+def write_decks(sizes: List[int], out_dir: str | pathlib.Path, seed: int = 0, image_kb: int = 0) -> List[str]:
+    """Write one synthetic deck per page count; returns the file paths."""
+    out_dir = pathlib.Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for n in sizes:
+        p = out_dir / (f"synthetic_{n}p_{image_kb}kb.pdf" if image_kb else f"synthetic_{n}p.pdf")
+        p.write_bytes(make_pdf(n, seed=seed + n, image_kb=image_kb))
+        paths.append(str(p))
+    return paths
@@ -0,0 +1,263 @@
+# bench/fakes.py
+"""
+Deterministic, fully offline stand-ins for the remote backends used by the
+pipeline (Gemini via tools.llm_router, Vertex embeddings via tools.vertex_embed,
+Document AI requests inside tools.docai_ocr and web search via tools.search_multi).
+
+`install(profile)` registers fake modules in sys.modules; it must run before
+anything imports `orchestration.orchestrator` or the agents, because agents bind
+`call_llm_json` / `multi_search` at import time.
+"""
+from __future__ import annotations
+import hashlib, json, math, random, re, sys, threading, time, types
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from tools.jsonio import parse_json_or_repair
+from tools.tracing import span
+
+
+class BackendFailure(RuntimeError):
+    """Raised by a fake backend to simulate a transient remote error."""
+
+
+@dataclass
+class LatencyModel:
+    """Lognormal latency with a median, a spread (sigma) and a failure rate."""
+    median_ms: float = 0.0
+    sigma: float = 0.35
+    failure_rate: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms * math.exp(rng.gauss(0.0, self.sigma)) / 1000.0
+
+
+@dataclass
+class FakeProfile:
+    """Latency/failure settings for every fake backend plus the RNG seed."""
+    llm: LatencyModel = field(default_factory=lambda: LatencyModel(median_ms=0.0))
+    embed: LatencyModel = field(default_factory=lambda: LatencyModel(median_ms=0.0))
+    ocr: LatencyModel = field(default_factory=lambda: LatencyModel(median_ms=0.0))   # per DocAI request
+    search: LatencyModel = field(default_factory=lambda: LatencyModel(median_ms=0.0))
+    seed: int = 7
+    list_len: int = 3          # items generated for each "..." list in a schema
+    embed_dim: int = 256
+
+
+class _Backend:
+    """Shared RNG, counters and latency injection for one fake backend."""
+    def __init__(self, name: str, model: LatencyModel, seed: int):
+        self.name = name
+        self.model = model
+        self._rng = random.Random(f"{seed}:{name}")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.busy_s = 0.0
+
+    def hit(self, units: int = 1):
+        with self._lock:
+            self.calls += 1
+            delay = sum(self.model.sample(self._rng) for _ in range(max(1, units)))
+            fail = self._rng.random() < self.model.failure_rate
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.busy_s += delay
+            if fail:
+                self.failures += 1
+        if fail:
+            raise BackendFailure(f"fake {self.name} failure")
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "failures": self.failures, "busy_s": round(self.busy_s, 4)}
+
+
+# --- Deterministic content helpers ---------------------------------------------
+
+_WORDS = (
+    "revenue growth customers retention margin pipeline enterprise platform market "
+    "india saas fintech d2c founders churn arr mrr cac ltv payback runway burn "
+    "regulatory license compliance competitors pricing distribution channel"
+).split()
+
+def _digest(*parts: str) -> int:
+    h = hashlib.blake2b(digest_size=8)
+    for p in parts:
+        h.update((p or "").encode("utf-8", "ignore")); h.update(b"\x00")
+    return int.from_bytes(h.digest(), "big")
+
+def _phrase(seed: int, n: int = 8) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+def _fill(node, seed: int, list_len: int):
+    """Replace placeholder values in a schema literal with deterministic content."""
+    if isinstance(node, dict):
+        return {k: _fill(v, _digest(str(seed), k), list_len) for k, v in node.items()}
+    if isinstance(node, list):
+        if not node:
+            return []
+        return [_fill(node[0], seed + i, list_len) for i in range(list_len)]
+    if isinstance(node, str):
+        if "|" in node:                       # enum, e.g. "supported|mixed|refuted|unknown"
+            opts = node.split("|")
+            return opts[seed % len(opts)]
+        return _phrase(seed)
+    if isinstance(node, bool):
+        return bool(seed % 2)
+    if isinstance(node, (int, float)):
+        return round((seed % 10_000) / 100.0, 2)
+    return node
+
+
+# --- Fake module factories -----------------------------------------------------
+
+def _make_llm_router(b: _Backend, profile: FakeProfile) -> types.ModuleType:
+    mod = types.ModuleType("tools.llm_router")
+    mod.__doc__ = "Fake tools.llm_router installed by bench.fakes"
+
+    def call_llm_json(*, task_hint: str, schema: str, context: str = "", max_tokens: int = 2048) -> str:
+        with span("llm_call", model="fake", mode="json", prompt_chars=len(task_hint) + len(schema) + len(context)) as sp:
+            b.hit()
+            seed = _digest(task_hint, schema, context[:2000])
+            try:
+                shape = parse_json_or_repair(schema)
+            except Exception:
+                return "{}"
+            out = json.dumps(_fill(shape, seed, profile.list_len))
+            sp.set(response_chars=len(out))
+            return out
+
+    def call_llm_text(*, prompt: str, context: str = "", max_tokens: int = 512) -> str:
+        with span("llm_call", model="fake", mode="text", prompt_chars=len(prompt) + len(context)):
+            b.hit()
+            return _phrase(_digest(prompt, context[:2000]), n=24)
+
+    mod.call_llm_json = call_llm_json
+    mod.call_llm_text = call_llm_text
+    return mod
+
+
+def _make_vertex_embed(b: _Backend, profile: FakeProfile) -> types.ModuleType:
+    mod = types.ModuleType("tools.vertex_embed")
+    mod.__doc__ = "Fake tools.vertex_embed installed by bench.fakes"
+    dim = profile.embed_dim
+    batch = 16
+
+    def _vec(text: str) -> List[float]:
+        # hashed bag-of-words so similarity_search still ranks by token overlap
+        acc = [0.0] * dim
+        for tok in re.findall(r"[a-z0-9]+", (text or "").lower()):
+            acc[_digest(tok) % dim] += 1.0
+        norm = math.sqrt(sum(x * x for x in acc)) or 1.0
+        return [x / norm for x in acc]
+
+    def embed_texts(texts: List[str]) -> List[List[float]]:
+        with span("embed_call", model="fake", n_texts=len(texts)):
+            b.hit(units=max(1, math.ceil(len(texts) / batch)))
+            return [_vec(t) for t in texts]
+
+    mod.embed_texts = embed_texts
+    return mod
+
+
+def _make_docai_ocr(b: _Backend, profile: FakeProfile) -> types.ModuleType:
+    """
+    The real tools.docai_ocr (mmap view -> one shared fitz document -> chunking ->
+    native-text merge), with only the Document AI request replaced, so the bench
+    measures the actual memory/copy behaviour of the OCR path.
+    """
+    import importlib
+    from types import SimpleNamespace as NS
+    mod = importlib.import_module("tools.docai_ocr")
+    fitz = mod.fitz
+
+    def _anchor(start: int, end: int):
+        return NS(text_anchor=NS(text_segments=[NS(start_index=start, end_index=end)]))
+
+    def _process_pdf_bytes(pdf_bytes: bytes):
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as chunk:   # what the service would parse
+            n = len(chunk)
+        b.hit()
+        text, pages = "", []
+
+        def cell(s: str):
+            nonlocal text
+            start = len(text)
+            text += s + "\n"
+            return NS(layout=_anchor(start, start + len(s)))
+
+        for i in range(n):
+            para = _phrase(_digest("page", str(len(pdf_bytes)), str(i)), n=60) + "\n"
+            pages.append(NS(paragraphs=[NS(layout=_anchor(len(text), len(text) + len(para)))],
+                            tables=[], lines=[], tokens=[]))
+            text += para
+        if n:
+            # one P&L table on the first page of each request, for tools.extractors
+            grid = [["Metric (₹ Cr)", "FY23", "FY24", "FY25E"], ["Revenue", "2.1", "4.8", "12"],
+                    ["Total expenses", "5.0", "9.6", "15"], ["Cash in bank", "3.0", "6.2", "4"]]
+            rows = [NS(cells=[cell(c) for c in r]) for r in grid]
+            pages[0].tables = [NS(header_rows=rows[:1], body_rows=rows[1:])]
+        return NS(document=NS(text=text, pages=pages))
+
+    mod._process_pdf_bytes = _process_pdf_bytes
+    mod._client_once = lambda: None
+    return mod
+
+
+def _make_search_multi(b: _Backend, profile: FakeProfile) -> types.ModuleType:
+    mod = types.ModuleType("tools.search_multi")
+    mod.__doc__ = "Fake tools.search_multi installed by bench.fakes"
+
+    def multi_search(query: str, k_total: int = 20) -> List[Dict]:
+        with span("search_call", query=query[:200], k_total=k_total):
+            b.hit()
+        seed = _digest(query)
+        out = []
+        for i in range(k_total):
+            s = seed + i
+            out.append({
+                "title": _phrase(s, n=5),
+                "url": f"https://source{s % 97}.example.com/{s % 10_007}",
+                "snippet": _phrase(s * 31, n=40),
+                "source": "fake",
+                "score": round(1.0 - i / max(1, k_total), 3),
+                "published": "2025-01-01" if s % 3 else "",
+            })
+        return out
+
+    mod.multi_search = multi_search
+    return mod
+
+
+_FACTORIES = {
+    "llm": ("tools.llm_router", _make_llm_router),
+    "embed": ("tools.vertex_embed", _make_vertex_embed),
+    "ocr": ("tools.docai_ocr", _make_docai_ocr),
+    "search": ("tools.search_multi", _make_search_multi),
+}
+
+BACKENDS: Dict[str, _Backend] = {}
+
+
+def install(profile: FakeProfile | None = None) -> Dict[str, _Backend]:
+    """Register the fake backend modules; returns the per-backend counters."""
+    profile = profile or FakeProfile()
+    loaded = [m for m in ("orchestration.orchestrator",) if m in sys.modules]
+    if loaded:
+        raise RuntimeError("bench.fakes.install() must run before importing the orchestrator")
+    import tools
+    for key, (modname, factory) in _FACTORIES.items():
+        backend = _Backend(key, getattr(profile, key), profile.seed)
+        mod = factory(backend, profile)
+        sys.modules[modname] = mod
+        setattr(tools, modname.split(".", 1)[1], mod)
+        BACKENDS[key] = backend
+    return BACKENDS
+
+
+def backend_stats() -> Dict[str, dict]:
+    return {k: b.stats() for k, b in BACKENDS.items()}
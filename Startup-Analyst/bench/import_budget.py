@@ -0,0 +1,82 @@
+# bench/import_budget.py
+"""
+Import-time budget check.
+
+    python -m bench.import_budget [--module orchestration.orchestrator] [--repeat 5] [--top 15]
+
+Imports the module in fresh interpreters under `python -X importtime`, reports the
+median cumulative import time and the heaviest modules it pulled in, and exits
+non-zero if the time is over IMPORT_BUDGET_MS or any IMPORT_DEFERRED package was
+imported eagerly. tests/test_import_budget.py runs the same check under pytest.
+"""
+from __future__ import annotations
+import argparse, os, re, statistics, subprocess, sys
+from typing import List, Tuple
+
+from config import IMPORT_BUDGET_MS, IMPORT_DEFERRED
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """One cold import: (cumulative ms of `module`, [(name, self_ms, cumulative_ms), ...])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    total = None
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, _indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        rows.append((name, self_us / 1000.0, cum_us / 1000.0))
+        if name == module:
+            total = cum_us / 1000.0
+    return (total if total is not None else 0.0), rows
+
+
+def eager_deferred(rows: List[Tuple[str, float, float]]) -> List[str]:
+    names = {r[0] for r in rows}
+    return [d for d in IMPORT_DEFERRED if d in names]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Import-time budget for the Startup-Analyst pipeline")
+    ap.add_argument("--module", default="orchestration.orchestrator")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = ap.parse_args(argv)
+
+    measure(args.module)   # warm the .pyc cache so runs measure imports, not compilation
+    runs = [measure(args.module) for _ in range(max(1, args.repeat))]
+    totals = [t for t, _ in runs]
+    median = statistics.median(totals)
+    rows = runs[-1][1]
+
+    print(f"import {args.module}: median {median:.1f} ms over {len(totals)} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}); budget {args.budget_ms:.0f} ms")
+    print(f"heaviest modules (self time):")
+    for name, self_ms, cum_ms in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"  {name:<50} self {self_ms:>7.1f} ms   cumulative {cum_ms:>7.1f} ms")
+
+    failed = False
+    eager = eager_deferred(rows)
+    if eager:
+        failed = True
+        print(f"FAIL: imported eagerly (should load on first use): {', '.join(eager)}")
+    if median > args.budget_ms:
+        failed = True
+        print(f"FAIL: {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
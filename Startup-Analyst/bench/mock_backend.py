@@ -0,0 +1,148 @@
+# bench/mock_backend.py
+"""
+Local stand-in for the analyst backend API and GCS signed URLs, for exercising
+backend_startup_analyst_integration.py offline.
+
+    python -m bench.mock_backend --latency-ms 150 --pages 40 [--deal]
+
+Serves the routes the integration script calls (signed deck URL, deck download,
+questionnaire answers, deal-note upload) with injected per-request latency, then
+compares fetching the deck and questionnaire one after another with the concurrent
+prefetch. With --deal it also runs process_deal end to end on bench.fakes and
+uploads the note to the mock.
+"""
+from __future__ import annotations
+import argparse, json, os, re, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from bench.decks import make_pdf
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class MockBackend:
+    """Threaded HTTP server with a deck, a questionnaire and an upload sink."""
+
+    def __init__(self, latency_ms: float = 0.0, pages: int = 20, answers: int = 12, seed: int = 7):
+        self.latency_s = latency_ms / 1000.0
+        self.deck = make_pdf(pages, seed)
+        self.answers = [{"questionId": f"q{i}", "answer": f"answer {i} about revenue, customers and team"}
+                        for i in range(1, answers + 1)]
+        self.uploads: List[dict] = []
+        self.hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, name="mock-backend", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"    # keep-alive, so pooled sessions reuse connections
+
+            def _route(self, name: str):
+                with backend._lock:
+                    backend.hits[name] = backend.hits.get(name, 0) + 1
+                if backend.latency_s:
+                    time.sleep(backend.latency_s)
+
+            def _json(self, code: int, obj):
+                body = json.dumps(obj).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if re.fullmatch(r"/v1/files/pitch-deck/[^/]+/download-url", self.path):
+                    self._route("download_url")
+                    return self._json(200, {"downloadUrl": f"{backend.url}/gcs/deck.pdf?sig=mock"})
+                if self.path.startswith("/gcs/deck.pdf"):
+                    self._route("deck")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/pdf")
+                    self.send_header("Content-Length", str(len(backend.deck)))
+                    self.end_headers()
+                    for i in range(0, len(backend.deck), 64 * 1024):
+                        self.wfile.write(backend.deck[i:i + 64 * 1024])
+                    return
+                if self.path.startswith("/v1/startups/questionnaire/"):
+                    self._route("questionnaire")
+                    return self._json(200, {"answers": backend.answers})
+                self._json(404, {"error": "not_found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                if self.path == "/v1/startups/upload-real-deal-note":
+                    self._route("upload")
+                    with backend._lock:
+                        backend.uploads.append(json.loads(body or b"{}"))
+                        n = len(backend.uploads)
+                    return self._json(200, {"dealNoteId": f"mock-note-{n}"})
+                self._json(404, {"error": "not_found"})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _integration(base_url: str):
+    if _REPO_ROOT not in sys.path:
+        sys.path.insert(0, _REPO_ROOT)
+    import backend_startup_analyst_integration as integration
+    integration.BACKEND_API_URL = base_url
+    return integration
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Mock analyst backend + prefetch timing")
+    ap.add_argument("--latency-ms", type=float, default=150.0)
+    ap.add_argument("--pages", type=int, default=40)
+    ap.add_argument("--deal", action="store_true", help="also run process_deal end to end on bench.fakes")
+    args = ap.parse_args(argv)
+
+    if args.deal:
+        from bench import fakes
+        fakes.install(fakes.FakeProfile())
+
+    import tempfile
+    with MockBackend(latency_ms=args.latency_ms, pages=args.pages) as mock:
+        integration = _integration(mock.url)
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            url = integration.get_pitch_deck_download_url("deck-1")
+            deck = integration.download_pitch_deck(url, tmp)
+            qpath = integration.create_questionnaire_text_file(integration.get_questionnaire_answers("q-1"), tmp)
+            serial = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            deck2, qpath2 = integration.prefetch_inputs("deck-1", "q-1", tmp)
+            concurrent = time.perf_counter() - t0
+            ok = (deck and deck2 and qpath and qpath2
+                  and open(deck2, "rb").read() == mock.deck)
+
+        print(f"\nsequential fetch {serial * 1000:.0f} ms | concurrent prefetch {concurrent * 1000:.0f} ms "
+              f"| deck {len(mock.deck)} bytes | intact={bool(ok)}")
+
+        if args.deal:
+            result = integration.process_deal("s-1", "MockCo", "", pitch_deck_id="deck-1", questionnaire_id="q-1")
+            print(f"process_deal: {result} | uploads={len(mock.uploads)} hits={mock.hits}")
+            ok = ok and result.get("ok") and len(mock.uploads) == 1
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# bench/run.py
+"""
+Offline pipeline benchmark.
+
+    python -m bench.run --synthetic 5 20 60 --repeat 3 --llm-ms 900 --search-ms 400
+
+Runs Orchestrator.run over the sample decks in data/ plus synthetic decks, with
+every remote backend replaced by bench.fakes, and reports per-stage latency,
+throughput, backend call counts and memory. Results are also written as JSON
+under outputs/bench/ so before/after numbers can be diffed.
+
+The pipeline's stores (note index, claim memo, sector KB, corpus index,
+feedback, traces, logs, the LLM cache) are all relative to the working
+directory, so the runs happen in a scratch directory that is deleted
+afterwards; fake verdicts and notes never reach the real outputs/.
+"""
+from __future__ import annotations
+import argparse, functools, glob, json, os, pathlib, shutil, statistics, sys, tempfile, time, tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from bench import fakes
+from bench.decks import write_decks
+
+OUT_DIR = pathlib.Path("outputs/bench")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _max_rss_mb() -> float:
+    try:
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(kb / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except Exception:
+        return 0.0
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak-RSS mark (Linux), so each suite reports its own peak."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS since the last reset (VmHWM); falls back to the process-lifetime maximum."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return _max_rss_mb()
+
+
+def _instrument(orch, timings: Dict[str, float]):
+    """Wrap every public agent method on this orchestrator to record wall time per stage."""
+    from agents.base import BaseAgent
+    for agent in vars(orch).values():
+        if not isinstance(agent, BaseAgent):
+            continue
+        for name, fn in vars(type(agent)).items():
+            if name.startswith("_") or name in ("log", "flush") or not callable(fn):
+                continue
+            stage = f"{agent.name}.{name}"
+            bound = getattr(agent, name)
+
+            @functools.wraps(fn)
+            def timed(*a, _bound=bound, _stage=stage, **kw):
+                t0 = time.perf_counter()
+                try:
+                    return _bound(*a, **kw)
+                finally:
+                    timings[_stage] = timings.get(_stage, 0.0) + time.perf_counter() - t0
+
+            setattr(agent, name, timed)
+
+
+def _run_one(deck: str, company: str, sector: str) -> dict:
+    from orchestration.orchestrator import Orchestrator
+    timings: Dict[str, float] = {}
+    orch = Orchestrator(sector=sector)
+    _instrument(orch, timings)
+    t0 = time.perf_counter()
+    err = None
+    try:
+        orch.run(company, [deck])
+    except Exception as e:  # a failed run is still a data point
+        err = f"{type(e).__name__}: {e}"
+    total = time.perf_counter() - t0
+    calls = {k: v["n"] for k, v in (orch.trace_report.get("by_name") or {}).items() if k.endswith("_call")}
+    return {"deck": deck, "total_s": total, "stages": timings, "calls": calls, "error": err}
+
+
+def _pct(xs: List[float], q: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    i = min(len(xs) - 1, max(0, round(q * (len(xs) - 1))))
+    return xs[i]
+
+
+def _summarize(runs: List[dict]) -> dict:
+    per_stage: Dict[str, List[float]] = {}
+    for r in runs:
+        for k, v in r["stages"].items():
+            per_stage.setdefault(k, []).append(v)
+    totals = [r["total_s"] for r in runs]
+    return {
+        "runs": len(runs),
+        "errors": sum(1 for r in runs if r["error"]),
+        "total_s": {"p50": _pct(totals, 0.5), "p95": _pct(totals, 0.95), "mean": statistics.fmean(totals) if totals else 0.0},
+        "stages": {
+            k: {"p50": _pct(v, 0.5), "p95": _pct(v, 0.95), "mean": statistics.fmean(v), "n": len(v)}
+            for k, v in sorted(per_stage.items(), key=lambda kv: -statistics.fmean(kv[1]))
+        },
+    }
+
+
+def _print_report(report: dict):
+    print(f"\n== {report['label']} ==")
+    s = report["summary"]
+    print(f"runs={s['runs']} errors={s['errors']} wall={report['wall_s']:.2f}s "
+          f"throughput={report['deals_per_min']:.2f} deals/min "
+          f"py_peak={report['memory']['py_peak_mb']}MB max_rss={report['memory']['max_rss_mb']}MB")
+    m = report["memory"]
+    print(f"deck={m['deck_mb']}MB peak_rss={m['suite_peak_rss_mb']}MB "
+          f"(+{m['suite_peak_rss_mb'] - m['rss_before_mb']:.1f}MB over {m['rss_before_mb']}MB at start)")
+    print(f"{'stage':44s} {'p50 ms':>9s} {'p95 ms':>9s} {'mean ms':>9s}")
+    print(f"{'TOTAL':44s} {s['total_s']['p50']*1e3:9.1f} {s['total_s']['p95']*1e3:9.1f} {s['total_s']['mean']*1e3:9.1f}")
+    for k, v in s["stages"].items():
+        print(f"{k:44s} {v['p50']*1e3:9.1f} {v['p95']*1e3:9.1f} {v['mean']*1e3:9.1f}")
+    print("backends:", json.dumps(report["backends"]))
+
+
+def run_suite(decks: List[str], repeat: int, concurrency: int, sector: str, trace_memory: bool) -> dict:
+    jobs = [(d, f"Bench{i}") for d in decks for i in range(repeat)]
+    if trace_memory:
+        tracemalloc.start()
+    _reset_peak_rss()
+    rss0 = _peak_rss_mb()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        runs = list(pool.map(lambda j: _run_one(j[0], j[1], sector), jobs))
+    wall = time.perf_counter() - t0
+    py_peak = 0.0
+    if trace_memory:
+        py_peak = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+        tracemalloc.stop()
+    return {
+        "wall_s": wall,
+        "deals_per_min": (len(runs) / wall * 60.0) if wall else 0.0,
+        "memory": {"py_peak_mb": py_peak, "max_rss_mb": _max_rss_mb(),
+                   "suite_peak_rss_mb": _peak_rss_mb(), "rss_before_mb": rss0,
+                   "deck_mb": round(os.path.getsize(decks[0]) / 1e6, 1) if decks else 0.0},
+        "summary": _summarize(runs),
+        "runs": runs,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--decks", nargs="*", default=None, help="PDFs to run (default: data/*.pdf)")
+    ap.add_argument("--synthetic", nargs="*", type=int, default=[5, 20, 60], help="synthetic deck page counts")
+    ap.add_argument("--image-kb", type=int, default=0, help="image payload per synthetic page (e.g. 512 for ~30 MB at 60 pages)")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--sector", default="saas")
+    ap.add_argument("--seed", type=int, default=7)
+    for b, default in (("llm", 0.0), ("embed", 0.0), ("ocr", 0.0), ("search", 0.0)):
+        ap.add_argument(f"--{b}-ms", type=float, default=default, help=f"median {b} latency (ms)")
+        ap.add_argument(f"--{b}-fail", type=float, default=0.0, help=f"{b} failure rate [0..1]")
+    ap.add_argument("--sigma", type=float, default=0.35, help="lognormal spread for all backends")
+    ap.add_argument("--no-tracemalloc", action="store_true", help="skip Python heap tracking (lower overhead)")
+    ap.add_argument("--out", default=None, help="report path (default: outputs/bench/bench_<ts>.json)")
+    args = ap.parse_args(argv)
+
+    lm = lambda b: fakes.LatencyModel(getattr(args, f"{b}_ms"), args.sigma, getattr(args, f"{b}_fail"))
+    profile = fakes.FakeProfile(llm=lm("llm"), embed=lm("embed"), ocr=lm("ocr"), search=lm("search"), seed=args.seed)
+
+    decks = [os.path.abspath(d) for d in (args.decks if args.decks is not None else sorted(glob.glob("data/*.pdf")))]
+    out = pathlib.Path(args.out).resolve() if args.out else OUT_DIR.resolve() / f"bench_{int(time.time())}.json"
+
+    # every store the pipeline writes is cwd-relative: run in a scratch directory
+    cwd, scratch = os.getcwd(), tempfile.mkdtemp(prefix="bench_run_")
+    if _ROOT not in sys.path:
+        sys.path.insert(0, _ROOT)
+    os.chdir(scratch)
+    try:
+        fakes.install(profile)
+        synth = (write_decks(args.synthetic, pathlib.Path("decks"), seed=args.seed, image_kb=args.image_kb)
+                 if args.synthetic else [])
+
+        reports = []
+        for label, group in (("sample decks", decks), ("synthetic decks", synth)):
+            for deck in group:
+                before = {k: dict(v) for k, v in fakes.backend_stats().items()}
+                rep = run_suite([deck], args.repeat, args.concurrency, args.sector, not args.no_tracemalloc)
+                after = fakes.backend_stats()
+                rep["label"] = f"{label}: {os.path.basename(deck)}"
+                rep["backends"] = {k: {m: round(after[k][m] - before[k][m], 4) for m in after[k]} for k in after}
+                _print_report(rep)
+                reports.append(rep)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"args": vars(args), "reports": reports}, indent=2, default=str), encoding="utf-8")
+    print("\nSaved:", out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,3 +23,104 @@ EXA_API_KEY = "6a24a2f9-e7a7-4b67-9367-5fa3094f8397"           # https://exa.ai
 SEARCH_TIMEOUT = 20        # seconds per request
 SEARCH_TOPK_PER_BACKEND = 6
 SEARCH_MERGED_TOPK = 20
+SEARCH_AUTHORITY_FILE = "data/domain_authority.json"   # domain authority boosts (tools/urls.py)
+
+# tracing (tools/tracing.py): spans appended to TRACE_DIR/spans.jsonl per run
+TRACE_ENABLED = True
+TRACE_DIR = "outputs/traces"
+
+# agent logs (tools/logsink.py): one buffered JSONL file per process, size-rotated
+LOG_PATH = "outputs/logs/agents.jsonl"
+LOG_ROTATE_BYTES = 50_000_000
+LOG_BACKUPS = 10
+LOG_COMPRESS = True           # gzip rotated files
+LOG_FLUSH_INTERVAL = 2.0      # seconds between background flushes
+LOG_BUFFER_MAX = 5000         # records buffered before an inline flush
+LOG_AGENT_BUFFER = 1000       # per-agent records kept between flush() calls
+
+# deal-note index (tools/note_store.py)
+NOTES_DB = "outputs/notes.sqlite"
+
+# analyst worker (../analyst_worker.py): one long-lived process running deals from a local job queue
+WORKER_HOST = "127.0.0.1"
+WORKER_PORT = 8765
+WORKER_CONCURRENCY = 3        # deals analysed in parallel
+WORKER_QUEUE_MAX = 50         # queued jobs before POST /jobs answers 503
+WORKER_JOB_HISTORY = 200      # finished jobs kept for GET /jobs/<id>
+
+# import-time budget (bench/import_budget.py): cold `import orchestration.orchestrator`
+IMPORT_BUDGET_MS = 250
+# heavy SDKs that must load on first use only (tools/lazy.py), never at import
+IMPORT_DEFERRED = (
+    "google.generativeai", "google.cloud.documentai", "vertexai", "fitz",
+    "langchain", "langchain_community", "faiss", "requests", "tenacity", "bs4", "numpy",
+)
+
+# deterministic finance math (tools/finmath.py)
+RUNWAY_CASES = (("base", 0.0), ("conservative", 0.05))   # (case, monthly net-burn growth)
+TERM_SWEEP_PRE = (0.8, 0.9, 1.0, 1.1, 1.2)      # multiples of the proposed pre-money
+TERM_SWEEP_RAISE = (0.5, 0.75, 1.0, 1.25, 1.5)  # multiples of the proposed raise
+TERM_SWEEP_ESOP = (0.0, 0.05, 0.10, 0.15)       # post-money option pool targets
+
+# scenario grids (tools/scenarios.py)
+SCENARIO_HORIZON_MO = 60      # months simulated per scenario
+SCENARIO_MAX_CELLS = 200_000  # scenarios per request
+
+# sector knowledge store (tools/sector_store.py): company-independent sector / legal / market content
+SECTOR_KB_DB = "outputs/sector_kb.sqlite"
+SECTOR_KB_TTL_DAYS = 30       # older entries are served, then rebuilt in the background
+SECTOR_KB_KEEP_VERSIONS = 3   # versions kept per (kind, sector, geo)
+
+# learning loop (tools/feedback.py): append-only feedback log + compacted weight aggregate
+LEARN_DIR = "outputs/learning"
+LEARN_RATE = 0.1              # exponentiated-gradient step per feedback event
+LEARN_MIN_WEIGHT = 0.05       # no scoring dimension is ever switched off entirely
+LEARN_COMPACT_EVERY = 50      # events between aggregate snapshots
+LEARN_LOG_ROTATE_BYTES = 5_000_000
+
+# deal scoring (tools/scoring.py): sub-scores and total are computed locally
+SCORING_LLM_BULLETS = True    # False: template bullets, no LLM call at all
+INR_CR_PER_USD_M = 8.3        # ₹ crore per US$ million, for comparing amounts
+
+# bulk re-scoring (tools/rescore.py): stored notes re-scored in a process pool, no LLM calls
+RESCORE_DIR = "outputs/rescore"   # checkpoints, one per version label
+RESCORE_WORKERS = None            # None: one per CPU
+RESCORE_INFLIGHT = 4              # files in flight per worker
+
+# claim verification memo (tools/claim_store.py): verdicts reused across runs and deals
+CLAIMS_DB = "outputs/claims.sqlite"
+CLAIM_TTL_DAYS = 30           # verdicts older than this are re-verified
+CLAIM_UNKNOWN_TTL_DAYS = 3    # 'unknown' verdicts are retried sooner
+CLAIM_NEAR_DUP_SIM = 0.95     # embedding cosine for a reworded claim to reuse a verdict
+
+# near-duplicate evidence (tools/neardup.py): MinHash over word shingles
+NEARDUP_JACCARD = 0.5         # estimated Jaccard at which two snippets are the same story
+NEARDUP_CONTAINMENT = 0.8     # or: this share of the shorter snippet appears in the longer one
+NEARDUP_PERMUTATIONS = 64
+NEARDUP_SHINGLE = 3           # words per shingle
+
+# deck retrieval (tools/vectorstore.HybridIndex): FAISS + BM25 fused by reciprocal rank
+RETRIEVAL_FETCH_K = 30        # candidates taken from each ranking before fusion
+RETRIEVAL_RRF_K = 60          # reciprocal-rank-fusion constant
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# deck chunking (tools/chunking.py): one chunk per slide / table / web section
+CHUNK_MAX_CHARS = 1800        # longer units are packed by paragraph (tables by rows)
+CHUNK_MIN_CHARS = 200         # shorter web sections are merged into the next one
+
+# portfolio chunk index (tools/corpus_index.py): every ingested chunk, quantised FAISS over a float16 log
+CORPUS_INDEX_DIR = "outputs/corpus"
+CORPUS_INDEX_KIND = "ivfpq"   # "ivfpq" (~CORPUS_PQ_M bytes/vector) | "hnsw_sq" (~dim bytes, faster) | "flat"
+CORPUS_INDEX_ON_INGEST = True # append every run's chunks (reuses the run's embeddings)
+CORPUS_TRAIN_MIN = 10_000     # exact (Flat) search below this many chunks
+CORPUS_TRAIN_SAMPLE = 100_000 # vectors sampled to train the quantiser
+CORPUS_PQ_M = 32              # PQ sub-quantisers (bytes per vector); a divisor of dim is used
+CORPUS_NPROBE = 16            # IVF lists probed per query
+CORPUS_EF_SEARCH = 64         # HNSW candidate list size per query
+CORPUS_RERANK = 4             # candidates per result re-scored exactly from the float16 log (0: off)
+
+# deep-dive context (tools/note_sections.py): only the sections of a note that answer the question
+DEEP_DIVE_SECTIONS_K = 8      # sections retrieved per question (the header always goes in)
+DEEP_DIVE_CONTEXT_CHARS = 8000
+SECTION_INDEX_CACHE = 32      # notes whose section index stays loaded
@@ -1,6 +1,7 @@
 # orchestration/orchestrator.py
 import time, uuid, pathlib, json
-from typing import List, Dict, Any, Iterable
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Callable, Optional
 
 from agents.ingestion import IngestionAgent
 from agents.deep_research import DeepResearchAgent
@@ -20,9 +21,19 @@ from agents.customer_sentiment import CustomerSentimentAgent
 from agents.legal_compliance import LegalComplianceAgent
 from agents.narrative import NarrativeAgent
 from agents.brief import BriefAgent   # <-- NEW
+from tools.tracing import span, get_trace, critical_path
+from tools.note_store import NoteStore
+from tools.corpus_index import get_corpus_index
+from config import CORPUS_INDEX_ON_INGEST
 
 OUT_NOTES = pathlib.Path("outputs/notes"); OUT_NOTES.mkdir(parents=True, exist_ok=True)
 
+# number of agent stages in Orchestrator._run (denominator for progress reports)
+N_STAGES = 17
+
+# progress(stage, done, total) is called after each agent stage, whether or not it failed
+ProgressFn = Callable[[str, int, int], None]
+
 
 def _collect_urls(items: Iterable[Any], keys: List[str] = None) -> List[str]:
     """
@@ -53,13 +64,14 @@ class Orchestrator:
         self.sector = sector
 
         # Core
+        self.learn = LearningLoopAgent()
         self.ingest = IngestionAgent()
         self.verify = DeepResearchAgent()
-        self.score = DealScoringAgent(weights)
+        # explicit weights win; otherwise score with what analyst feedback has taught so far
+        self.score = DealScoringAgent(weights or self.learn.weights())
         self.bench = PeerBenchmarkAgent()
         self.risk = RiskFlaggingAgent()
         self.terms = TermSheetSimulatorAgent()
-        self.learn = LearningLoopAgent()
         self.sector_agent = SectorInsightAgent()
 
         # New
@@ -71,110 +83,162 @@ class Orchestrator:
         self.legal = LegalComplianceAgent()
         self.narrative = NarrativeAgent()
         self.brief = BriefAgent()  # <-- NEW
+        self.trace_report: dict = {}
+        self.notes = NoteStore()
+        self._progress: Optional[ProgressFn] = None
+        self._done = 0
+
+    @contextmanager
+    def _stage(self, agent, op: str, **attrs):
+        """Agent span for one pipeline stage, followed by a progress report."""
+        try:
+            with agent.span(op, **attrs):
+                yield
+        finally:
+            self._done += 1
+            if self._progress:
+                try:
+                    self._progress(f"{agent.name}.{op}", self._done, N_STAGES)
+                except Exception:
+                    pass  # a broken reporter must never fail the deal
+
+    def run(self, company: str, inputs: List[str], progress: Optional[ProgressFn] = None):
+        self._progress, self._done = progress, 0
+        with span("run", kind="run", run_id=self.run_id, company=company, sector=self.sector,
+                  n_inputs=len(inputs)) as root:
+            out, note = self._run(company, inputs)
+        # per-run critical-path summary (spans themselves are in outputs/traces/spans.jsonl)
+        self.trace_report = critical_path(get_trace(root.trace_id))
+        return out, note
 
-    def run(self, company: str, inputs: List[str]):
+    def _run(self, company: str, inputs: List[str]):
         # 1) Ingest & vector index
-        ig = self.ingest.run(inputs)
+        with self._stage(self.ingest, "run"):
+            ig = self.ingest.run(inputs)
         vs = ig["vs"]
+        if CORPUS_INDEX_ON_INGEST:
+            try:
+                with span("corpus_add", kind="index"):
+                    get_corpus_index().add_run(vs, self.run_id, company)
+            except Exception as e:
+                # the portfolio index is best-effort (the run has its own), but failures are logged
+                self.ingest.log("corpus_add_error", {"run_id": self.run_id, "error": f"{type(e).__name__}: {e}"})
 
         # 1b) 1–2 sentence brief (cheap + early so it’s available everywhere)
         try:
-            brief = self.brief.summarize(vs, company)
+            with self._stage(self.brief, "summarize"):
+                brief = self.brief.summarize(vs, company)
         except Exception as e:
             brief = {"brief_1_2_sentences": f"(brief_error: {e})"}
 
         # 2) LLM-driven facts + claims
-        facts = self.ingest.llm_extract_facts(vs, company)
-        claims = self.ingest.llm_mine_claims(vs, company)
+        with self._stage(self.ingest, "llm_extract_facts"):
+            facts = self.ingest.llm_extract_facts(vs, company)
+        with self._stage(self.ingest, "llm_mine_claims"):
+            claims = self.ingest.llm_mine_claims(vs, company)
 
         # 3) Build local evidence for verification
-        ev_docs = vs.similarity_search(f"{company} metrics market", k=12)
+        with span("local_evidence", kind="retrieval", k=8):
+            ev_docs = vs.similarity_search(f"{company} metrics market", k=8)
         evidence = [{"url": d.metadata.get("source", "local"), "quote": d.page_content[:280]} for d in ev_docs]
 
         # 4) Verify claims
         try:
-            verification = self.verify.verify(claims, evidence)
+            with self._stage(self.verify, "verify", n_claims=len(claims)):
+                verification = self.verify.verify(claims, evidence, company=company)
         except Exception as e:
             verification = {"checks": [], "error": str(e)}
 
-        # 5) Core scoring
-        try:
-            deal_score = self.score.score(facts, verification)
-        except Exception as e:
-            deal_score = {"breakdown": {"founders": 0, "traction": 0, "unit_econ": 0, "market": 0}, "total": 0.0, "bullets": [f"scoring_error: {e}"]}
-
         # 6) Peer benchmarks
         try:
-            benches = self.bench.run(company, sector=self.sector)
+            with self._stage(self.bench, "run"):
+                benches = self.bench.run(company, sector=self.sector)
         except Exception as e:
             benches = {"peers": [], "insights": [f"benchmark_error: {e}"]}
 
         # 7) Narrative (Scalability, Fundraising, Funding Ask, Key Problem, Why Now)
         try:
-            narrative = self.narrative.extract(vs, company)
+            with self._stage(self.narrative, "extract"):
+                narrative = self.narrative.extract(vs, company)
         except Exception as e:
             narrative = {"error": f"narrative_error: {e}"}
 
         # 8) New agents (deeper coverage)
         try:
-            fin = self.finance.analyze(json.dumps(facts))  # If you have table text, pass that instead
+            with self._stage(self.finance, "analyze"):
+                fin = self.finance.analyze(json.dumps(facts), tables=ig.get("tables"))
         except Exception as e:
             fin = {"error": f"finance_error: {e}"}
 
         try:
             founder_names = [f.get("name", "") for f in facts.get("founders", []) if isinstance(f, dict)]
-            founders = self.founders.profile(founder_names) if founder_names else {"founders": []}
+            with self._stage(self.founders, "profile", n_founders=len(founder_names)):
+                founders = self.founders.profile(founder_names) if founder_names else {"founders": []}
         except Exception as e:
             founders = {"founders": [], "error": f"founder_error: {e}"}
 
         try:
-            marketv = self.marketval.size(company, self.sector)
+            with self._stage(self.marketval, "size"):
+                marketv = self.marketval.size(company, self.sector)
         except Exception as e:
             marketv = {"error": f"market_validation_error: {e}"}
 
         try:
-            comp = self.competitive.rank(benches, company)
+            with self._stage(self.competitive, "rank"):
+                comp = self.competitive.rank(benches, company)
         except Exception as e:
             comp = {"table": [], "positioning_bullets": [], "data_quality_notes": [f"competitive_error: {e}"]}
 
         try:
-            sent = self.sentiment.listen(company, f"{company} product")
+            with self._stage(self.sentiment, "listen"):
+                sent = self.sentiment.listen(company, f"{company} product")
         except Exception as e:
             sent = {"error": f"sentiment_error: {e}"}
 
         try:
             # Adjust geo as needed; default to India for demo
-            legal = self.legal.check(self.sector, "India", company)
+            with self._stage(self.legal, "check"):
+                legal = self.legal.check(self.sector, "India", company)
         except Exception as e:
             legal = {"error": f"legal_error: {e}"}
 
         # 9) Risks (now with much richer context)
         try:
-            risks = self.risk.run(
-                {
-                    "facts": facts,
-                    "finance": fin,
-                    "founders": founders,
-                    "market_validation": marketv,
-                    "benchmarks": benches,
-                    "competitive": comp,
-                    "sentiment": sent,
-                    "legal": legal,
-                    "narrative": narrative,
-                },
-                verification
-            )
+            with self._stage(self.risk, "run"):
+                risks = self.risk.run(
+                    {
+                        "facts": facts,
+                        "finance": fin,
+                        "founders": founders,
+                        "market_validation": marketv,
+                        "benchmarks": benches,
+                        "competitive": comp,
+                        "sentiment": sent,
+                        "legal": legal,
+                        "narrative": narrative,
+                    },
+                    verification
+                )
         except Exception as e:
             risks = [{"code": "risk_error", "severity": "low", "message": str(e), "evidence_excerpt": ""}]
 
+        # 9b) Core scoring: local and deterministic (tools/scoring.py), after risks so they weigh in
+        try:
+            with self._stage(self.score, "score"):
+                deal_score = self.score.score(facts, verification, risks=risks, finance=fin)
+        except Exception as e:
+            deal_score = {"breakdown": {"founders": 0, "traction": 0, "unit_econ": 0, "market": 0}, "total": 0.0, "bullets": [f"scoring_error: {e}"]}
+
         # 10) Term sheet & sector notes
         try:
-            term = self.terms.advise(pre_money_cr=25, raise_cr=4, esop_refresh=0.1)
+            with self._stage(self.terms, "advise"):
+                term = self.terms.advise(pre_money_cr=25, raise_cr=4, esop_refresh=0.1)
         except Exception as e:
             term = {"error": f"terms_error: {e}"}
 
         try:
-            sector_notes = self.sector_agent.load(self.sector)
+            with self._stage(self.sector_agent, "load"):
+                sector_notes = self.sector_agent.load(self.sector)
         except Exception as e:
             sector_notes = {"error": f"sector_error: {e}"}
 
@@ -213,6 +277,11 @@ class Orchestrator:
 
         out = OUT_NOTES / f"deal_note_{company}_{self.run_id}.json"
         out.write_text(json.dumps(note, indent=2), encoding="utf-8")
+        try:
+            with span("note_index", kind="store"):
+                self.notes.put(note, path=str(out), mtime=out.stat().st_mtime)
+        except Exception:
+            pass  # the JSON file is the source of truth; the index can be rebuilt with sync_dir()
 
         # 13) Flush all agent logs
         for agent in [
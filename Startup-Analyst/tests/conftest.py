@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# tests import the project's top-level packages (config, tools, bench) as the CLI does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+# tests/test_feedback.py
+"""Learned scoring weights (tools/feedback.py)."""
+import pytest
+
+from config import LEARN_MIN_WEIGHT
+from tools.feedback import FeedbackStore, apply_event
+from tools.scoring import DEFAULT_WEIGHTS
+
+
+def _state():
+    return {"weights": dict(DEFAULT_WEIGHTS), "counts": {"n": 0, "up": 0, "down": 0, "applied": 0}}
+
+
+def test_thumbs_up_moves_weight_to_the_strong_dimension():
+    state = _state()
+    apply_event(state, {"ok": True, "breakdown": {"founders": 90, "traction": 10, "unit_econ": 10, "market": 10}})
+    w = state["weights"]
+    assert w["founders"] > DEFAULT_WEIGHTS["founders"]
+    assert sum(w.values()) == pytest.approx(1.0, abs=1e-5)
+    assert state["counts"] == {"n": 1, "up": 1, "down": 0, "applied": 1}
+
+
+def test_thumbs_down_moves_weight_away_and_keeps_the_floor():
+    state = _state()
+    for _ in range(500):
+        apply_event(state, {"ok": False, "breakdown": {"founders": 100, "traction": 0, "unit_econ": 0, "market": 0}})
+    assert state["weights"]["founders"] < DEFAULT_WEIGHTS["founders"]
+    assert min(state["weights"].values()) >= LEARN_MIN_WEIGHT / 2
+
+
+def test_event_without_breakdown_only_counts():
+    state = _state()
+    apply_event(state, {"ok": False})
+    assert state["weights"] == DEFAULT_WEIGHTS and state["counts"]["applied"] == 0
+
+
+def test_store_replays_the_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)            # no legacy state file from a real outputs/
+    a = FeedbackStore(tmp_path / "learn")
+    a.record(True, breakdown={"founders": 80, "traction": 20, "unit_econ": 20, "market": 20})
+    b = FeedbackStore(tmp_path / "learn")  # another process: rebuilds from the log
+    assert b.weights() == a.weights() != DEFAULT_WEIGHTS
+    assert b.snapshot()["counts"]["up"] == 1
@@ -0,0 +1,16 @@
+# tests/test_import_budget.py
+"""Import-time budget: `import orchestration.orchestrator` stays cheap (see bench/import_budget.py)."""
+import statistics
+
+from bench.import_budget import eager_deferred, measure
+from config import IMPORT_BUDGET_MS
+
+MODULE = "orchestration.orchestrator"
+
+
+def test_import_budget():
+    measure(MODULE)     # warm the .pyc cache so runs measure imports, not compilation
+    runs = [measure(MODULE) for _ in range(3)]
+    median = statistics.median(t for t, _ in runs)
+    assert not eager_deferred(runs[-1][1]), "heavy SDKs must load on first use"
+    assert median <= IMPORT_BUDGET_MS, f"import {MODULE}: {median:.1f} ms over the {IMPORT_BUDGET_MS} ms budget"
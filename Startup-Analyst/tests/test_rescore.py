@@ -0,0 +1,37 @@
+# tests/test_rescore.py
+"""Bulk re-scoring and checkpoint resume (tools/rescore.py)."""
+import json
+
+from tools import rescore
+from tools.note_store import NoteStore
+
+
+def _notes(root, n):
+    root.mkdir()
+    for i in range(n):
+        (root / f"r{i}.json").write_text(json.dumps({"run_id": f"r{i}", "company": f"Co{i}", "facts": {}}))
+
+
+def test_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)            # checkpoints go under the cwd-relative RESCORE_DIR
+    _notes(tmp_path / "notes", 3)
+    store = NoteStore(tmp_path / "notes.sqlite")
+    label = "t1"
+    ckpt = rescore.Checkpoint(label)
+    ckpt.mark(["r0.json"])                 # a previous run finished one file, then died
+    ckpt.close()
+
+    out = rescore.run(tmp_path / "notes", weights={}, label=label, workers=1, store=store)
+    assert (out["scored"], out["skipped"], out["errors"]) == (2, 1, 0)
+    again = rescore.run(tmp_path / "notes", weights={}, label=label, workers=1, store=store)
+    assert (again["scored"], again["skipped"]) == (0, 3)
+    fresh = rescore.run(tmp_path / "notes", weights={}, label=label, workers=1, store=store, restart=True)
+    assert fresh["scored"] == 3
+
+
+def test_versioned_scores_join_synced_notes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _notes(tmp_path / "notes", 2)
+    store = NoteStore(tmp_path / "notes.sqlite")
+    out = rescore.run(tmp_path / "notes", weights={}, label="t2", workers=1, store=store)
+    assert sorted(c for _, c, _ in store.ranked(out["label"])) == ["Co0", "Co1"]
@@ -0,0 +1,59 @@
+# tests/test_scenarios.py
+"""Scenario grids (tools/scenarios.py) and runway math (tools/finmath.py)."""
+import math
+
+import numpy as np
+import pytest
+
+from tools import finmath
+from tools.scenarios import PARAMS, Baseline, ScenarioError, expand, run_grid
+
+
+def test_expand_specs():
+    assert expand("raise_amt", 4).tolist() == [4.0]
+    assert expand("raise_amt", [2, 6]).tolist() == [2.0, 6.0]
+    assert expand("raise_amt", {"min": 2, "max": 10, "steps": 5}).tolist() == [2.0, 4.0, 6.0, 8.0, 10.0]
+
+
+@pytest.mark.parametrize("spec", ["ten", [1, "x"], [], {"min": 0}, {"min": 0, "max": "inf"},
+                                  {"min": 0, "max": 1, "steps": -1}, {"min": 0, "max": 1, "steps": 10 ** 9}])
+def test_expand_rejects(spec):
+    with pytest.raises(ScenarioError):
+        expand("raise_amt", spec)
+
+
+def test_grid_shape_follows_params():
+    base = Baseline(cash=10, revenue_mo=0.5, net_burn_mo=1.0)
+    res = run_grid(base, {"raise_amt": [2, 4, 6], "churn_mo": {"min": 0, "max": 0.04, "steps": 5}})
+    shape = tuple(3 if p == "raise_amt" else 5 if p == "churn_mo" else 1 for p in PARAMS)
+    assert tuple(res["shape"]) == shape
+    assert all(g.shape == shape for g in res["grids"].values())
+
+
+def test_grid_over_the_cell_limit():
+    with pytest.raises(ScenarioError):
+        run_grid(Baseline(), {"raise_amt": {"min": 1, "max": 2, "steps": 100},
+                              "pre_money": {"min": 1, "max": 2, "steps": 100}}, max_cells=5000)
+    with pytest.raises(ScenarioError):
+        run_grid(Baseline(), 5)
+
+
+def _simulated_runway(cash, burn, growth, months=2000):
+    for n in range(months):
+        month = burn * (1 + growth) ** n
+        if month >= cash:
+            return n + cash / month
+        cash -= month
+    return math.inf
+
+
+@pytest.mark.parametrize("cash,burn,growth", [(100, 10, 0.0), (100, 10, 0.03), (50, 4, 0.1), (80, 10, -0.01)])
+def test_runway_closed_form_matches_simulation(cash, burn, growth):
+    closed = float(finmath.runway_months(cash, burn, growth))
+    assert closed == pytest.approx(_simulated_runway(cash, burn, growth), abs=0.15)
+
+
+def test_runway_never_exhausted_is_inf():
+    n = finmath.runway_months(100, [10, 0], [-0.2, 0.0])
+    assert np.isinf(n).all()
+    assert finmath.zero_cash_date(float(n[0])) is None
@@ -0,0 +1,42 @@
+# tests/test_scoring.py
+"""Deterministic scoring (tools/scoring.py)."""
+import pytest
+
+from config import INR_CR_PER_USD_M
+from tools.scoring import MAX_RISK_PENALTY, extract_features, score_features
+
+
+def test_revenue_units_and_annual_to_monthly():
+    f = extract_features({"traction": [{"metric": "ARR", "value": "$1.2M"}]}, {})
+    assert f["revenue_mo"] == pytest.approx(1.2 * INR_CR_PER_USD_M / 12, abs=1e-4)
+    f = extract_features({"traction": [{"metric": "Monthly revenue", "value": "₹ 2 Cr"}]}, {})
+    assert f["revenue_mo"] == pytest.approx(2.0)
+
+
+def test_annual_growth_becomes_monthly_compound_rate():
+    f = extract_features({"traction": [{"metric": "Revenue growth YoY", "value": "100%"}]}, {})
+    assert f["growth_mo_pct"] == pytest.approx((2 ** (1 / 12) - 1) * 100, abs=1e-3)
+    f = extract_features({"traction": [{"metric": "MoM growth", "value": "8%"}]}, {})
+    assert f["growth_mo_pct"] == pytest.approx(8.0)
+
+
+def test_unit_economics_units():
+    f = extract_features({"unit_economics": [{"metric": "LTV:CAC", "value": "3.1x"},
+                                             {"metric": "CAC payback", "value": "18 months"},
+                                             {"metric": "Gross margin", "value": "40%"}]}, {})
+    assert (f["ltv_cac"], f["cac_payback_mo"], f["gross_margin_pct"]) == (3.1, 18.0, 40.0)
+
+
+def test_risk_penalty_is_capped():
+    risks = [{"severity": "high"}] * 10 + [{"severity": "medium"}] * 5
+    feats = extract_features({}, {"checks": [{"claim": "revenue", "status": "refuted"}]}, risks)
+    result = score_features(feats)
+    assert result["risk_penalty"] == MAX_RISK_PENALTY
+    assert result["total"] >= 0
+
+
+def test_total_is_weighted_mean_minus_penalty():
+    feats = extract_features({}, {}, [{"severity": "medium"}])
+    result = score_features(feats, {"founders": 1, "traction": 0, "unit_econ": 0, "market": 0})
+    assert result["total"] == pytest.approx(result["breakdown"]["founders"] - 3.0)
+    assert sum(result["weights"].values()) == pytest.approx(1.0)
@@ -0,0 +1,27 @@
+# tests/test_urls.py
+"""URL canonicalisation and registrable domains (tools/urls.py)."""
+import pytest
+
+from tools.urls import canonical_url, registrable_domain
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("http://www.x.com/a/amp/?utm_source=t&id=3#top", "https://x.com/a?id=3"),
+    ("HTTP://X.com:80/a/#f", "https://x.com/a"),
+    ("https://m.x.com/a?b=2&a=1&fbclid=9", "https://x.com/a?a=1&b=2"),
+    ("https://www-x-com.cdn.ampproject.org/c/s/www.x.com/story", "https://x.com/story"),
+    ("https://github.com/org/repo/tree/x?ref=v1.2", "https://github.com/org/repo/tree/x?ref=v1.2"),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+@pytest.mark.parametrize("host,expected", [
+    ("www.sec.gov", "sec.gov"),
+    ("edgar.sec.gov", "sec.gov"),
+    ("foo.gov.in", "foo.gov.in"),
+    ("a.b.example.co.uk", "example.co.uk"),
+    ("https://edgar.sec.gov/x", "sec.gov"),
+])
+def test_registrable_domain(host, expected):
+    assert registrable_domain(host) == expected
@@ -0,0 +1,73 @@
+# tools/bm25.py
+"""
+Okapi BM25 over a fixed list of texts (numpy, no extra dependency).
+
+Agent queries are mostly keyword lists ("TAM SAM SOM CAC LTV churn GM revenue
+runway"), which dense embeddings rank poorly; exact term matches find the
+metric tables. The index is an inverted list per term (document ids and term
+frequencies as arrays), so a query touches only the postings of its terms:
+
+    bm = BM25Index(texts)
+    ids, scores = bm.search("cac ltv churn", k=10, mask=None)   # best first, scores > 0 only
+"""
+from __future__ import annotations
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from config import BM25_K1, BM25_B
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.%][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+class BM25Index:
+    def __init__(self, texts: Sequence[str], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1, self.b = k1, b
+        self.n = len(texts)
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = []
+        for i, t in enumerate(texts):
+            counts = Counter(tokenize(t))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                ids, tfs = postings.setdefault(term, ([], []))
+                ids.append(i); tfs.append(tf)
+        self.doc_len = np.asarray(lengths, dtype=np.float32)
+        avg = float(self.doc_len.mean()) if self.n else 0.0
+        # per-document length normalisation, folded into one array up front
+        self._norm = k1 * (1.0 - b + b * self.doc_len / (avg or 1.0))
+        self._postings = {
+            term: (np.asarray(ids, dtype=np.int32), np.asarray(tfs, dtype=np.float32),
+                   math.log(1.0 + (self.n - len(ids) + 0.5) / (len(ids) + 0.5)))
+            for term, (ids, tfs) in postings.items()
+        }
+
+    def scores(self, query: str):
+        """BM25 score of every document for the query (float32 array of length n)."""
+        out = np.zeros(self.n, dtype=np.float32)
+        for term in set(tokenize(query)):
+            p = self._postings.get(term)
+            if p is None:
+                continue
+            ids, tfs, idf = p
+            out[ids] += idf * tfs * (self.k1 + 1.0) / (tfs + self._norm[ids])
+        return out
+
+    def search(self, query: str, k: int = 10, mask=None):
+        """(ids, scores) of the top-k matching documents; `mask` (bool array) restricts candidates."""
+        s = self.scores(query)
+        if mask is not None:
+            s = np.where(mask, s, 0.0)
+        hits = np.flatnonzero(s > 0)
+        if hits.size > k:
+            hits = hits[np.argpartition(-s[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-s[hits], kind="stable")]
+        return hits, s[hits]
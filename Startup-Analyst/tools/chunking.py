@@ -0,0 +1,121 @@
+# tools/chunking.py
+"""
+Structure-aware chunking for the deck index.
+
+Loaders already hand over documents along the deck's structure, so chunks
+follow it instead of a fixed character window:
+
+    - "docai_ocr" pages (one per slide): the whole page is one chunk; a page
+      longer than max_chars is packed by paragraph.
+    - "docai_table": one chunk per table; an oversized table is split by rows
+      with the header line repeated in every part, never mid-row.
+    - "url" sections (load_url splits HTML on h1-h3): one chunk per section,
+      tiny sections merged into the next one of the same page.
+    - anything else (docx, text): paragraphs packed up to max_chars.
+
+Every chunk carries metadata["chunk_id"], a hash of its source and text, so
+the same chunk gets the same id across runs (for caching embeddings and
+answers), plus "part" when its unit had to be split.
+"""
+from __future__ import annotations
+import hashlib
+import re
+from typing import List
+
+from config import CHUNK_MAX_CHARS, CHUNK_MIN_CHARS
+
+_PARA = re.compile(r"\n\s*\n")
+
+
+def chunk_id(source: str, text: str) -> str:
+    return hashlib.sha1(f"{source}\x00{text}".encode("utf-8")).hexdigest()[:16]
+
+
+def _hard_split(text: str, max_chars: int, overlap: int) -> List[str]:
+    """Split one oversized paragraph at whitespace, with `overlap` chars carried over."""
+    out, i = [], 0
+    while i < len(text):
+        j = min(len(text), i + max_chars)
+        if j < len(text):
+            cut = text.rfind(" ", i + max_chars // 2, j)
+            j = cut if cut > 0 else j
+        out.append(text[i:j].strip())
+        if j >= len(text):
+            break
+        i = max(j - overlap, i + 1)
+        sp = text.find(" ", i, j)
+        i = sp + 1 if sp >= 0 else i          # start the overlap on a word boundary
+    return [p for p in out if p]
+
+
+def pack(pieces: List[str], max_chars: int, overlap: int = 0, sep: str = "\n\n") -> List[str]:
+    """Greedily join pieces up to max_chars; a piece that is too long on its own is hard-split."""
+    out: List[str] = []
+    cur = ""
+    for p in pieces:
+        p = p.strip()
+        if not p:
+            continue
+        if len(p) > max_chars:
+            if cur:
+                out.append(cur); cur = ""
+            # OCR text often has no blank lines: fall back to lines, then to whitespace
+            out.extend(pack(p.split("\n"), max_chars, overlap, sep="\n") if sep != "\n" and "\n" in p
+                       else _hard_split(p, max_chars, overlap))
+            continue
+        if cur and len(cur) + len(sep) + len(p) > max_chars:
+            out.append(cur); cur = p
+        else:
+            cur = f"{cur}{sep}{p}" if cur else p
+    if cur:
+        out.append(cur)
+    return out
+
+
+def _table_parts(text: str, max_chars: int) -> List[str]:
+    lines = text.split("\n")
+    if len(text) <= max_chars or len(lines) < 3:
+        return [text]
+    header, body = lines[0], lines[1:]
+    return [f"{header}\n{part}" for part in pack(body, max_chars - len(header) - 1, sep="\n")]
+
+
+def chunk_documents(docs, max_chars: int = CHUNK_MAX_CHARS, overlap: int = 200):
+    """langchain Documents -> chunk Documents (see module docstring)."""
+    from langchain.schema import Document
+
+    out = []
+    pending = None                       # a short url section waiting to be merged into the next one
+
+    def emit(doc, parts: List[str]):
+        for k, text in enumerate(parts):
+            md = {**doc.metadata, "chunk_id": chunk_id(str(doc.metadata.get("source", "")), text)}
+            if len(parts) > 1:
+                md["part"] = k
+            out.append(Document(page_content=text, metadata=md))
+
+    for d in docs:
+        text = (d.page_content or "").strip()
+        if not text:
+            continue
+        loader = d.metadata.get("loader")
+        if pending is not None and not (loader == "url" and d.metadata.get("source") == pending.metadata.get("source")):
+            emit(pending, [pending.page_content]); pending = None
+        if loader == "docai_table":
+            emit(d, _table_parts(text, max_chars))
+        elif loader == "url":
+            if pending is not None:
+                text = f"{pending.page_content}\n\n{text}"
+                d = Document(page_content=text, metadata=pending.metadata)
+                pending = None
+            if len(text) < CHUNK_MIN_CHARS:
+                pending = Document(page_content=text, metadata=d.metadata)
+                continue
+            emit(d, pack(_PARA.split(text), max_chars, overlap))
+        elif loader == "docai_ocr" and len(text) <= max_chars:
+            emit(d, [text])
+        else:
+            emit(d, pack(_PARA.split(text), max_chars, overlap))
+    if pending is not None:
+        emit(pending, [pending.page_content])
+    return out
@@ -0,0 +1,239 @@
+# tools/claim_store.py
+"""
+Claim verification memo (SQLite + an in-memory embedding matrix).
+
+DeepResearchAgent.verify keeps every verdict it produces here, keyed on a
+normalized claim: amounts in canonical units ('$100B' == 'USD 100 billion'),
+lower case, stop words dropped, light suffix stemming. A claim that misses on the
+exact key is matched against earlier claims by embedding cosine similarity, but
+only when both carry the same amounts, so '$10B market' never reuses the verdict
+for '$100B market'.
+
+Claims are scoped: market / industry claims ("Indian D2C market is $100B") are
+shared across every deal, anything else only across runs of the same company.
+Verdicts are fresh for CLAIM_TTL_DAYS (CLAIM_UNKNOWN_TTL_DAYS for 'unknown', so
+claims that lacked evidence are retried sooner); stale ones are re-verified and
+overwritten.
+
+    store = get_store()
+    hits = store.lookup(["Indian D2C market is $100B"], company="acme")   # {index: check}
+    store.put(checks, company="acme")
+"""
+from __future__ import annotations
+import hashlib, json, pathlib, re, sqlite3, threading, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import CLAIMS_DB, CLAIM_TTL_DAYS, CLAIM_UNKNOWN_TTL_DAYS, CLAIM_NEAR_DUP_SIM
+from tools.extractors import canonical_amounts
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims(
+    scope     TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    claim     TEXT NOT NULL,
+    norm      TEXT NOT NULL,
+    nums      TEXT NOT NULL,
+    status    TEXT,
+    rationale TEXT,
+    evidence  TEXT,
+    checked   REAL NOT NULL,
+    vec       BLOB,
+    PRIMARY KEY(scope, key)
+);
+"""
+
+MARKET_SCOPE = "market"
+
+_STOP = frozenset(
+    "a an the is are was were be been being of in on at to for by with from and or as that this these those "
+    "its it their our we has have had will would can could than then about over per into".split())
+_MARKET = re.compile(r"\b(?:market|industry|sector|tam|sam|som|cagr|penetration|segment)\b", re.I)
+_OWN = re.compile(r"\b(?:we|our|us|company|startup|founders?|ceo|cto|team|customers|revenue|arr|mrr|"
+                  r"raised|raising|burn|runway)\b", re.I)
+_TOKEN = re.compile(r"[a-z0-9_.]+")
+
+
+def _stem(w: str) -> str:
+    if any(ch.isdigit() for ch in w) or len(w) <= 3:
+        return w
+    for suf, rep in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if w.endswith(suf) and len(w) - len(suf) >= 3:
+            return w[: len(w) - len(suf)] + rep
+    return w
+
+
+def normalize(claim: str) -> Tuple[str, str]:
+    """(normalized text, its amounts as a sorted space-joined signature)."""
+    text = canonical_amounts(claim).lower()
+    toks = [_stem(t.strip(".")) for t in _TOKEN.findall(text)]
+    toks = [t for t in toks if t and t not in _STOP]
+    nums = sorted({t for t in toks if t[0].isdigit()})
+    return " ".join(toks), " ".join(nums)
+
+
+def claim_scope(claim: str, company: Optional[str]) -> Optional[str]:
+    """MARKET_SCOPE for company-independent market claims, else the company; None when unscoped."""
+    if _MARKET.search(claim) and not _OWN.search(claim):
+        return MARKET_SCOPE
+    c = " ".join((company or "").lower().split())
+    return f"co:{c}" if c else None
+
+
+def _key(norm: str) -> str:
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
+class ClaimStore:
+    def __init__(self, db_path: str | pathlib.Path = CLAIMS_DB, embed=None):
+        self.db_path = str(db_path)
+        pathlib.Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+        self._embed = embed
+        self._lock = threading.Lock()
+        # scope -> (keys, nums, unit-norm float32 matrix); loaded on first near-dup lookup
+        self._vecs: Dict[str, Tuple[List[str], List[str], Any]] = {}
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.db_path, timeout=30)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    # --- embeddings ---------------------------------------------------------------
+    def _embed_texts(self, texts: Sequence[str]):
+        """Unit-norm float32 rows, or None when no embedding backend is available."""
+        if not texts:
+            return None
+        try:
+            if self._embed is None:
+                from tools.vectorstore import _get_embeddings
+                self._embed = _get_embeddings().embed_documents
+            m = np.asarray(self._embed(list(texts)), dtype=np.float32)
+        except Exception:
+            return None
+        if m.ndim != 2 or m.shape[0] != len(texts):
+            return None
+        return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+    def _scope_vecs(self, scope: str):
+        with self._lock:
+            if scope not in self._vecs:
+                keys, nums, rows = [], [], []
+                for k, n, v in self._conn().execute(
+                        "SELECT key, nums, vec FROM claims WHERE scope=? AND vec IS NOT NULL", (scope,)):
+                    keys.append(k); nums.append(n); rows.append(np.frombuffer(v, dtype=np.float32))
+                dim = {r.size for r in rows}
+                mat = np.vstack(rows) if len(dim) == 1 else None
+                self._vecs[scope] = (keys, nums, mat) if mat is not None else ([], [], None)
+            return self._vecs[scope]
+
+    # --- reads ----------------------------------------------------------------------
+    @staticmethod
+    def _fresh(status: Optional[str], checked: float, now: float) -> bool:
+        ttl = CLAIM_UNKNOWN_TTL_DAYS if (status or "unknown") == "unknown" else CLAIM_TTL_DAYS
+        return now - checked <= ttl * 86400
+
+    def _row(self, scope: str, key: str, now: float) -> Optional[dict]:
+        r = self._conn().execute(
+            "SELECT claim, status, rationale, evidence, checked FROM claims WHERE scope=? AND key=?",
+            (scope, key)).fetchone()
+        if r is None or not self._fresh(r[1], r[4], now):
+            return None
+        return {"claim": r[0], "status": r[1], "rationale": r[2], "evidence": json.loads(r[3] or "[]"),
+                "checked": time.strftime("%Y-%m-%d", time.gmtime(r[4]))}
+
+    def lookup(self, claims: Sequence[str], company: Optional[str] = None) -> Dict[int, dict]:
+        """
+        Fresh verdicts for the claims that have one, by index in `claims`: exact
+        normalized match first, then one batched embedding call for the misses.
+        Each hit is returned for the claim as asked, with "cached" set to how it matched.
+        """
+        now = time.time()
+        hits: Dict[int, dict] = {}
+        misses: List[Tuple[int, str, str]] = []
+        for i, c in enumerate(claims):
+            scope = claim_scope(c, company)
+            if scope is None:
+                continue
+            norm, nums = normalize(c)
+            row = self._row(scope, _key(norm), now)
+            if row is not None:
+                hits[i] = {**row, "claim": c, "cached": "exact"}
+            else:
+                misses.append((i, scope, nums))
+        misses = [m for m in misses if self._scope_vecs(m[1])[2] is not None]
+        if misses:
+            q = self._embed_texts([claims[i] for i, _, _ in misses])
+            for j, (i, scope, nums) in enumerate(misses if q is not None else []):
+                keys, key_nums, mat = self._scope_vecs(scope)
+                if mat.shape[1] != q.shape[1]:
+                    continue
+                sims = mat @ q[j]
+                for k in np.argsort(-sims)[:5]:
+                    if sims[k] < CLAIM_NEAR_DUP_SIM:
+                        break
+                    if key_nums[k] != nums:
+                        continue                  # same wording, different numbers: not the same claim
+                    row = self._row(scope, keys[k], now)
+                    if row is not None:
+                        hits[i] = {**row, "claim": claims[i], "cached": "similar", "matched": row["claim"]}
+                        break
+        return hits
+
+    # --- writes ---------------------------------------------------------------------
+    def put(self, checks: Sequence[dict], company: Optional[str] = None) -> int:
+        """Store fresh verdicts ({"claim", "status", "rationale", "evidence"}); returns how many."""
+        rows = []
+        for ch in checks:
+            claim = str((ch or {}).get("claim") or "").strip()
+            scope = claim_scope(claim, company) if claim else None
+            if scope is None or not ch.get("status"):
+                continue
+            norm, nums = normalize(claim)
+            rows.append((scope, _key(norm), claim, norm, nums, str(ch["status"]).lower(),
+                         str(ch.get("rationale") or ""), json.dumps(ch.get("evidence") or [], ensure_ascii=False)))
+        if not rows:
+            return 0
+        vecs = self._embed_texts([r[2] for r in rows])
+        now = time.time()
+        c = self._conn()
+        with c:
+            c.executemany(
+                "INSERT OR REPLACE INTO claims(scope, key, claim, norm, nums, status, rationale, evidence, checked, vec) "
+                "VALUES (?,?,?,?,?,?,?,?,?,?)",
+                [(*r, now, vecs[i].tobytes() if vecs is not None else None) for i, r in enumerate(rows)])
+        with self._lock:
+            for i, r in enumerate(rows):
+                scope = r[0]
+                if scope not in self._vecs or vecs is None:
+                    continue
+                keys, nums, mat = self._vecs[scope]
+                if r[1] in keys:
+                    mat[keys.index(r[1])] = vecs[i]
+                elif mat is None or mat.shape[1] == vecs.shape[1]:
+                    keys.append(r[1]); nums.append(r[4])
+                    self._vecs[scope] = (keys, nums, vecs[i:i + 1] if mat is None else np.vstack([mat, vecs[i:i + 1]]))
+        return len(rows)
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+
+
+_store: Optional[ClaimStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> ClaimStore:
+    """Process-wide store, shared by every Orchestrator (and worker thread)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ClaimStore()
+    return _store
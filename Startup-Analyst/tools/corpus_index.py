@@ -0,0 +1,357 @@
+# tools/corpus_index.py
+"""
+Portfolio-wide chunk index: every chunk of every deck ever ingested.
+
+Each run's chunks are appended as they are indexed (Orchestrator -> add_run),
+reusing the embeddings the run's own FAISS store already computed:
+
+    CORPUS_INDEX_DIR/vectors.f16   raw unit-norm vectors, float16, append-only (row i = chunk i)
+    CORPUS_INDEX_DIR/meta.sqlite   row -> chunk_id, run_id, company, source, page, zlib text
+    CORPUS_INDEX_DIR/index.faiss   compact FAISS index over rows [0, ntotal), rebuilt/saved on demand
+
+Appends only touch the first two (under a file lock, so several workers can
+share a corpus). Whoever searches loads index.faiss - memory-mapped when
+possible - and adds the rows appended since it was saved, so the index never
+lags the log. Below CORPUS_TRAIN_MIN rows the index is exact (Flat); past it the
+configured CORPUS_INDEX_KIND is trained on a sample of the log:
+
+    "ivfpq"    IVF + product quantisation: ~CORPUS_PQ_M bytes per vector, the 1M+ option
+    "hnsw_sq"  HNSW graph over 8-bit scalar-quantised vectors: faster, ~dim bytes per vector
+    "flat"     exact inner product
+
+Candidates are re-ranked exactly against the float16 log (CORPUS_RERANK x k
+rows read through a memmap), which recovers most of the recall quantisation
+loses. Refresh and inspect from the command line:
+
+    python -m tools.corpus_index --build [--kind hnsw_sq]   # retrain + save
+    python -m tools.corpus_index --update                   # add appended rows + save
+    python -m tools.corpus_index --search "UPI merchant payments CAC" [--k 10]
+    python -m tools.corpus_index --stats
+
+bench/corpus_index.py measures recall@k against exact search and per-query
+latency for each kind.
+"""
+from __future__ import annotations
+import argparse, json, math, os, pathlib, sqlite3, threading, time, zlib
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import (CORPUS_INDEX_DIR, CORPUS_INDEX_KIND, CORPUS_TRAIN_MIN, CORPUS_TRAIN_SAMPLE,
+                    CORPUS_PQ_M, CORPUS_NPROBE, CORPUS_EF_SEARCH, CORPUS_RERANK)
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+faiss = lazy_import("faiss")
+
+try:
+    import fcntl
+except ImportError:          # Windows: in-process locking only
+    fcntl = None
+
+KINDS = ("flat", "ivfpq", "hnsw_sq")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info(key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS chunks(
+    row      INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL,
+    run_id   TEXT,
+    company  TEXT,
+    source   TEXT,
+    page     INTEGER,
+    text     BLOB
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_chunks_chunk_id ON chunks(chunk_id);
+CREATE INDEX IF NOT EXISTS idx_chunks_company ON chunks(company);
+"""
+
+
+def factory(kind: str, n: int, dim: int) -> str:
+    """FAISS factory string for `kind` sized for n vectors."""
+    if kind == "ivfpq":
+        nlist = int(min(65536, max(16, 2 ** round(math.log2(4 * math.sqrt(max(n, 1)))))))
+        m = max(d for d in range(1, min(CORPUS_PQ_M, dim) + 1) if dim % d == 0)
+        return f"IVF{nlist},PQ{m}"
+    if kind == "hnsw_sq":
+        return "HNSW32,SQ8"
+    return "Flat"
+
+
+class CorpusIndex:
+    def __init__(self, root: str | pathlib.Path = CORPUS_INDEX_DIR, kind: str = CORPUS_INDEX_KIND):
+        if kind not in KINDS:
+            raise ValueError(f"unknown index kind {kind!r}; expected one of {KINDS}")
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.kind = kind
+        self.vec_path = self.root / "vectors.f16"
+        self.index_path = self.root / "index.faiss"
+        self.lock_path = self.root / ".lock"
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+        self._mu = threading.RLock()
+        self._index = None
+        self._index_kind = None          # kind of the loaded index ("flat" until trained)
+        self._writable = False
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(str(self.root / "meta.sqlite"), timeout=30)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a+") as lf:
+            if fcntl:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+    # --- the log ------------------------------------------------------------------
+    @property
+    def dim(self) -> Optional[int]:
+        r = self._conn().execute("SELECT value FROM info WHERE key='dim'").fetchone()
+        return int(r[0]) if r else None
+
+    def rows(self) -> int:
+        d = self.dim
+        try:
+            return os.stat(self.vec_path).st_size // (2 * d) if d else 0
+        except FileNotFoundError:
+            return 0
+
+    def _vectors(self):
+        n, d = self.rows(), self.dim
+        return np.memmap(self.vec_path, dtype=np.float16, mode="r", shape=(n, d)) if n else None
+
+    def add(self, vectors, metas: Sequence[Dict[str, Any]]) -> int:
+        """
+        Append chunks (one meta dict per vector: chunk_id, run_id, company, source,
+        page, text); chunks already in the corpus are skipped. Returns rows added.
+        """
+        v = np.asarray(vectors, dtype=np.float32)
+        if v.ndim != 2 or v.shape[0] != len(metas) or not len(metas):
+            return 0
+        v /= np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+        c = self._conn()
+        with self._file_lock():
+            d = self.dim
+            if d is None:
+                with c:
+                    c.execute("INSERT INTO info(key, value) VALUES ('dim', ?)", (str(v.shape[1]),))
+                d = v.shape[1]
+            if v.shape[1] != d:
+                raise ValueError(f"corpus vectors have dim {d}, got {v.shape[1]}")
+            ids = [str(m["chunk_id"]) for m in metas]
+            known = set()
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                known.update(r[0] for r in c.execute(
+                    f"SELECT chunk_id FROM chunks WHERE chunk_id IN ({','.join('?' * len(part))})", part))
+            keep, seen = [], set(known)
+            for i, cid in enumerate(ids):
+                if cid not in seen:
+                    seen.add(cid); keep.append(i)
+            if not keep:
+                return 0
+            row0 = self.rows()
+            with open(self.vec_path, "ab") as f:
+                f.write(v[keep].astype(np.float16).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with c:
+                c.executemany(
+                    "INSERT INTO chunks(row, chunk_id, run_id, company, source, page, text) VALUES (?,?,?,?,?,?,?)",
+                    [(row0 + j, ids[i], metas[i].get("run_id"), (metas[i].get("company") or "").strip().lower(),
+                      metas[i].get("source"), metas[i].get("page"),
+                      zlib.compress(str(metas[i].get("text") or "").encode("utf-8"), 6))
+                     for j, i in enumerate(keep)])
+        return len(keep)
+
+    def add_run(self, vs, run_id: str, company: str) -> int:
+        """Append a run's chunks, reusing the vectors already in its per-run FAISS store."""
+        splits = getattr(vs, "splits", None)
+        flat = getattr(getattr(vs, "dense", vs), "index", None)
+        if not splits or flat is None or flat.ntotal != len(splits):
+            return 0
+        vecs = flat.reconstruct_n(0, flat.ntotal)
+        metas = [{"chunk_id": d.metadata.get("chunk_id") or f"{run_id}:{i}", "run_id": run_id, "company": company,
+                  "source": d.metadata.get("source"), "page": d.metadata.get("page"), "text": d.page_content}
+                 for i, d in enumerate(splits)]
+        return self.add(vecs, metas)
+
+    # --- the index ----------------------------------------------------------------
+    def build(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """(Re)train the index over the whole log and save it."""
+        with self._mu:
+            kind = kind or self.kind
+            n, d = self.rows(), self.dim
+            if not n:
+                return {"rows": 0}
+            t0 = time.perf_counter()
+            vecs = self._vectors()
+            if kind != "flat" and n < CORPUS_TRAIN_MIN:
+                kind = "flat"                            # too few rows to train a quantiser
+            index = faiss.index_factory(d, factory(kind, n, d), faiss.METRIC_INNER_PRODUCT)
+            if kind == "ivfpq":
+                # polysemous codes only serve Hamming pre-filtering, which search never uses,
+                # and training them is ~90% of the build time
+                faiss.downcast_index(faiss.extract_index_ivf(index)).do_polysemous_training = False
+            if not index.is_trained:
+                rng = np.random.default_rng(0)
+                sample = np.sort(rng.choice(n, size=min(n, CORPUS_TRAIN_SAMPLE), replace=False))
+                index.train(np.asarray(vecs[sample], dtype=np.float32))
+            for lo in range(0, n, 65536):
+                index.add(np.asarray(vecs[lo:lo + 65536], dtype=np.float32))
+            self._index, self._index_kind, self._writable = index, kind, True
+            self.save()
+            return {"rows": n, "kind": kind, "factory": factory(kind, n, d),
+                    "seconds": round(time.perf_counter() - t0, 2), "bytes": os.path.getsize(self.index_path)}
+
+    def save(self):
+        with self._mu:
+            if self._index is None:
+                return
+            tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            faiss.write_index(self._index, str(tmp))
+            os.replace(tmp, self.index_path)
+            with open(self.root / "index.json", "w", encoding="utf-8") as f:
+                json.dump({"kind": self._index_kind, "ntotal": int(self._index.ntotal), "saved": time.time()}, f)
+
+    def load(self, mmap: bool = True):
+        """Load index.faiss (memory-mapped unless rows must be added), then catch up with the log."""
+        with self._mu:
+            if not self.index_path.exists():
+                self.build()
+                return self._index
+            try:
+                meta = json.loads((self.root / "index.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                meta = {}
+            pending = self.rows() - int(meta.get("ntotal", -1))
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap and pending == 0 else 0
+            try:
+                self._index = faiss.read_index(str(self.index_path), flags)
+            except RuntimeError:
+                self._index = faiss.read_index(str(self.index_path))
+                flags = 0
+            self._index_kind, self._writable = meta.get("kind") or self.kind, not flags
+            self._catch_up()
+            return self._index
+
+    def _catch_up(self):
+        n = self.rows()
+        if self._index is None or self._index.ntotal >= n:
+            return
+        if self._index_kind == "flat" and self.kind != "flat" and n >= CORPUS_TRAIN_MIN:
+            self.build()                 # enough rows to train the configured kind
+            return
+        if not self._writable:
+            self._index = faiss.read_index(str(self.index_path))
+            self._writable = True
+        vecs = self._vectors()
+        for lo in range(self._index.ntotal, n, 65536):
+            self._index.add(np.asarray(vecs[lo:min(n, lo + 65536)], dtype=np.float32))
+
+    def _tune(self, nprobe: Optional[int], ef: Optional[int]):
+        ps = faiss.ParameterSpace()
+        if self._index_kind == "ivfpq":
+            ps.set_index_parameter(self._index, "nprobe", int(nprobe or CORPUS_NPROBE))
+        elif self._index_kind == "hnsw_sq":
+            ps.set_index_parameter(self._index, "efSearch", int(ef or CORPUS_EF_SEARCH))
+
+    def search(self, queries, k: int = 10, nprobe: Optional[int] = None, ef: Optional[int] = None,
+               rerank: int = CORPUS_RERANK, with_meta: bool = True) -> List[List[Dict[str, Any]]]:
+        """Top-k chunks per query vector: [{"row", "score", and the chunk's metadata}]."""
+        with self._mu:
+            if self._index is None:
+                self.load()
+            else:
+                self._catch_up()
+            if self._index is None:
+                return [[] for _ in range(len(queries))]
+            q = np.asarray(queries, dtype=np.float32).reshape(-1, self._index.d)
+            q /= np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+            self._tune(nprobe, ef)
+            fetch = k * rerank if rerank and self._index_kind != "flat" else k
+            scores, rows = self._index.search(q, fetch)
+        if fetch > k:
+            vecs = self._vectors()
+            for i in range(len(q)):
+                cand = rows[i][rows[i] >= 0]
+                exact = np.asarray(vecs[np.sort(cand)], dtype=np.float32) @ q[i]
+                order = np.argsort(-exact)[:k]
+                rows[i, :k], scores[i, :k] = np.sort(cand)[order], exact[order]
+                rows[i, len(order):k] = -1
+        out = []
+        for i in range(len(q)):
+            hits = [(int(r), float(s)) for r, s in zip(rows[i, :k], scores[i, :k]) if r >= 0]
+            out.append([{"row": r, "score": round(s, 4), **(self.meta(r) if with_meta else {})} for r, s in hits])
+        return out
+
+    def search_text(self, query: str, k: int = 10, company: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Embed the query with the pipeline's embeddings and search; optionally one company's chunks."""
+        from tools.vectorstore import _get_embeddings
+        qv = _get_embeddings().embed_query(query)
+        hits = self.search([qv], k=k * 4 if company else k)[0]
+        if company:
+            hits = [h for h in hits if h.get("company") == company.strip().lower()][:k]
+        return hits
+
+    def meta(self, row: int) -> Dict[str, Any]:
+        r = self._conn().execute("SELECT chunk_id, run_id, company, source, page, text FROM chunks WHERE row=?",
+                                 (row,)).fetchone()
+        if r is None:
+            return {}
+        return {"chunk_id": r[0], "run_id": r[1], "company": r[2], "source": r[3], "page": r[4],
+                "text": zlib.decompress(r[5]).decode("utf-8") if r[5] else ""}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rows": self.rows(), "dim": self.dim, "kind": self.kind,
+                "index_bytes": os.path.getsize(self.index_path) if self.index_path.exists() else 0,
+                "vector_bytes": os.path.getsize(self.vec_path) if self.vec_path.exists() else 0,
+                "companies": self._conn().execute("SELECT COUNT(DISTINCT company) FROM chunks").fetchone()[0]}
+
+
+_index: Optional[CorpusIndex] = None
+_index_lock = threading.Lock()
+
+def get_corpus_index() -> CorpusIndex:
+    """Process-wide corpus index (the FAISS part is loaded on first search)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CorpusIndex()
+    return _index
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Portfolio-wide chunk index")
+    ap.add_argument("--build", action="store_true", help="retrain the index over the whole corpus and save it")
+    ap.add_argument("--update", action="store_true", help="add rows appended since the last save and save")
+    ap.add_argument("--kind", choices=KINDS, default=CORPUS_INDEX_KIND)
+    ap.add_argument("--search", default=None, metavar="QUERY")
+    ap.add_argument("--company", default=None)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--stats", action="store_true")
+    args = ap.parse_args()
+
+    ci = CorpusIndex(kind=args.kind)
+    if args.build:
+        print(json.dumps(ci.build(), indent=2))
+    elif args.update:
+        ci.load(mmap=False)
+        ci.save()
+    if args.search:
+        for h in ci.search_text(args.search, k=args.k, company=args.company):
+            print(f"{h['score']:.3f}  {h['company']:<20} p{h['page']}  {h['text'][:100]!r}")
+    if args.stats or not (args.build or args.update or args.search):
+        print(json.dumps(ci.stats(), indent=2))
@@ -1,11 +1,15 @@
 # tools/docai_ocr.py
 from __future__ import annotations
 
-from typing import Tuple, Optional, List
-import re
-import fitz  # PyMuPDF
-from google.cloud import documentai
+from typing import Iterator, Tuple, Optional, List, Sequence
+import mmap, re
 from config import DOCAI_PROJECT, DOCAI_LOCATION, DOCAI_PROCESSOR
+from tools.extractors import build_table
+from tools.tracing import span
+from tools.lazy import lazy_import
+
+fitz = lazy_import("fitz")                          # PyMuPDF
+documentai = lazy_import("google.cloud.documentai")
 
 DOCAI_MAX_PAGES = 15
 MAX_DOC_BYTES   = 35_000_000
@@ -32,15 +36,31 @@ def _field_text(doc: documentai.Document, layout) -> str:
         parts.append(doc.text[start:end])
     return "".join(parts)
 
-def _ocr_page_text(doc: documentai.Document, page) -> str:
+def _segments(layout) -> List[Tuple[int, int]]:
+    anchor = getattr(layout, "text_anchor", None)
+    return [(s.start_index or 0, s.end_index or 0) for s in (anchor.text_segments if anchor else [])]
+
+def _ocr_page_text(doc: documentai.Document, page, skip_tables: Sequence = ()) -> str:
+    """
+    Page text from paragraphs plus table rows. Tables in `skip_tables` (indexed as
+    their own chunks) are left out, together with the paragraphs inside them.
+    """
     chunks: List[str] = []
+    spans = [seg for t in skip_tables for seg in _segments(t.layout)]
+
+    def in_table(layout) -> bool:
+        segs = _segments(layout)
+        return bool(segs) and all(any(a <= s and e <= b for a, b in spans) for s, e in segs)
 
     if getattr(page, "paragraphs", None):
         for par in page.paragraphs:
-            chunks.append(_field_text(doc, par.layout))
+            if not (spans and in_table(par.layout)):
+                chunks.append(_field_text(doc, par.layout))
 
     if getattr(page, "tables", None):
         for table in page.tables:
+            if spans and in_table(table.layout):
+                continue
             for row in getattr(table, "body_rows", []) or []:
                 cells = []
                 for cell in getattr(row, "cells", []) or []:
@@ -50,14 +70,29 @@ def _ocr_page_text(doc: documentai.Document, page) -> str:
 
     if not any(s.strip() for s in chunks) and getattr(page, "lines", None):
         for line in page.lines:
-            chunks.append(_field_text(doc, line.layout))
+            if not (spans and in_table(line.layout)):
+                chunks.append(_field_text(doc, line.layout))
 
     if not any(s.strip() for s in chunks) and getattr(page, "tokens", None):
-        chunks.append(" ".join(_field_text(doc, t.layout) for t in page.tokens))
+        chunks.append(" ".join(_field_text(doc, t.layout) for t in page.tokens
+                               if not (spans and in_table(t.layout))))
 
     chunks = [c for c in chunks if c and c.strip()]
     return _norm("\n".join(chunks))
 
+def _table_grids(doc: documentai.Document, page, page_no: int) -> List[Tuple[object, dict]]:
+    """
+    Document AI tables on a page as (table, cell-text grid) pairs; the grids are
+    what tools.extractors.tables_from_grids reads.
+    """
+    def rows(rs):
+        return [[_field_text(doc, c.layout).strip().replace("\n", " ") for c in (getattr(r, "cells", []) or [])]
+                for r in (rs or [])]
+    return [(t, {"page": page_no,
+                 "header_rows": rows(getattr(t, "header_rows", None)),
+                 "body_rows": rows(getattr(t, "body_rows", None))})
+            for t in (getattr(page, "tables", None) or [])]
+
 def _process_pdf_bytes(pdf_bytes: bytes) -> List[Tuple[str, Optional[float]]]:
     client = _client_once()
     name = client.processor_path(DOCAI_PROJECT, DOCAI_LOCATION, DOCAI_PROCESSOR)
@@ -68,75 +103,81 @@ def _process_pdf_bytes(pdf_bytes: bytes) -> List[Tuple[str, Optional[float]]]:
     result = client.process_document(request=request)
     return result  # caller will handle extraction
 
-def _pdf_to_chunks(pdf_bytes: bytes) -> list[bytes]:
-    src = fitz.open(stream=pdf_bytes, filetype="pdf")
-    blobs: list[bytes] = []
-    cur = fitz.open()
-    cur_pages = 0
-
-    def cur_bytes() -> bytes:
-        return cur.tobytes(deflate=True, garbage=3)
-
-    for i in range(len(src)):
-        cur.insert_pdf(src, from_page=i, to_page=i)
-        cur_pages += 1
-
-        too_many_pages = cur_pages > DOCAI_MAX_PAGES
-        too_big = False
-        if not too_many_pages:
-            try:
-                too_big = len(cur_bytes()) > MAX_DOC_BYTES
-            except Exception:
-                too_big = len(cur.tobytes()) > MAX_DOC_BYTES
-
-        if too_many_pages or too_big:
-            cur.delete_page(-1)
-            cur_pages -= 1
-            blobs.append(cur_bytes())
-            cur = fitz.open()
-            cur.insert_pdf(src, from_page=i, to_page=i)
-            cur_pages = 1
-
-    if cur_pages > 0:
-        blobs.append(cur_bytes())
-
-    cur.close()
-    src.close()
-    return blobs
-
-def docai_ocr_pdf_bytes(pdf_bytes: bytes) -> list[tuple[str, Optional[float]]]:
+def _pdf_to_chunks(src) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (first_page, chunk_pdf_bytes) DocAI requests of at most DOCAI_MAX_PAGES pages
+    and MAX_DOC_BYTES bytes, cut from one already-open document. Each chunk is
+    serialised once (an over-size chunk is halved and retried), and the generator
+    keeps no reference to a chunk after yielding it, so the caller can free it.
+    """
+    def cut(a: int, b: int) -> bytes:
+        out = fitz.open()
+        try:
+            out.insert_pdf(src, from_page=a, to_page=b - 1)
+            return out.tobytes(deflate=True, garbage=3)
+        finally:
+            out.close()
+
+    def split(a: int, b: int):
+        box = [cut(a, b)]
+        if len(box[0]) > MAX_DOC_BYTES and b - a > 1:
+            box.clear()
+            mid = (a + b) // 2
+            yield from split(a, mid)
+            yield from split(mid, b)
+        else:
+            yield a, box.pop()   # pop: don't pin the chunk in this frame
+
+    for a in range(0, len(src), DOCAI_MAX_PAGES):
+        yield from split(a, min(a + DOCAI_MAX_PAGES, len(src)))
+
+def docai_ocr_pdf_bytes(pdf_bytes: bytes | memoryview,
+                        tables: Optional[list] = None) -> list[tuple[str, Optional[float]]]:
     """
     Returns list of (page_text, None). For each page, we combine:
     - DocAI extracted text (paragraphs/tables/lines/tokens)
     - Native PyMuPDF text for the same page (as a fallback/merger)
+
+    `pdf_bytes` may be a memoryview over an mmap: PyMuPDF reads it in place, and the
+    same open document is used for chunking and for native text, so the deck is
+    never copied whole; only one serialised chunk is alive at a time.
+
+    If `tables` is a list, the cell grids of every DocAI-detected table are appended
+    to it (1-based "page", "header_rows", "body_rows") for tools.extractors. Tables
+    that parse as numeric tables (and so become their own chunks) are then left out
+    of the page text, so their rows are not indexed twice.
     """
+    if isinstance(pdf_bytes, mmap.mmap):
+        pdf_bytes = memoryview(pdf_bytes)
     pages_all: list[tuple[str, Optional[float]]] = []
-    # Keep a copy opened with fitz to pull native text by page
-    pdf_for_native = fitz.open(stream=pdf_bytes, filetype="pdf")
-    page_offset = 0
-
-    for chunk in _pdf_to_chunks(pdf_bytes):
-        # DocAI OCR on the chunk
-        result = _process_pdf_bytes(chunk)
-        doc = result.document
-
-        # Also open chunk with fitz to align native texts
-        chunk_pdf = fitz.open(stream=chunk, filetype="pdf")
-
-        for idx, page in enumerate(doc.pages):
-            ocr_text = _ocr_page_text(doc, page)
-            # native text for the corresponding page in the chunk
-            try:
-                native_text = chunk_pdf[idx].get_text("text")
-            except Exception:
-                native_text = ""
-
-            # Merge + dedupe
-            merged = _norm((ocr_text + "\n" + (native_text or "")).strip())
-            pages_all.append((merged, None))
-
-        chunk_pdf.close()
-        page_offset += len(doc.pages)
-
-    pdf_for_native.close()
+    src = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        for page_offset, chunk in _pdf_to_chunks(src):
+            # DocAI OCR on the chunk
+            with span("ocr_call", chunk_bytes=len(chunk), page_offset=page_offset) as sp:
+                result = _process_pdf_bytes(chunk)
+                del chunk   # request sent; release the serialised chunk before parsing
+                doc = result.document
+                sp.set(pages=len(doc.pages))
+
+            for idx, page in enumerate(doc.pages):
+                chunked = []
+                if tables is not None:
+                    for table, grid in _table_grids(doc, page, page_offset + idx + 1):
+                        tables.append(grid)
+                        if build_table(grid["header_rows"], grid["body_rows"]) is not None:
+                            chunked.append(table)
+                ocr_text = _ocr_page_text(doc, page, skip_tables=chunked)
+                # native text for the same page, from the shared source document
+                try:
+                    native_text = src[page_offset + idx].get_text("text")
+                except Exception:
+                    native_text = ""
+
+                # Merge + dedupe
+                merged = _norm((ocr_text + "\n" + (native_text or "")).strip())
+                pages_all.append((merged, None))
+            del result, doc
+    finally:
+        src.close()
     return pages_all
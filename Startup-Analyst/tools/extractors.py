@@ -0,0 +1,354 @@
+# tools/extractors.py
+"""
+Structured tables from Document AI output.
+
+DocAI returns each table as header/body rows of cell text. `tables_from_grids`
+turns those grids into `Table`s with a detected header row, a row label column
+and a float matrix of the numeric cells in canonical units:
+
+    inr_cr   rupee amounts in crore   (₹ 4.5 Cr, Rs 80 L, INR 12,00,000)
+    usd_m    dollar amounts in million ($1.2M, USD 800K)
+    pct      percentages              (35%, -4.2 %)
+    x        multiples                (3.1x)
+    months   durations                (18 months)
+    num      plain numbers            (1,240)
+
+Column headers like "Revenue (INR Cr)" or "Burn (₹ L)" give the unit for bare
+numbers in that column. `financial_signals` reads the latest revenue / burn / cash
+values out of the tables so runway can be computed without an LLM.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+UNITS = ("num", "inr_cr", "usd_m", "pct", "x", "months")
+
+# multiplier into the canonical unit, keyed by (currency, magnitude word)
+_INR_SCALE = {"": 1e-7, "k": 1e-4, "thousand": 1e-4, "l": 1e-2, "lakh": 1e-2, "lac": 1e-2,
+              "cr": 1.0, "crore": 1.0, "m": 0.1, "mn": 0.1, "million": 0.1, "b": 100.0, "bn": 100.0, "billion": 100.0}
+_USD_SCALE = {"": 1e-6, "k": 1e-3, "thousand": 1e-3, "m": 1.0, "mn": 1.0, "million": 1.0,
+              "b": 1e3, "bn": 1e3, "billion": 1e3}
+_MAGNITUDE = {"crores": "crore", "crs": "cr", "lakhs": "lakh", "lacs": "lac", "mns": "mn", "millions": "million",
+              "bns": "bn", "billions": "billion", "thousands": "thousand"}
+
+_AMOUNT = (
+    r"(?P<cur>₹|rs\.?|inr|us\$|\$|usd)?\s*(?P<neg>[-−–])?\s*"
+    r"(?P<num>\d[\d,]*(?:\.\d+)?|\.\d+)\s*"
+    r"(?P<mag>%|x|crores?|crs?|lakhs?|lacs?|l|thousands?|k|millions?|mns?|m|billions?|bns?|b|months?|mos?)?"
+)
+_CELL = re.compile(r"^\(?\s*" + _AMOUNT + r"\.?\s*(?P<cur2>inr|usd)?\s*\)?$", re.I)
+_VALUE = re.compile(_AMOUNT + r"(?![a-z])(?:\s*(?P<cur2>inr|usd)\b)?", re.I)
+_HEADER_UNIT = re.compile(
+    r"(?P<cur>₹|rs\.?|inr|us\$|\$|usd)?\s*(?P<mag>%|crores?|crs?|cr|lakhs?|lacs?|l|mn|millions?|bn|billions?|months?)\b|(?P<pct>%)",
+    re.I,
+)
+_BARE = re.compile(r"^[\s(\-−–]*[\d.,]+[\s)]*$")
+_COUNT_RX = re.compile(r"\b(?:customers?|users?|merchants?|clients?|employees|headcount|team size|count|no\.|#)", re.I)
+_PROJECTION = re.compile(r"\d{2,4}\s*[ep]\b|\b(?:proj\w*|forecast|plan|budget|target|estimate\w*)\b", re.I)
+_YEARLY = re.compile(r"\b(?:fy\s*'?\d{2,4}|20\d{2}|cy\s*\d{2,4}|annual|yearly|per year|p\.?a\.?)\b", re.I)
+_MONTHLY = re.compile(
+    r"\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|"
+    r"oct(?:ober)?|nov(?:ember)?|dec(?:ember)?|m\d{1,2}|monthly|per month|mom)\b|/\s*mo(?:nth)?\b", re.I)
+
+
+def _canon(cur: str, mag: str) -> Tuple[str, float]:
+    """(unit, multiplier) for a currency marker and magnitude word, both lower-case."""
+    mag = _MAGNITUDE.get(mag, mag)
+    if mag == "%":
+        return "pct", 1.0
+    if mag == "x":
+        return "x", 1.0
+    if mag in ("month", "months", "mo", "mos"):
+        return "months", 1.0
+    if cur in ("$", "usd", "us$"):
+        return "usd_m", _USD_SCALE.get(mag, 1e-6)
+    if cur in ("₹", "rs", "rs.", "inr") or mag in ("cr", "crore", "l", "lakh", "lac"):
+        return "inr_cr", _INR_SCALE.get(mag, 1e-7)
+    if mag in ("k", "thousand"):
+        return "num", 1e3
+    if mag in ("m", "mn", "million"):
+        return "num", 1e6
+    if mag in ("b", "bn", "billion"):
+        return "num", 1e9
+    return "num", 1.0
+
+
+@lru_cache(maxsize=8192)
+def parse_cell(text: str) -> Tuple[Optional[float], Optional[str]]:
+    """('₹ 4.5 Cr' -> (4.5, 'inr_cr')); (None, None) for non-numeric cells."""
+    m = _CELL.match((text or "").strip())
+    if not m:
+        return None, None
+    cur = (m.group("cur") or m.group("cur2") or "").lower()
+    unit, mult = _canon(cur, (m.group("mag") or "").lower())
+    value = float(m.group("num").replace(",", "")) * mult
+    t = text.strip()
+    if m.group("neg") or (t.startswith("(") and t.endswith(")")):
+        value = -value
+    return value, unit
+
+
+def parse_value(text: str) -> Tuple[Optional[float], Optional[str]]:
+    """First amount in free text ('₹4.8 Cr ARR, up 3x' -> (4.8, 'inr_cr')), as parse_cell."""
+    for m in _VALUE.finditer(text or ""):
+        if m.group("cur") or m.group("mag") or m.group("cur2") or not re.match(r"(?:19|20)\d{2}$", m.group("num")):
+            return parse_cell(m.group(0).strip())
+    return None, None
+
+
+def canonical_amounts(text: str) -> str:
+    """Amounts rewritten in canonical units ('$100B' and 'USD 100 billion' -> '100000usd_m'); years kept."""
+    def sub(m: re.Match) -> str:
+        if not (m.group("cur") or m.group("mag") or m.group("cur2")):
+            return m.group(0)
+        value, unit = parse_cell(m.group(0).strip())
+        return m.group(0) if value is None else f" {value:.6g}{unit} "
+    return _VALUE.sub(sub, text or "")
+
+
+def header_unit(text: str) -> Optional[Tuple[str, float]]:
+    """Unit declared by a column header, e.g. 'Revenue (INR Cr)' -> ('inr_cr', 1.0)."""
+    for m in _HEADER_UNIT.finditer(text or ""):
+        if m.group("pct"):
+            return "pct", 1.0
+        cur, mag = (m.group("cur") or "").lower(), (m.group("mag") or "").lower()
+        if mag == "l" and not cur:
+            continue            # a lone "L" is only lakh after a currency marker ("₹ L")
+        if cur or mag:
+            unit, mult = _canon(cur, mag)
+            if unit != "num":
+                return unit, mult
+    return None
+
+
+@dataclass
+class Table:
+    source: str
+    page: int
+    header: List[str]
+    rows: List[List[str]]                      # body cell text, header excluded
+    values: Any = None                         # float ndarray (rows x cols), NaN = not numeric
+    cell_units: Any = None                     # str ndarray (rows x cols), "" = not numeric
+    title: str = ""
+
+    def _majority(self, axis: int) -> List[Optional[str]]:
+        out = []
+        for k in range(self.cell_units.shape[1 - axis]):
+            line = self.cell_units[:, k] if axis == 0 else self.cell_units[k, :]
+            seen, counts = np.unique(line[line != ""], return_counts=True)
+            out.append(str(seen[np.argmax(counts)]) if len(seen) else None)
+        return out
+
+    @property
+    def units(self) -> List[Optional[str]]:
+        """Most common unit per column."""
+        return self._majority(0)
+
+    @property
+    def row_units(self) -> List[Optional[str]]:
+        """Most common unit per row."""
+        return self._majority(1)
+
+    @property
+    def labels(self) -> List[str]:
+        return [r[0] if r else "" for r in self.rows]
+
+    def period(self) -> Optional[str]:
+        """'month' / 'year' when the column headers look like months or fiscal years."""
+        head = " ".join(self.header[1:])
+        if _MONTHLY.search(head):
+            return "month"
+        if _YEARLY.search(head):
+            return "year"
+        return None
+
+    def to_compact(self, max_rows: int = 25) -> dict:
+        """Small JSON-able view for LLM context: numbers in canonical units, text where not numeric."""
+        out_rows = []
+        for i, row in enumerate(self.rows[:max_rows]):
+            cells = []
+            for j, cell in enumerate(row):
+                v = self.values[i, j] if self.values is not None and j < self.values.shape[1] else float("nan")
+                cells.append(cell if v != v else round(float(v), 4))
+            out_rows.append(cells)
+        return {"source": self.source, "page": self.page, "title": self.title, "period": self.period(),
+                "header": self.header, "units": self.units, "row_units": self.row_units[:max_rows], "rows": out_rows,
+                "truncated_rows": max(0, len(self.rows) - max_rows)}
+
+
+def _square(rows: Sequence[Sequence[str]]) -> List[List[str]]:
+    width = max((len(r) for r in rows), default=0)
+    return [[(c or "").strip() for c in r] + [""] * (width - len(r)) for r in rows]
+
+
+def _numeric_mask(rows: List[List[str]]):
+    return np.array([[parse_cell(c)[0] is not None for c in r] for r in rows], dtype=bool).reshape(len(rows), -1)
+
+
+def _detect_header(rows: List[List[str]], header_rows: List[List[str]]) -> Tuple[List[str], List[List[str]]]:
+    """Use DocAI's header rows when present; otherwise the first row if it is mostly text over numeric rows."""
+    if header_rows:
+        # multi-row headers are joined per column ("FY24" over "Actual" -> "FY24 Actual")
+        cols = zip(*_square(header_rows))
+        return [" ".join(p for p in col if p).strip() for col in cols], rows
+    if len(rows) < 2:
+        return [], rows
+    mask = _numeric_mask(rows)
+    first, rest = mask[0, 1:], mask[1:, 1:]
+    if first.size and first.mean() < 0.5 and rest.size and rest.mean() >= 0.5:
+        return rows[0], rows[1:]
+    return [], rows
+
+
+def build_table(header_rows: Sequence[Sequence[str]], body_rows: Sequence[Sequence[str]],
+                source: str = "", page: int = 0, title: str = "") -> Optional[Table]:
+    """Typed table from raw cell text; None for grids without any numeric cell."""
+    grid = _square(list(header_rows) + list(body_rows))
+    if not grid or not grid[0]:
+        return None
+    n_head = len(header_rows)
+    header, rows = _detect_header(grid[n_head:], grid[:n_head])
+    if not rows:
+        return None
+    width = len(rows[0])
+    header = (header + [""] * width)[:width]
+
+    # parse every cell once, then resolve units with array ops
+    parsed = [[parse_cell(c) for c in r] for r in rows]
+    values = np.array([[v if v is not None else np.nan for v, _ in r] for r in parsed], dtype=float)
+    if not np.isfinite(values).any():
+        return None
+    cell_units = np.array([[u or "" for _, u in r] for r in parsed], dtype=object)
+    bare = np.array([[u == "num" and bool(_BARE.match(c)) for (_, u), c in zip(pr, r)]
+                     for pr, r in zip(parsed, rows)], dtype=bool)
+
+    # a bare number takes the unit declared in its row label, else its column header,
+    # else the table-wide one ("Metric (₹ Cr)" corner cell or the title)
+    declared = [(i, None, header_unit(r[0])) for i, r in enumerate(rows)] + \
+               [(None, j, header_unit(h)) for j, h in enumerate(header) if j] + \
+               [(None, None, header_unit(header[0] if header else "") or header_unit(title))]
+    for i, j, unit_mult in declared:
+        if not unit_mult:
+            continue
+        unit, mult = unit_mult
+        sel = bare.copy()
+        if i is not None:
+            sel[np.arange(len(sel)) != i, :] = False
+        elif j is not None:
+            sel[:, np.arange(sel.shape[1]) != j] = False
+        else:
+            sel[[bool(_COUNT_RX.search(r[0])) for r in rows], :] = False   # "Customers" stays a count
+        values[sel] *= mult
+        cell_units[sel] = unit
+        bare &= ~sel
+    return Table(source=source, page=page, header=header, rows=rows, values=values,
+                 cell_units=cell_units, title=title)
+
+
+def tables_from_grids(grids: Sequence[dict], source: str = "") -> List[Table]:
+    """Grids are {"page", "header_rows", "body_rows"} dicts as produced by tools.docai_ocr."""
+    out = []
+    for g in grids:
+        t = build_table(g.get("header_rows") or [], g.get("body_rows") or [],
+                        source=source, page=int(g.get("page") or 0), title=g.get("title") or "")
+        if t is not None:
+            out.append(t)
+    return out
+
+
+def table_text(t: Table) -> str:
+    """Tab-separated rendering (header first) for the vector index."""
+    lines = ["\t".join(t.header)] if any(t.header) else []
+    lines += ["\t".join(r) for r in t.rows]
+    return "\n".join(lines)
+
+
+# --- Financial signals -----------------------------------------------------------
+
+FINANCIAL_KEYS: Dict[str, Tuple[str, ...]] = {
+    "revenue": ("revenue", "sales", "topline", "gmv", "arr", "mrr", "income from operations"),
+    "expenses": ("total expenses", "operating expenses", "expenses", "opex", "total costs", "total spend"),
+    "net_burn": ("net burn", "burn", "cash burn", "net cash outflow"),
+    "cash": ("cash in bank", "cash balance", "closing cash", "cash & equivalents", "cash and equivalents", "cash"),
+    "ebitda": ("ebitda", "operating profit", "operating loss"),
+    "gross_margin": ("gross margin", "contribution margin", "gm"),
+    "customers": ("customers", "users", "merchants", "clients"),
+}
+_KEY_RX = {k: re.compile(r"\b(?:" + "|".join(re.escape(w) for w in ws) + r")\b", re.I)
+           for k, ws in FINANCIAL_KEYS.items()}
+_FIN_RX = re.compile(r"\b(?:" + "|".join(re.escape(w) for ws in FINANCIAL_KEYS.values() for w in ws)
+                     + r"|p&l|profit|loss|runway|cac|ltv)\b", re.I)
+_FLOWS = ("revenue", "expenses", "net_burn", "ebitda")     # per-period amounts (vs. balances)
+
+
+def financial_score(t: Table) -> float:
+    """How financial a table looks: share of row labels/headers mentioning a financial term."""
+    texts = t.labels + t.header + [t.title]
+    return sum(1 for x in texts if _FIN_RX.search(x or "")) / max(1, len(texts))
+
+
+def select_financial(tables: Sequence[Table], limit: int = 4) -> List[Table]:
+    scored = sorted(((financial_score(t), t) for t in tables), key=lambda st: -st[0])
+    return [t for s, t in scored if s > 0][:limit]
+
+
+def _latest(t: Table, i: int) -> Optional[Tuple[float, int]]:
+    """(value, column) of the latest actual (non-projected) number in row i, else the latest of any."""
+    row = t.values[i]
+    finite = np.isfinite(row)
+    actual = finite & ~np.array([bool(_PROJECTION.search(h or "")) for h in t.header], dtype=bool)
+    for mask in (actual, finite):
+        idx = np.flatnonzero(mask)
+        if idx.size:
+            return float(row[idx[-1]]), int(idx[-1])
+    return None
+
+
+def financial_signals(tables: Sequence[Table]) -> Dict[str, Any]:
+    """
+    Latest value per financial key (first matching row wins, most financial table
+    first). Flows in yearly tables are divided by 12; runway = cash / monthly net burn
+    when both are in the same unit. Net burn falls back to expenses - revenue.
+    """
+    found: Dict[str, Any] = {}
+    for t in select_financial(tables, limit=len(tables)):
+        table_period = t.period()
+        for i, label in enumerate(t.labels):
+            for key, rx in _KEY_RX.items():
+                if key in found or not rx.search(label or ""):
+                    continue
+                hit = _latest(t, i)
+                if hit is None:
+                    continue
+                v, col = hit
+                period = "month" if _MONTHLY.search(label) else table_period
+                if key in _FLOWS and period == "year":
+                    v, period = v / 12.0, "month"
+                found[key] = {"value": round(v, 4), "unit": t.cell_units[i, col] or None,
+                              "period": period if key in _FLOWS else None,
+                              "label": label, "column": t.header[col] if col < len(t.header) else "",
+                              "page": t.page, "source": t.source}
+                break
+
+    out: Dict[str, Any] = {"signals": found}
+    burn = found.get("net_burn")
+    rev, exp = found.get("revenue"), found.get("expenses")
+    if burn is None and rev and exp and rev["unit"] == exp["unit"] and rev["period"] == exp["period"]:
+        net = round(abs(exp["value"]) - rev["value"], 4)
+        if net > 0:
+            burn = {"value": net, "unit": exp["unit"], "period": exp["period"], "derived": "expenses - revenue"}
+            found["net_burn"] = burn
+        else:
+            out["cash_flow_positive"] = True
+    cash = found.get("cash")
+    if burn and burn["period"] == "month" and burn["value"]:
+        out["net_burn_mo"] = {"value": abs(burn["value"]), "unit": burn["unit"]}
+        if cash and cash["unit"] == burn["unit"]:
+            out["runway_months"] = round(cash["value"] / abs(burn["value"]), 1)
+    return out
@@ -0,0 +1,193 @@
+# tools/feedback.py
+"""
+Analyst feedback log and learned scoring weights.
+
+Every thumbs up/down is appended as one JSON line to LEARN_DIR/feedback.jsonl
+under an exclusive file lock, so any number of processes can record feedback
+without clobbering each other. Weights are an aggregate over the log, updated
+incrementally (O(1) per event) by replaying only the lines past the last offset
+this process has seen. Every LEARN_COMPACT_EVERY events the aggregate is written
+atomically to LEARN_DIR/state.json with its log offset; once the log passes
+LEARN_LOG_ROTATE_BYTES it is archived and a fresh one started, so startup cost
+is bounded by the tail, not the history.
+
+Update rule (exponentiated gradient on the note's sub-scores): with p the
+weighted total / 100 and y = 1 for thumbs up, 0 for down,
+w_i <- w_i * exp(-LEARN_RATE * (p - y) * s_i / 100), then floor and renormalise.
+"""
+from __future__ import annotations
+import json, math, os, pathlib, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from config import LEARN_DIR, LEARN_RATE, LEARN_MIN_WEIGHT, LEARN_COMPACT_EVERY, LEARN_LOG_ROTATE_BYTES
+from tools.scoring import DEFAULT_WEIGHTS
+
+try:
+    import fcntl
+except ImportError:          # Windows: in-process locking only
+    fcntl = None
+
+LEGACY_STATE = "outputs/learning_state.json"
+
+
+def apply_event(state: Dict[str, Any], ev: Dict[str, Any]) -> None:
+    """Fold one feedback event into the aggregate, in place."""
+    counts = state["counts"]
+    counts["n"] += 1
+    counts["up" if ev.get("ok") else "down"] += 1
+    breakdown = ev.get("breakdown")
+    if not isinstance(breakdown, dict):
+        return
+    w = state["weights"]
+    scores = {k: float(breakdown[k]) for k in w if isinstance(breakdown.get(k), (int, float))}
+    if not scores:
+        return
+    p = sum(w[k] * s for k, s in scores.items()) / (100.0 * sum(w[k] for k in scores))
+    err = p - (1.0 if ev.get("ok") else 0.0)
+    for k, s in scores.items():
+        w[k] = max(LEARN_MIN_WEIGHT, w[k] * math.exp(-LEARN_RATE * err * s / 100.0))
+    total = sum(w.values())
+    for k in w:
+        w[k] = round(w[k] / total, 6)
+    counts["applied"] += 1
+
+
+class FeedbackStore:
+    def __init__(self, root: str | pathlib.Path = LEARN_DIR):
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.root / "feedback.jsonl"
+        self.state_path = self.root / "state.json"
+        self.lock_path = self.root / ".lock"
+        self._mu = threading.Lock()
+        with self._mu:
+            self._reload()
+
+    # --- state ------------------------------------------------------------------
+    def _initial(self) -> Dict[str, Any]:
+        weights = dict(DEFAULT_WEIGHTS)
+        try:
+            # seed from the old single-file state (its feedback had no sub-scores to replay)
+            with open(LEGACY_STATE, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            weights.update({k: float(v) for k, v in (legacy.get("weights") or {}).items() if k in weights})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"weights": weights, "counts": {"n": 0, "up": 0, "down": 0, "applied": 0},
+                "log_ino": None, "offset": 0, "updated": None}
+
+    def _reload(self):
+        """Snapshot, then replay the log tail past its offset."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = self._initial()
+        self._since_compact = 0
+        self._catch_up()
+
+    def _log_ino(self) -> Optional[int]:
+        try:
+            return os.stat(self.log_path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _catch_up(self):
+        ino = self._log_ino()
+        if ino is None:
+            return
+        if ino != self.state.get("log_ino"):
+            # log rotated since the snapshot (which covers the old log in full): start the new one
+            self.state["log_ino"], self.state["offset"] = ino, 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self.state["offset"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break                      # partial line from a writer that died mid-write
+                self.state["offset"] += len(line)
+                try:
+                    apply_event(self.state, json.loads(line))
+                except ValueError:
+                    continue
+                self._since_compact += 1
+
+    def refresh(self):
+        """Pick up feedback recorded by other processes (a stat when nothing changed)."""
+        with self._mu:
+            ino = self._log_ino()
+            try:
+                size = os.stat(self.log_path).st_size if ino is not None else 0
+            except FileNotFoundError:
+                size = 0
+            if ino != self.state.get("log_ino") and self.state.get("log_ino") is not None:
+                self._reload()
+            elif size != self.state["offset"]:
+                self._catch_up()
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a+") as lf:
+            if fcntl:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+    # --- writes -----------------------------------------------------------------
+    def record(self, ok: bool, reason: str = "", run_id: Optional[str] = None,
+               breakdown: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        ev = {"ts": time.time(), "ok": bool(ok), "reason": reason or "", "run_id": run_id,
+              "breakdown": breakdown if isinstance(breakdown, dict) else None, "pid": os.getpid()}
+        line = (json.dumps(ev, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._mu, self._file_lock():
+            if self.state.get("log_ino") is not None and self._log_ino() != self.state["log_ino"]:
+                self._reload()                 # another process rotated the log
+            with open(self.log_path, "ab") as f:
+                f.write(line)
+            self._catch_up()
+            if self._since_compact >= LEARN_COMPACT_EVERY:
+                self._compact()
+            return self.snapshot()
+
+    def _compact(self):
+        """Write the aggregate atomically; archive the log when it is large. Caller holds the file lock."""
+        self.state["updated"] = time.time()
+        self._write_state()
+        if self.state["offset"] >= LEARN_LOG_ROTATE_BYTES:
+            # archive name = events folded in so far: unique and sorts in log order
+            os.replace(self.log_path, self.root / f"feedback.{self.state['counts']['n']:010d}.jsonl")
+            self.state["log_ino"], self.state["offset"] = None, 0
+            self._write_state()
+        self._since_compact = 0
+
+    def _write_state(self):
+        tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+    # --- reads ------------------------------------------------------------------
+    def weights(self) -> Dict[str, float]:
+        with self._mu:
+            return dict(self.state["weights"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"weights": dict(self.state["weights"]), "counts": dict(self.state["counts"])}
+
+
+_store: Optional[FeedbackStore] = None
+_store_lock = threading.Lock()
+
+def get_feedback_store() -> FeedbackStore:
+    """Process-wide store: the log is read once per process, then only its new tail."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FeedbackStore()
+    return _store
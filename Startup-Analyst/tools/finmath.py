@@ -0,0 +1,112 @@
+# tools/finmath.py
+"""
+Deterministic cap-table and runway math.
+
+Every function takes scalars or numpy arrays and broadcasts, so a single call
+prices one round or a whole sweep:
+
+    split = round_split(pre_money=25, raise_amt=[2, 4, 6], esop_refresh=0.1)
+    split["Founders"]          # -> array of 3 post-money fractions
+
+`sweep` lays named 1-D ranges on orthogonal axes (pre-money x raise x ESOP x
+burn growth) and evaluates ownership and post-raise runway on the full grid.
+Amounts only need to share a unit (the pipeline uses ₹ crore).
+"""
+from __future__ import annotations
+import datetime as _dt
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def round_split(pre_money, raise_amt, esop_refresh=0.0, esop_pre=0.0,
+                holders: Optional[Mapping[str, float]] = None) -> Dict[str, Any]:
+    """
+    Fully-diluted ownership after a priced round.
+
+    `esop_refresh` is the post-money option pool target; the top-up is created
+    before the round (option pool shuffle), so it dilutes existing holders only.
+    `esop_pre` is the pool's pre-round fraction and `holders` the pre-round
+    fractions of everyone else (default: Founders own the rest).
+    Returns post_money, effective_pre_money (pre-money net of the pool top-up),
+    price_ratio (effective / headline pre-money) and one fraction per holder,
+    plus "ESOP" and "NewInvestor".
+    """
+    pre = np.asarray(pre_money, dtype=float)
+    raise_ = np.asarray(raise_amt, dtype=float)
+    esop0 = np.asarray(esop_pre, dtype=float)
+    holders = dict(holders or {"Founders": 1.0 - float(np.max(esop0))})
+    existing = sum(holders.values()) or 1.0
+
+    post = pre + raise_
+    with np.errstate(divide="ignore", invalid="ignore"):
+        investor = np.where(post > 0, raise_ / post, 0.0)
+    esop = np.maximum(esop0 * (1.0 - investor), np.asarray(esop_refresh, dtype=float))
+    rest = np.clip(1.0 - investor - esop, 0.0, 1.0)
+    topup = esop - esop0 * (1.0 - investor)
+    effective_pre = pre - topup * post
+
+    out: Dict[str, Any] = {"post_money": post, "effective_pre_money": effective_pre,
+                           "price_ratio": np.where(pre > 0, effective_pre / np.where(pre > 0, pre, 1.0), 0.0)}
+    for name, frac in holders.items():
+        out[name] = rest * (frac / existing)
+    out["ESOP"] = esop
+    out["NewInvestor"] = investor
+    return out
+
+
+def runway_months(cash, net_burn_mo, burn_growth_mo=0.0):
+    """
+    Months until `cash` is spent when monthly net burn starts at `net_burn_mo` and
+    compounds by `burn_growth_mo` per month (0.03 = +3 %/month). Solves
+    burn * ((1 + g)^n - 1) / g = cash in closed form; inf when the cash is never
+    exhausted (no burn, or burn shrinking fast enough).
+    """
+    cash = np.asarray(cash, dtype=float)
+    b = np.asarray(net_burn_mo, dtype=float)
+    g = np.asarray(burn_growth_mo, dtype=float)
+    safe_b = np.where(b > 0, b, 1.0)
+    safe_g = np.where(np.abs(g) < 1e-12, 1e-12, np.maximum(g, -0.999))
+    arg = 1.0 + cash * safe_g / safe_b
+    # arg <= 0: burn shrinks faster than the cash runs down, so it never does
+    grown = np.where(arg > 0, np.log(np.where(arg > 0, arg, 1.0)) / np.log1p(safe_g), np.inf)
+    n = np.where(np.abs(g) < 1e-12, cash / safe_b, grown)
+    return np.where(b > 0, np.maximum(n, 0.0), np.where(cash > 0, np.inf, 0.0))
+
+
+def zero_cash_date(months: float, today: Optional[_dt.date] = None) -> Optional[str]:
+    """ISO date `months` after today (30.44-day months); None for a runway that never ends (inf)."""
+    if months is None or not np.isfinite(months):
+        return None
+    today = today or _dt.date.today()
+    return (today + _dt.timedelta(days=round(float(months) * 30.44))).isoformat()
+
+
+def grid(**axes: Sequence[float]) -> Dict[str, Any]:
+    """Each named 1-D range reshaped onto its own axis, in argument order, for broadcasting."""
+    n = len(axes)
+    out = {}
+    for k, (name, values) in enumerate(axes.items()):
+        shape = [1] * n
+        shape[k] = -1
+        out[name] = np.asarray(values, dtype=float).reshape(shape)
+    return out
+
+
+def sweep(pre_money: Sequence[float], raise_amt: Sequence[float], esop_refresh: Sequence[float],
+          burn_growth_mo: Sequence[float] = (0.0,), cash: float = 0.0, net_burn_mo: float = 0.0,
+          esop_pre: float = 0.0, holders: Optional[Mapping[str, float]] = None) -> Dict[str, Any]:
+    """
+    Ownership and post-raise runway over the full pre-money x raise x ESOP x burn
+    growth grid. Arrays have shape (len(pre_money), len(raise_amt), len(esop_refresh),
+    len(burn_growth_mo)); runway uses cash + raise against the current net burn.
+    """
+    ax = grid(pre_money=pre_money, raise_amt=raise_amt, esop_refresh=esop_refresh, burn_growth_mo=burn_growth_mo)
+    split = round_split(ax["pre_money"], ax["raise_amt"], ax["esop_refresh"], esop_pre, holders)
+    shape = np.broadcast_shapes(*(a.shape for a in ax.values()))
+    out = {k: np.broadcast_to(v, shape) for k, v in split.items()}
+    out["runway_months"] = np.broadcast_to(runway_months(cash + ax["raise_amt"], net_burn_mo, ax["burn_growth_mo"]), shape)
+    out["axes"] = {k: np.ravel(v).tolist() for k, v in ax.items()}
+    return out
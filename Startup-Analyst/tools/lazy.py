@@ -0,0 +1,47 @@
+# tools/lazy.py
+"""
+Deferred imports for heavy SDKs.
+
+    genai = lazy_import("google.generativeai")
+    ...
+    genai.configure(api_key=...)     # the real import happens here
+
+The proxy imports the target module on first attribute access (get or set), so
+importing the pipeline doesn't pay for Gemini, Document AI, PyMuPDF, requests,
+etc. until a run actually needs them. Import errors surface at that first use.
+"""
+from __future__ import annotations
+import importlib, sys, threading, types
+
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        object.__setattr__(self, "_lazy_mod", None)
+
+    def _load(self) -> types.ModuleType:
+        mod = object.__getattribute__(self, "_lazy_mod")
+        if mod is None:
+            with _lock:
+                mod = object.__getattribute__(self, "_lazy_mod")
+                if mod is None:
+                    mod = importlib.import_module(self.__name__)
+                    object.__setattr__(self, "_lazy_mod", mod)
+        return mod
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if object.__getattribute__(self, "_lazy_mod") is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """The module itself if already imported, otherwise a proxy that imports it on first use."""
+    return sys.modules.get(name) or LazyModule(name)
@@ -1,7 +1,10 @@
 # tools/llm_router.py
 from typing import Optional
-import google.generativeai as genai
+from tools.lazy import lazy_import
 from config import GEMINI_API_KEY, GEMINI_MODEL_ID, GEMINI_MODEL_NAME
+from tools.tracing import span
+
+genai = lazy_import("google.generativeai")
 
 _MODEL = GEMINI_MODEL_ID or GEMINI_MODEL_NAME
 
@@ -11,6 +14,18 @@ def _client_once():
         genai._cfg = True
     return genai.GenerativeModel(_MODEL)
 
+def _usage_attrs(resp) -> dict:
+    """Token counts from Gemini's usage_metadata, when the SDK returns it."""
+    um = getattr(resp, "usage_metadata", None)
+    if um is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(um, "prompt_token_count", None),
+        "response_tokens": getattr(um, "candidates_token_count", None),
+        "total_tokens": getattr(um, "total_token_count", None),
+        "cached_tokens": getattr(um, "cached_content_token_count", None) or None,
+    }
+
 def call_llm_json(*, task_hint: str, schema: str, context: str = "", max_tokens: int = 2048) -> str:
     """
     Returns the *raw model text* (string). Use your parse_json_or_repair on it.
@@ -27,24 +42,34 @@ def call_llm_json(*, task_hint: str, schema: str, context: str = "", max_tokens:
         f"TASK:\n{task_hint}\n\n"
         f"CONTEXT:\n{context}\n"
     )
-    resp = mdl.generate_content(prompt)
-    # robustly extract text (avoid .text when empty candidates)
-    if not resp.candidates:
-        return "{}"
-    parts = []
-    for part in resp.candidates[0].content.parts:
-        if getattr(part, "text", None):
-            parts.append(part.text)
-    return "".join(parts).strip() if parts else "{}"
+    with span("llm_call", model=_MODEL, mode="json", prompt_chars=len(prompt), max_tokens=max_tokens) as sp:
+        resp = mdl.generate_content(prompt)
+        sp.set(**_usage_attrs(resp))
+        # robustly extract text (avoid .text when empty candidates)
+        if not resp.candidates:
+            sp.set(response_chars=0, empty=True)
+            return "{}"
+        parts = []
+        for part in resp.candidates[0].content.parts:
+            if getattr(part, "text", None):
+                parts.append(part.text)
+        out = "".join(parts).strip() if parts else "{}"
+        sp.set(response_chars=len(out))
+        return out
 
 def call_llm_text(*, prompt: str, context: str = "", max_tokens: int = 512) -> str:
     mdl = _client_once()
     full = f"{prompt}\n\nCONTEXT:\n{context}"
-    resp = mdl.generate_content(full)
-    if not resp.candidates:
-        return ""
-    parts = []
-    for part in resp.candidates[0].content.parts:
-        if getattr(part, "text", None):
-            parts.append(part.text)
-    return "".join(parts).strip()
+    with span("llm_call", model=_MODEL, mode="text", prompt_chars=len(full), max_tokens=max_tokens) as sp:
+        resp = mdl.generate_content(full)
+        sp.set(**_usage_attrs(resp))
+        if not resp.candidates:
+            sp.set(response_chars=0, empty=True)
+            return ""
+        parts = []
+        for part in resp.candidates[0].content.parts:
+            if getattr(part, "text", None):
+                parts.append(part.text)
+        out = "".join(parts).strip()
+        sp.set(response_chars=len(out))
+        return out
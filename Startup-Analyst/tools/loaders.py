@@ -1,13 +1,19 @@
 # tools/loaders.py
 from __future__ import annotations
-import os, re, pathlib, html
-from typing import List
-import requests
-
-from langchain.schema import Document  # ok with current LC
-# If you use langchain-core >=0.2: from langchain_core.documents import Document
+import os, re, pathlib, html, mmap
+from typing import List, Tuple, Union
 
+from tools.lazy import lazy_import
 from tools.docai_ocr import docai_ocr_pdf_bytes
+from tools.extractors import tables_from_grids, table_text
+
+# heavy deps load on first use (see tools/lazy.py)
+requests = lazy_import("requests")
+_lc_schema = lazy_import("langchain.schema")   # langchain-core >=0.2: langchain_core.documents
+
+def Document(*args, **kwargs):
+    """langchain Document, constructed without importing langchain at module import."""
+    return _lc_schema.Document(*args, **kwargs)
 
 # Optional HTML -> text helpers (pure stdlib fallback)
 def _strip_html(raw: str) -> str:
@@ -25,16 +31,34 @@ def _strip_html(raw: str) -> str:
 def _is_url(s: str) -> bool:
     return s.lower().startswith("http://") or s.lower().startswith("https://")
 
-def load_pdf_docai(path_or_bytes: str | bytes) -> List[Document]:
+_BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+# An input is a path / URL string, or a (source_name, buffer) pair for a PDF that is
+# already in memory (e.g. a freshly downloaded deck handed over as an mmap view).
+InputItem = Union[str, Tuple[str, Union[bytes, bytearray, memoryview, mmap.mmap]]]
+
+def _is_buffer_input(it) -> bool:
+    return isinstance(it, tuple) and len(it) == 2 and isinstance(it[1], _BUFFER_TYPES)
+
+def load_pdf_docai(path_or_bytes: str | bytes | memoryview, source: str | None = None) -> List[Document]:
+    """
+    One Document per OCR'd page, plus one "docai_table" Document per numeric table,
+    whose metadata["table"] holds the parsed tools.extractors.Table.
+    """
+    grids: list = []
     if isinstance(path_or_bytes, (str, os.PathLike)):
-        with open(path_or_bytes, "rb") as f:
-            pdf_bytes = f.read()
-        source = str(path_or_bytes)
+        # map the file instead of reading it: the OCR path reads the pages in place
+        with open(path_or_bytes, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                pages = docai_ocr_pdf_bytes(view, tables=grids)  # list[(text, conf)]
+            finally:
+                view.release()
+        source = source or str(path_or_bytes)
     else:
-        pdf_bytes = path_or_bytes
-        source = "buffer.pdf"
+        pages = docai_ocr_pdf_bytes(path_or_bytes, tables=grids)
+        source = source or "buffer.pdf"
 
-    pages = docai_ocr_pdf_bytes(pdf_bytes)  # list[(text, conf)]
     docs: List[Document] = []
     for i, (txt, _conf) in enumerate(pages, start=1):
         if not txt or not txt.strip():
@@ -49,6 +73,13 @@ def load_pdf_docai(path_or_bytes: str | bytes) -> List[Document]:
                 },
             )
         )
+    for t in tables_from_grids(grids, source=source):
+        docs.append(
+            Document(
+                page_content=table_text(t),
+                metadata={"source": source, "page": t.page, "loader": "docai_table", "table": t},
+            )
+        )
     return docs
 
 def load_docx(path: str) -> List[Document]:
@@ -63,32 +94,45 @@ def load_docx(path: str) -> List[Document]:
     text = "\n".join(paras).strip()
     return [Document(page_content=text, metadata={"source": path, "loader": "docx"})] if text else []
 
+def _html_sections(raw: str) -> List[Tuple[str, str]]:
+    """(heading, text) per h1-h3 section of a page; text before the first heading has heading ""."""
+    raw = re.sub(r"(?is)<(script|style|nav|footer).*?>.*?</\1>", " ", raw)
+    out = []
+    for part in re.split(r"(?i)(?=<h[1-3][\s>])", raw):
+        m = re.match(r"(?is)<h[1-3][^>]*>(.*?)</h[1-3]>", part)
+        text = _strip_html(re.sub(r"(?i)</h[1-3]>", "\n\n", part, count=1))
+        if text:
+            out.append((_strip_html(m.group(1)) if m else "", text))
+    return out
+
 def load_url(url: str) -> List[Document]:
+    """One Document per heading section; tools/chunking packs and merges them."""
     headers = {"User-Agent": os.getenv("USER_AGENT", "StartupAnalyst/1.0")}
     r = requests.get(url, headers=headers, timeout=30)
     r.raise_for_status()
-    txt = _strip_html(r.text)
-    # Keep a sane chunk size ~4000 chars to help embedding
-    chunks: List[Document] = []
-    CHUNK = 4000
-    for i in range(0, len(txt), CHUNK):
-        piece = txt[i:i+CHUNK].strip()
-        if piece:
-            chunks.append(
-                Document(
-                    page_content=piece,
-                    metadata={"source": url, "chunk": i//CHUNK, "loader": "url"},
-                )
-            )
-    return chunks
+    return [
+        Document(
+            page_content=text,
+            metadata={"source": url, "chunk": i, "section": heading, "loader": "url"},
+        )
+        for i, (heading, text) in enumerate(_html_sections(r.text))
+    ]
 
 def load_text_file(path: str) -> List[Document]:
     data = open(path, "r", encoding="utf-8", errors="ignore").read()
     return [Document(page_content=data, metadata={"source": path, "loader": "text"})]
 
-def load_many(inputs: List[str]) -> List[Document]:
+def load_many(inputs: List[InputItem]) -> List[Document]:
     out: List[Document] = []
     for it in inputs:
+        if _is_buffer_input(it):
+            name, buf = it
+            try:
+                out.extend(load_pdf_docai(buf, source=str(name)))
+            except Exception as e:
+                out.append(Document(page_content=f"[load_error] {e}", metadata={"source": str(name), "loader": "error"}))
+            continue
+
         it = str(it).strip().strip('"').strip("'")
         if not it:
             continue
@@ -0,0 +1,115 @@
+# tools/logsink.py
+"""
+One append-only JSONL sink per process for agent logs.
+
+Records are buffered in memory (bounded: a full buffer is flushed inline by the
+writer), written by a background thread every LOG_FLUSH_INTERVAL seconds, and the
+file is rotated once it passes LOG_ROTATE_BYTES. Rotated files are optionally
+gzip-compressed and only the newest LOG_BACKUPS are kept.
+"""
+from __future__ import annotations
+import atexit, gzip, json, os, pathlib, shutil, threading, time
+from collections import deque
+from typing import Iterable, Optional
+
+from config import (
+    LOG_PATH, LOG_ROTATE_BYTES, LOG_BACKUPS, LOG_COMPRESS,
+    LOG_FLUSH_INTERVAL, LOG_BUFFER_MAX,
+)
+
+
+class JsonlSink:
+    def __init__(self, path: str | pathlib.Path, rotate_bytes: int = LOG_ROTATE_BYTES,
+                 backups: int = LOG_BACKUPS, compress: bool = LOG_COMPRESS,
+                 flush_interval: float = LOG_FLUSH_INTERVAL, max_buffer: int = LOG_BUFFER_MAX):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rotate_bytes = rotate_bytes
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buf: deque = deque()
+        self._buf_lock = threading.Lock()      # guards _buf
+        self._io_lock = threading.Lock()       # serialises file writes / rotation
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- producer side --------------------------------------------------------
+    def write(self, rec: dict):
+        self.write_many((rec,))
+
+    def write_many(self, recs: Iterable[dict]):
+        with self._buf_lock:
+            self._buf.extend(recs)
+            full = len(self._buf) >= self.max_buffer
+        self._ensure_thread()
+        if full:
+            self.flush()
+
+    # --- consumer side --------------------------------------------------------
+    def flush(self):
+        with self._buf_lock:
+            if not self._buf:
+                return
+            batch, self._buf = self._buf, deque()
+        data = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch).encode("utf-8")
+        with self._io_lock:
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(data) > self.rotate_bytes:
+                self._rotate()
+            with open(self.path, "ab") as f:
+                f.write(data)
+
+    def _rotate(self):
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() // 1000 % 1_000_000:06d}"
+        dst = self.path.with_name(f"{self.path.stem}.{stamp}.{os.getpid()}{self.path.suffix}")
+        os.replace(self.path, dst)
+        if self.compress:
+            with open(dst, "rb") as src, gzip.open(f"{dst}.gz", "wb") as out:
+                shutil.copyfileobj(src, out)
+            dst.unlink()
+        olds = sorted(self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}*"),
+                      key=lambda p: p.stat().st_mtime)
+        for p in olds[:-self.backups] if self.backups > 0 else olds:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._buf_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="logsink-flush", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+_sink: Optional[JsonlSink] = None
+_sink_lock = threading.Lock()
+
+def get_sink() -> JsonlSink:
+    """Process-wide sink at LOG_PATH; flushed on interpreter exit."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = JsonlSink(LOG_PATH)
+                atexit.register(_sink.close)
+    return _sink
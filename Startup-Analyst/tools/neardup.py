@@ -0,0 +1,115 @@
+# tools/neardup.py
+"""
+Near-duplicate clustering for search results and evidence snippets.
+
+Syndicated news and mirrored press releases come back from every backend with
+different URLs and slightly different text. `cluster` groups them by MinHash
+estimated Jaccard similarity over word shingles, computed for all candidates at
+once with numpy (signatures are an (n, NEARDUP_PERMUTATIONS) matrix; all pairs
+are compared by broadcasting), then unions pairs above NEARDUP_JACCARD. A
+snippet that is mostly contained in a longer one (the same story cut short) also
+matches, via containment estimated from the Jaccard and the shingle counts:
+
+    groups = cluster([x["snippet"] for x in items])     # one list of indices per cluster
+    kept = collapse(items, text=lambda x: x["snippet"])  # first of each cluster + "corroboration"
+
+Input order is preserved and the first member of a cluster is its
+representative, so callers pass candidates best-first.
+"""
+from __future__ import annotations
+import hashlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import NEARDUP_JACCARD, NEARDUP_CONTAINMENT, NEARDUP_PERMUTATIONS, NEARDUP_SHINGLE
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+_WORD = re.compile(r"[a-z0-9]+")
+_PRIME = (1 << 61) - 1
+_PERMS: Dict[int, Any] = {}
+_BLOCK = 256
+_MIN_CONTAINED = 8            # shorter snippets only match on Jaccard
+
+
+def _perms(k: int):
+    """Fixed (a, b) pairs for k universal hash permutations, deterministic across processes."""
+    if k not in _PERMS:
+        rng = np.random.default_rng(0x5EED)
+        _PERMS[k] = (rng.integers(1, _PRIME, k, dtype=np.uint64), rng.integers(0, _PRIME, k, dtype=np.uint64))
+    return _PERMS[k]
+
+
+def _shingles(text: str, size: int) -> List[int]:
+    words = _WORD.findall((text or "").lower())
+    grams = [" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))] if words else []
+    return [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+            for g in grams]
+
+
+def signatures(texts: Sequence[str], k: int = NEARDUP_PERMUTATIONS, size: int = NEARDUP_SHINGLE):
+    """((n, k) uint64 MinHash signatures, (n,) distinct shingle counts); empty texts never match."""
+    a, b = _perms(k)
+    sig = np.full((len(texts), k), np.iinfo(np.uint64).max, dtype=np.uint64)
+    sizes = np.zeros(len(texts))
+    for i, t in enumerate(texts):
+        sh = np.unique(np.asarray(_shingles(t, size), dtype=np.uint64))
+        sizes[i] = sh.size
+        if sh.size:
+            # (a*x + b) mod 2^64, then mod p: cheap universal hashing without overflow checks
+            sig[i] = ((sh[:, None] * a[None, :] + b[None, :]) % _PRIME).min(axis=0)
+    return sig, sizes
+
+
+def cluster(texts: Sequence[str], threshold: float = NEARDUP_JACCARD) -> List[List[int]]:
+    """Indices grouped into near-duplicate clusters, in order of first member."""
+    n = len(texts)
+    if n < 2:
+        return [[i] for i in range(n)]
+    sig, sizes = signatures(texts)
+    empty = sizes == 0
+    pairs = []
+    for lo in range(0, n, _BLOCK):          # (block, n, k) compares keep memory flat for large n
+        sim = (sig[lo:lo + _BLOCK, None, :] == sig[None, :, :]).mean(axis=-1)
+        sa, sb = sizes[lo:lo + _BLOCK, None], sizes[None, :]
+        small = np.minimum(sa, sb)
+        # |A ∩ B| = J (|A| + |B|) / (1 + J); containment of the smaller set in the larger
+        contained = (sim * (sa + sb) / (1.0 + sim) / np.maximum(small, 1.0) >= NEARDUP_CONTAINMENT) & \
+                    (small >= _MIN_CONTAINED)
+        hit = ((sim >= threshold) | contained) & ~empty[lo:lo + _BLOCK, None] & ~empty[None, :]
+        ii, jj = np.nonzero(hit)
+        keep = jj > ii + lo
+        pairs += zip((ii[keep] + lo).tolist(), jj[keep].tolist())
+
+    parent = list(range(n))
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    for i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)      # the earlier item stays the root
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def collapse(items: Sequence[Dict[str, Any]], text: Callable[[Dict[str, Any]], str],
+             domain: Optional[Callable[[Dict[str, Any]], str]] = None,
+             threshold: float = NEARDUP_JACCARD) -> List[Dict[str, Any]]:
+    """
+    One item per cluster (the first), with "corroboration" set to the cluster size
+    and, when `domain` is given, "corroborating_domains" to its distinct domains.
+    """
+    out = []
+    for group in cluster([text(x) for x in items], threshold):
+        rep = dict(items[group[0]])
+        rep["corroboration"] = len(group)
+        if domain is not None:
+            rep["corroborating_domains"] = len({domain(items[i]) for i in group})
+        out.append(rep)
+    return out
@@ -0,0 +1,166 @@
+# tools/note_query.py
+"""
+Typed screening queries over the deal-note store.
+
+A NoteQuery is a plain set of filters (sector, stage, score range, numeric fact
+ranges, founder text, maximum risk severity) that compiles onto the indexed
+columns of tools.note_store. Natural language is turned into a NoteQuery by
+`parse_rules` when the phrasing is simple enough to parse deterministically;
+otherwise the caller asks the LLM to fill QUERY_SCHEMA and passes the result
+through `NoteQuery.from_dict`.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from tools.note_store import NoteStore, NoteRow, RISK_LEVELS, normalize_stage
+
+QUERY_SCHEMA = """{
+  "sector": null,
+  "stage": null,
+  "min_score": null,
+  "max_score": null,
+  "founder_contains": null,
+  "max_risk": "low|medium|high|null",
+  "ranges": {"y1_revenue_cr": [null, null]},
+  "order_by": "score DESC",
+  "limit": 10
+}"""
+
+_ORDER_BY = ("score DESC", "score ASC", "created DESC", "created ASC", "company_lc ASC")
+DEFAULT_LIMIT = 10
+
+
+def _opt_float(v) -> Optional[float]:
+    try:
+        return None if v is None or v == "" else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class NoteQuery:
+    sector: Optional[str] = None
+    stage: Optional[str] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    founder_contains: Optional[str] = None
+    max_risk: Optional[str] = None                # "low" | "medium" | "high"
+    ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = field(default_factory=dict)
+    order_by: str = "score DESC"
+    limit: int = DEFAULT_LIMIT
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "NoteQuery":
+        """Coerce loosely-typed (LLM) output into a valid query; unknown keys are ignored."""
+        d = d if isinstance(d, dict) else {}
+        ranges = {}
+        for k, v in (d.get("ranges") or {}).items():
+            if isinstance(v, (list, tuple)) and len(v) == 2:
+                lo, hi = _opt_float(v[0]), _opt_float(v[1])
+                if lo is not None or hi is not None:
+                    ranges[str(k)] = (lo, hi)
+        # legacy screener key
+        if _opt_float(d.get("min_y1_revenue_cr")) is not None:
+            ranges.setdefault("y1_revenue_cr", (_opt_float(d["min_y1_revenue_cr"]), None))
+        risk = str(d.get("max_risk") or "").lower()
+        order_by = d.get("order_by") if d.get("order_by") in _ORDER_BY else "score DESC"
+        try:
+            limit = max(1, min(50, int(d.get("limit") or DEFAULT_LIMIT)))
+        except (TypeError, ValueError):
+            limit = DEFAULT_LIMIT
+        text = lambda k: (str(d[k]).strip() or None) if d.get(k) not in (None, "null") else None
+        return cls(
+            sector=(text("sector") or "").lower() or None,
+            stage=normalize_stage(text("stage")) or None,
+            min_score=_opt_float(d.get("min_score")),
+            max_score=_opt_float(d.get("max_score")),
+            founder_contains=text("founder_contains") or text("founder_education_contains"),
+            max_risk=risk if risk in RISK_LEVELS else None,
+            ranges=ranges,
+            order_by=order_by,
+            limit=limit,
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def filters(self) -> dict:
+        """Keyword filters for NoteStore.find / count_matching."""
+        return {
+            "sector": self.sector,
+            "stage": self.stage,
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "founder_contains": self.founder_contains,
+            "max_risk": RISK_LEVELS.get(self.max_risk) if self.max_risk else None,
+            "fact_ranges": self.ranges or None,
+        }
+
+
+def run_query(store: NoteStore, q: NoteQuery) -> Tuple[List[NoteRow], int]:
+    """Top `q.limit` rows plus the total number of matches."""
+    f = q.filters()
+    return store.find(order_by=q.order_by, limit=q.limit, **f), store.count_matching(**f)
+
+
+# --- Deterministic parsing of common phrasings ------------------------------------
+
+_AMOUNT = r"(?:inr|rs\.?|₹)?\s*(\d+(?:\.\d+)?)\s*(?:cr|crores?)\b"
+_REV_MIN = re.compile(rf"\b(?:over|above|more than|at least|greater than|>=?)\s*{_AMOUNT}", re.I)
+_REV_MAX = re.compile(rf"\b(?:under|below|less than|at most|<=?)\s*{_AMOUNT}", re.I)
+_SCORE_MIN = re.compile(r"\bscor\w*\s*(?:of\s*)?(?:over|above|at least|>=?)\s*(\d+(?:\.\d+)?)", re.I)
+_SCORE_MAX = re.compile(r"\bscor\w*\s*(?:of\s*)?(?:under|below|at most|<=?)\s*(\d+(?:\.\d+)?)", re.I)
+_FOUNDER = re.compile(r"\bfounders?\s+(?:from|at|of|who studied at|educated at)\s+([A-Za-z][\w&.\- ]*?)(?=[?.,!]|$| and | with )", re.I)
+_STAGE = re.compile(r"\b(pre[- ]?seed|seed|pre[- ]?series[- ]?[a-e]|series[- ]?[a-e])\b(?:\s+(?:stage|round))?", re.I)
+_LOW_RISK = re.compile(r"\b(?:no|without)\s+high[- ]risks?\b|\blow[- ]risk\b", re.I)
+_REVENUE_WORDS = re.compile(r"\b(?:in|during|for)?\s*(?:their|the)?\s*(?:first|1st)\s+year\b|\by1\b|\brevenues?\b|\bmade\b|\bearn(?:ed|ing)?\b", re.I)
+
+# words that carry no filter meaning; anything else left over sends the query to the LLM
+_FILLER = set("""
+a an the me show find list give get which what who are is was were that those these any all of in on for
+with from by to and or companies company startups startup deals deal sector sectors industry space
+please can you i want looking look see tell about there their have has having had over crore cr
+""".split())
+
+
+def parse_rules(text: str, sectors: List[str]) -> Optional[NoteQuery]:
+    """
+    Parse simple screening requests without an LLM. Returns None unless at least
+    one filter was recognised AND no unexplained words remain.
+    """
+    rest = f" {text} "
+    q = NoteQuery()
+    hit = False
+
+    def take(m):
+        nonlocal rest
+        rest = rest.replace(m.group(0), " ", 1)
+
+    for rx, setter in (
+        (_REV_MIN, lambda m: q.ranges.__setitem__("y1_revenue_cr", (float(m.group(1)), q.ranges.get("y1_revenue_cr", (None, None))[1]))),
+        (_REV_MAX, lambda m: q.ranges.__setitem__("y1_revenue_cr", (q.ranges.get("y1_revenue_cr", (None, None))[0], float(m.group(1))))),
+        (_SCORE_MIN, lambda m: setattr(q, "min_score", float(m.group(1)))),
+        (_SCORE_MAX, lambda m: setattr(q, "max_score", float(m.group(1)))),
+        (_FOUNDER, lambda m: setattr(q, "founder_contains", m.group(1).strip())),
+        (_STAGE, lambda m: setattr(q, "stage", normalize_stage(m.group(1)))),
+        (_LOW_RISK, lambda m: setattr(q, "max_risk", "medium" if "high" in m.group(0).lower() else "low")),
+    ):
+        m = rx.search(rest)
+        if m:
+            setter(m); take(m); hit = True
+    if "y1_revenue_cr" in q.ranges:
+        for m in list(_REVENUE_WORDS.finditer(rest)):
+            rest = rest.replace(m.group(0), " ", 1)
+
+    low = rest.lower()
+    for s in sorted(sectors, key=len, reverse=True):
+        if s and re.search(rf"\b{re.escape(s)}\b", low):
+            q.sector = s
+            low = re.sub(rf"\b{re.escape(s)}\b", " ", low, count=1)
+            hit = True
+            break
+
+    leftover = [w for w in re.findall(r"[a-z0-9]+", low) if w not in _FILLER]
+    return q if hit and not leftover else None
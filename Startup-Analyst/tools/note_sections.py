@@ -0,0 +1,100 @@
+# tools/note_sections.py
+"""
+Section-level retrieval inside one deal note, for the deep-dive bot.
+
+A note is split into addressable sections: one per top-level key, large dicts
+one level further ("facts.traction", "facts.founders") and lists of objects per
+item ("risks[2]", "verification.checks[4]"); the rules live in tools/note_split.py,
+shared with the Gemini agent server's note index. A question then pulls in only
+the sections that answer it, instead of the whole indented note:
+
+    idx = get_section_index(note)          # cached per note; follow-up questions reuse it
+    context = idx.context("What is the founder vesting period?")
+
+Sections are ranked by BM25 over their text and path ("term_sheet" matches
+"term sheet"), fused by reciprocal rank with embedding similarity when an
+embedding backend is available (vectors computed once per note, on its first
+question). The note's header (company, sector, brief, score) always goes in;
+the rest fills up to DEEP_DIVE_CONTEXT_CHARS in the note's own order.
+"""
+from __future__ import annotations
+import hashlib, json, threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from config import DEEP_DIVE_SECTIONS_K, DEEP_DIVE_CONTEXT_CHARS, SECTION_INDEX_CACHE, RETRIEVAL_RRF_K
+from tools.bm25 import BM25Index
+from tools.lazy import lazy_import
+from tools.note_split import is_header, split_note
+
+np = lazy_import("numpy")
+
+
+class SectionIndex:
+    def __init__(self, note: Dict[str, Any]):
+        self.note = note
+        self.sections = split_note(note)
+        self.bm25 = BM25Index([f"{p.replace('_', ' ')} {t}" for p, t in self.sections])
+        self._vecs = None
+        self._lock = threading.Lock()
+
+    def _vectors(self):
+        """Unit-norm section embeddings, computed on first use; None without an embedding backend."""
+        with self._lock:
+            if self._vecs is None:
+                try:
+                    from tools.vectorstore import _get_embeddings
+                    v = np.asarray(_get_embeddings().embed_documents([t[:2000] for _, t in self.sections]),
+                                   dtype=np.float32)
+                    self._vecs = v / np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+                except Exception:
+                    self._vecs = False          # keyword ranking only
+            return self._vecs if self._vecs is not False else None
+
+    def rank(self, question: str, k: int = DEEP_DIVE_SECTIONS_K) -> List[int]:
+        """Indices of the k sections most relevant to the question, best first."""
+        fused: Dict[int, float] = {}
+        ids, _ = self.bm25.search(question, k=k * 3)
+        for rank, i in enumerate(ids.tolist()):
+            fused[i] = fused.get(i, 0.0) + 1.0 / (RETRIEVAL_RRF_K + rank)
+        vecs = self._vectors()
+        if vecs is not None and len(vecs):
+            try:
+                from tools.vectorstore import _get_embeddings
+                q = np.asarray(_get_embeddings().embed_query(question), dtype=np.float32)
+                for rank, i in enumerate(np.argsort(-(vecs @ q))[:k * 3].tolist()):
+                    fused[i] = fused.get(i, 0.0) + 1.0 / (RETRIEVAL_RRF_K + rank)
+            except Exception:
+                pass
+        return sorted(fused, key=lambda i: -fused[i])[:k]
+
+    def context(self, question: str, k: int = DEEP_DIVE_SECTIONS_K,
+                max_chars: int = DEEP_DIVE_CONTEXT_CHARS) -> str:
+        """The header plus the relevant sections, as '## path' blocks in note order."""
+        header = [i for i, (p, _) in enumerate(self.sections) if is_header(p)]
+        chosen, used = set(), 0
+        for i in header + [i for i in self.rank(question, k) if i not in header]:
+            size = len(self.sections[i][1]) + len(self.sections[i][0]) + 5
+            if used + size > max_chars and chosen:
+                continue
+            chosen.add(i); used += size
+        return "\n\n".join(f"## {p}\n{t}" for i, (p, t) in enumerate(self.sections) if i in chosen)
+
+
+_cache: "OrderedDict[str, SectionIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def get_section_index(note: Dict[str, Any]) -> SectionIndex:
+    """SectionIndex for a note, kept in a small LRU keyed by the note's content."""
+    key = hashlib.sha1(json.dumps(note, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    with _cache_lock:
+        idx = _cache.get(key)
+        if idx is not None:
+            _cache.move_to_end(key)
+            return idx
+    idx = SectionIndex(note)
+    with _cache_lock:
+        _cache[key] = idx
+        while len(_cache) > SECTION_INDEX_CACHE:
+            _cache.popitem(last=False)
+    return idx
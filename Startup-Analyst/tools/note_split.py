@@ -0,0 +1,54 @@
+# tools/note_split.py
+"""
+How a deal note is cut into addressable sections (stdlib only).
+
+Shared by the pipeline's deep-dive retrieval (tools/note_sections.py) and the
+Gemini agent server's note index (agents-python/minimal/note_index.py, which
+ships this file in its image), so both retrieve over the same sections:
+
+    split_note(note) == [("company", "Acme"), ("facts.traction", '{"revenue":...}'), ("risks[0]", ...), ...]
+
+One section per top-level key; a dict longer than SPLIT_CHARS (as compact JSON)
+is split one level further, twice at most ("facts.traction"), and a list of
+objects is split per item ("risks[2]") when it is long or at the top level.
+"""
+from __future__ import annotations
+import json
+from typing import Any, Dict, List, Tuple
+
+HEADER_KEYS = ("company", "sector", "brief", "score")       # always part of a note's context
+SKIP_KEYS = {"sources", "run_id", "id", "createdAt", "updatedAt"}
+SPLIT_CHARS = 1200
+
+
+def compact(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, separators=(",", ":"),
+                                                           default=str)
+
+
+def is_header(path: str) -> bool:
+    """True for sections of HEADER_KEYS ("score.breakdown" included)."""
+    return path.split(".")[0].split("[")[0] in HEADER_KEYS
+
+
+def split_note(note: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """[(path, compact text)] in note order; empty values are dropped."""
+    out: List[Tuple[str, str]] = []
+
+    def walk(path: str, value: Any, depth: int):
+        if value in (None, "", [], {}):
+            return
+        big = len(compact(value)) > SPLIT_CHARS
+        if isinstance(value, dict) and big and depth < 2:
+            for k, v in value.items():
+                walk(f"{path}.{k}", v, depth + 1)
+        elif isinstance(value, list) and all(isinstance(x, dict) for x in value) and (big or depth == 0):
+            for i, item in enumerate(value):
+                out.append((f"{path}[{i}]", compact(item)))
+        else:
+            out.append((path, compact(value)))
+
+    for key, value in note.items():
+        if key not in SKIP_KEYS:
+            walk(key, value, 0)
+    return out
@@ -0,0 +1,379 @@
+# tools/note_store.py
+"""
+Indexed deal-note store (SQLite, stdlib only).
+
+Each note is stored as one row of indexed summary columns (company, sector,
+stage, score, run_id, created, Y1 revenue, max risk severity, founder text),
+its numeric facts in a (key, num) table for range queries, and the full note
+as a zlib-compressed JSON body that is only loaded on demand:
+
+    store = NoteStore()
+    store.sync_dir("outputs/notes")              # import new/changed JSON files
+    rows = store.find(sector="fintech", min_score=60)
+    note = store.get(rows[0].run_id)             # full body, lazily
+"""
+from __future__ import annotations
+import json, os, pathlib, re, sqlite3, threading, time, zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from config import NOTES_DB
+except Exception:
+    NOTES_DB = "outputs/notes.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes(
+    run_id        TEXT PRIMARY KEY,
+    company       TEXT NOT NULL,
+    company_lc    TEXT NOT NULL,
+    sector        TEXT,
+    score         REAL,
+    created       REAL,
+    y1_revenue_cr REAL,
+    founders      TEXT,
+    path          TEXT,
+    mtime         REAL,
+    stage         TEXT,
+    max_risk      INTEGER,
+    n_high_risks  INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_notes_company ON notes(company_lc, created);
+CREATE INDEX IF NOT EXISTS idx_notes_sector  ON notes(sector, score);
+CREATE INDEX IF NOT EXISTS idx_notes_score   ON notes(score);
+CREATE INDEX IF NOT EXISTS idx_notes_y1rev   ON notes(y1_revenue_cr);
+CREATE INDEX IF NOT EXISTS idx_notes_path    ON notes(path);
+CREATE INDEX IF NOT EXISTS idx_notes_stage   ON notes(stage, score);
+CREATE INDEX IF NOT EXISTS idx_notes_risk    ON notes(max_risk);
+CREATE TABLE IF NOT EXISTS note_facts(
+    run_id TEXT NOT NULL,
+    key    TEXT NOT NULL,
+    num    REAL NOT NULL,
+    PRIMARY KEY(run_id, key)
+);
+CREATE INDEX IF NOT EXISTS idx_facts_key_num ON note_facts(key, num);
+CREATE TABLE IF NOT EXISTS note_bodies(
+    run_id TEXT PRIMARY KEY,
+    body   BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS note_scores(
+    run_id       TEXT NOT NULL,
+    version      TEXT NOT NULL,
+    total        REAL,
+    risk_penalty REAL,
+    max_risk     INTEGER,
+    n_high_risks INTEGER,
+    created      REAL NOT NULL,
+    body         TEXT NOT NULL,
+    PRIMARY KEY(run_id, version)
+);
+CREATE INDEX IF NOT EXISTS idx_scores_version ON note_scores(version, total);
+"""
+
+# --- Field extraction -----------------------------------------------------------
+
+_NUM_RE = re.compile(r"-?\d+(?:,\d{2,3})*(?:\.\d+)?")
+
+def _num(v) -> Optional[float]:
+    """First number in a value ("₹12.5 Cr" -> 12.5); None if there is none."""
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    if isinstance(v, str):
+        m = _NUM_RE.search(v)
+        if m:
+            return float(m.group(0).replace(",", ""))
+    return None
+
+def _key(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (s or "").lower()).strip("_")
+
+def _legacy_sector(note: dict) -> str:
+    # older chatbot notes carry sector as {"kpis": [...]}; keep the screener's keyword inference
+    kpis = " ".join(str(k) for k in (note.get("sector") or {}).get("kpis", [])).lower()
+    if "food safety" in kpis:
+        return "foodtech"
+    if "customer acquisition" in kpis:
+        return "lifestyle"
+    return ""
+
+def note_sector(note: dict) -> str:
+    s = note.get("sector")
+    return s.strip().lower() if isinstance(s, str) else _legacy_sector(note)
+
+def y1_revenue_cr(note: dict) -> Optional[float]:
+    traction = (note.get("facts") or {}).get("traction")
+    if isinstance(traction, dict):
+        rev = traction.get("revenue")
+        if isinstance(rev, dict):
+            return _num(rev.get("Y1"))
+    return None
+
+def founders_text(note: dict) -> str:
+    parts = []
+    for f in (note.get("facts") or {}).get("founders") or []:
+        if isinstance(f, dict):
+            parts.append(" | ".join(str(f.get(k) or "") for k in ("name", "education", "background")))
+    return "\n".join(parts).lower()
+
+RISK_LEVELS = {"low": 1, "medium": 2, "high": 3}
+
+_STAGE_RE = re.compile(r"\b(pre[- ]?seed|seed|angel|bridge|pre[- ]?series[- ]?([a-e])|series[- ]?([a-e])|ipo)\b", re.I)
+
+def normalize_stage(text) -> str:
+    """'Series A round' -> 'series_a', 'Pre-seed' -> 'pre_seed'; '' when unknown."""
+    m = _STAGE_RE.search(str(text or ""))
+    if not m:
+        return ""
+    word = m.group(1).lower()
+    if m.group(3):
+        return f"series_{m.group(3).lower()}"
+    if m.group(2):
+        return f"pre_series_{m.group(2).lower()}"
+    return re.sub(r"[- ]+", "_", word)
+
+def note_stage(note: dict) -> str:
+    if note.get("stage"):
+        return normalize_stage(note["stage"])
+    fr = ((note.get("narrative") or {}).get("fundraising") or {}) if isinstance(note.get("narrative"), dict) else {}
+    return normalize_stage(fr.get("current_round") if isinstance(fr, dict) else "")
+
+def risk_summary(note: dict) -> tuple:
+    """(max severity as 0..3, number of high-severity risks)."""
+    levels = [RISK_LEVELS.get(str(r.get("severity", "")).lower(), 0)
+              for r in (note.get("risks") or []) if isinstance(r, dict)]
+    return (max(levels) if levels else 0, sum(1 for l in levels if l == 3))
+
+def numeric_facts(note: dict) -> Dict[str, float]:
+    """Flatten the numeric parts of a note into {key: number} for range filters."""
+    out: Dict[str, float] = {}
+    facts = note.get("facts") or {}
+    for section in ("traction", "unit_economics"):
+        block = facts.get(section)
+        if isinstance(block, list):
+            for it in block:
+                if isinstance(it, dict) and it.get("metric"):
+                    n = _num(it.get("value"))
+                    if n is not None:
+                        out.setdefault(f"{section}.{_key(it['metric'])}", n)
+        elif isinstance(block, dict):
+            for metric, v in block.items():
+                if isinstance(v, dict):
+                    for period, pv in v.items():
+                        n = _num(pv)
+                        if n is not None:
+                            out[f"{section}.{_key(metric)}_{_key(period)}"] = n
+                else:
+                    n = _num(v)
+                    if n is not None:
+                        out[f"{section}.{_key(metric)}"] = n
+    score = note.get("score") or {}
+    for k, v in (score.get("breakdown") or {}).items():
+        n = _num(v)
+        if n is not None:
+            out[f"score.{_key(k)}"] = n
+    return out
+
+
+# --- Store ------------------------------------------------------------------------
+
+@dataclass
+class NoteRow:
+    """Indexed summary of one note; the full body is fetched with NoteStore.get(run_id)."""
+    run_id: str
+    company: str
+    sector: str
+    score: Optional[float]
+    created: Optional[float]
+    y1_revenue_cr: Optional[float]
+    path: Optional[str]
+    stage: Optional[str] = None
+    max_risk: Optional[int] = None
+    n_high_risks: Optional[int] = None
+    founders: Optional[str] = None
+
+
+_ROW_COLS = "run_id, company, sector, score, created, y1_revenue_cr, path, stage, max_risk, n_high_risks, founders"
+
+
+class NoteStore:
+    def __init__(self, db_path: str | pathlib.Path = NOTES_DB):
+        self.db_path = str(db_path)
+        pathlib.Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.db_path, timeout=30)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    # --- writes -----------------------------------------------------------------
+    def put(self, note: dict, path: str | None = None, mtime: float | None = None) -> str:
+        run_id = str(note.get("run_id") or (pathlib.Path(path).stem if path else f"{time.time_ns()}"))
+        company = str(note.get("company") or "")
+        score = _num((note.get("score") or {}).get("total")) if isinstance(note.get("score"), dict) else None
+        created = _num(run_id.split("_", 1)[0]) if re.match(r"^\d{9,}_", run_id) else (mtime or time.time())
+        body = zlib.compress(json.dumps(note, ensure_ascii=False).encode("utf-8"), 6)
+        facts = numeric_facts(note)
+        max_risk, n_high = risk_summary(note)
+        c = self._conn()
+        with c:
+            c.execute(
+                "INSERT OR REPLACE INTO notes(run_id, company, company_lc, sector, score, created, "
+                "y1_revenue_cr, founders, path, mtime, stage, max_risk, n_high_risks) "
+                "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (run_id, company, company.strip().lower(), note_sector(note), score, created,
+                 y1_revenue_cr(note), founders_text(note), path, mtime,
+                 note_stage(note), max_risk, n_high),
+            )
+            c.execute("INSERT OR REPLACE INTO note_bodies(run_id, body) VALUES (?,?)", (run_id, body))
+            c.execute("DELETE FROM note_facts WHERE run_id=?", (run_id,))
+            c.executemany("INSERT INTO note_facts(run_id, key, num) VALUES (?,?,?)",
+                          [(run_id, k, v) for k, v in facts.items()])
+        return run_id
+
+    def put_scores(self, version: str, rows: Iterable[tuple]) -> int:
+        """
+        Store re-scores under a version label (tools/rescore.py) next to the note's own
+        score: rows are (run_id, score dict, max_risk, n_high_risks).
+        """
+        now = time.time()
+        vals = [(run_id, version, _num(score.get("total")), _num(score.get("risk_penalty")), max_risk, n_high,
+                 now, json.dumps(score, ensure_ascii=False)) for run_id, score, max_risk, n_high in rows]
+        c = self._conn()
+        with c:
+            c.executemany("INSERT OR REPLACE INTO note_scores(run_id, version, total, risk_penalty, max_risk, "
+                          "n_high_risks, created, body) VALUES (?,?,?,?,?,?,?,?)", vals)
+        return len(vals)
+
+    def sync_dir(self, notes_dir: str | pathlib.Path) -> int:
+        """Import JSON notes that are new or changed since the last sync; returns how many."""
+        known = dict(self._conn().execute("SELECT path, mtime FROM notes WHERE path IS NOT NULL"))
+        n = 0
+        try:
+            entries = list(os.scandir(notes_dir))
+        except FileNotFoundError:
+            return 0
+        for e in entries:
+            if not e.name.endswith(".json") or not e.is_file():
+                continue
+            mtime = e.stat().st_mtime
+            if known.get(e.path) == mtime:
+                continue
+            try:
+                with open(e.path, "r", encoding="utf-8") as f:
+                    note = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                continue
+            if isinstance(note, dict):
+                self.put(note, path=e.path, mtime=mtime)
+                n += 1
+        return n
+
+    # --- reads ------------------------------------------------------------------
+    def get(self, run_id: str) -> Optional[dict]:
+        r = self._conn().execute("SELECT body FROM note_bodies WHERE run_id=?", (run_id,)).fetchone()
+        return json.loads(zlib.decompress(r[0])) if r else None
+
+    def get_many(self, run_ids: Iterable[str]) -> List[dict]:
+        return [n for n in (self.get(r) for r in run_ids) if n is not None]
+
+    def latest_for_company(self, company: str) -> Optional[dict]:
+        r = self._conn().execute(
+            "SELECT run_id FROM notes WHERE company_lc=? ORDER BY created DESC LIMIT 1",
+            (company.strip().lower(),),
+        ).fetchone()
+        return self.get(r[0]) if r else None
+
+    def _where(self, *, company: str | None = None, sector: str | None = None, stage: str | None = None,
+               min_score: float | None = None, max_score: float | None = None,
+               min_y1_revenue_cr: float | None = None, founder_contains: str | None = None,
+               max_risk: int | None = None, fact_ranges: Dict[str, tuple] | None = None):
+        where, args = [], []
+        if company:
+            where.append("company_lc=?"); args.append(company.strip().lower())
+        if sector:
+            where.append("sector=?"); args.append(sector.strip().lower())
+        if stage:
+            where.append("stage=?"); args.append(normalize_stage(stage) or stage.strip().lower())
+        if min_score is not None:
+            where.append("score>=?"); args.append(min_score)
+        if max_score is not None:
+            where.append("score<=?"); args.append(max_score)
+        if min_y1_revenue_cr is not None:
+            where.append("y1_revenue_cr>=?"); args.append(min_y1_revenue_cr)
+        if founder_contains:
+            where.append("founders LIKE ?"); args.append(f"%{founder_contains.strip().lower()}%")
+        if max_risk is not None:
+            where.append("COALESCE(max_risk, 0)<=?"); args.append(int(max_risk))
+        for key, (lo, hi) in (fact_ranges or {}).items():
+            if key == "y1_revenue_cr":            # precomputed column, no join needed
+                if lo is not None:
+                    where.append("y1_revenue_cr>=?"); args.append(lo)
+                if hi is not None:
+                    where.append("y1_revenue_cr<=?"); args.append(hi)
+                continue
+            sub = "run_id IN (SELECT run_id FROM note_facts WHERE key=?"
+            args.append(key)
+            if lo is not None:
+                sub += " AND num>=?"; args.append(lo)
+            if hi is not None:
+                sub += " AND num<=?"; args.append(hi)
+            where.append(sub + ")")
+        return (" WHERE " + " AND ".join(where)) if where else "", args
+
+    def find(self, *, order_by: str = "score DESC", limit: int | None = None, **filters) -> List[NoteRow]:
+        """Rows matching the filters (see _where), best first; bodies are not loaded."""
+        if order_by not in ("score DESC", "score ASC", "created DESC", "created ASC", "company_lc ASC"):
+            raise ValueError(f"unsupported order_by: {order_by}")
+        where, args = self._where(**filters)
+        sql = f"SELECT {_ROW_COLS} FROM notes{where} ORDER BY {order_by}"
+        if limit:
+            sql += " LIMIT ?"; args.append(int(limit))
+        return [NoteRow(*r) for r in self._conn().execute(sql, args)]
+
+    def count_matching(self, **filters) -> int:
+        where, args = self._where(**filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM notes{where}", args).fetchone()[0]
+
+    def sectors(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT sector FROM notes WHERE sector<>'' ORDER BY 1")]
+
+    def stages(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT stage FROM notes WHERE stage<>'' ORDER BY 1")]
+
+    def fact_keys(self, limit: int = 50) -> List[str]:
+        """Most common numeric fact keys, for building queries."""
+        return [r[0] for r in self._conn().execute(
+            "SELECT key FROM note_facts GROUP BY key ORDER BY COUNT(*) DESC, key LIMIT ?", (limit,))]
+
+    def facts(self, run_id: str) -> Dict[str, float]:
+        return dict(self._conn().execute("SELECT key, num FROM note_facts WHERE run_id=?", (run_id,)))
+
+    def score_versions(self) -> List[dict]:
+        return [{"version": v, "notes": n, "mean_total": round(m, 2) if m is not None else None}
+                for v, n, m in self._conn().execute(
+                    "SELECT version, COUNT(*), AVG(total) FROM note_scores GROUP BY version ORDER BY MAX(created)")]
+
+    def scores(self, run_id: str) -> Dict[str, dict]:
+        """Every stored re-score of one note, by version label."""
+        return {v: json.loads(b) for v, b in self._conn().execute(
+            "SELECT version, body FROM note_scores WHERE run_id=? ORDER BY created", (run_id,))}
+
+    def ranked(self, version: str, limit: int | None = None) -> List[tuple]:
+        """(run_id, company, total) under a re-score version, best first."""
+        sql = ("SELECT s.run_id, n.company, s.total FROM note_scores s LEFT JOIN notes n USING(run_id) "
+               "WHERE s.version=? ORDER BY s.total DESC")
+        args: list = [version]
+        if limit:
+            sql += " LIMIT ?"; args.append(int(limit))
+        return list(self._conn().execute(sql, args))
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM notes").fetchone()[0]
@@ -0,0 +1,189 @@
+# tools/rescore.py
+"""
+Bulk re-scoring of the stored deal-note corpus.
+
+Scores are a pure function of a note's facts, verification, risks and finance
+(tools/scoring.py), so new weights or a new rubric do not need the pipeline
+re-run. This streams every JSON note in outputs/notes through a process pool,
+recomputes the score and risk summary, and either
+
+    - stores them in NoteStore under a version label (default; notes untouched,
+      but files the note index has not seen yet are synced into it first):
+          python -m tools.rescore --label w-2024q3 --weights '{"founders": 0.4, ...}'
+    - or rewrites each note's "score" in place, keeping the old one in
+      "score_history" (the note index is re-synced at the end):
+          python -m tools.rescore --in-place
+
+Finished files are appended to a checkpoint under RESCORE_DIR as results come back;
+re-running the same command skips them, so an interrupted job resumes where it
+stopped. The label defaults to the rubric version plus a hash of the weights, so
+the same weights always resume the same job.
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, pathlib, sys, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from config import RESCORE_DIR, RESCORE_WORKERS, RESCORE_INFLIGHT
+from tools.note_store import NoteStore, risk_summary
+from tools.scoring import DEFAULT_WEIGHTS, RUBRIC_VERSION, SCORE_KEYS, score_note, template_bullets
+
+
+def default_label(weights: Mapping[str, float]) -> str:
+    key = json.dumps({k: round(float(weights[k]), 6) for k in SCORE_KEYS}, sort_keys=True)
+    return f"r{RUBRIC_VERSION}-{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+
+
+def iter_notes(notes_dir: str | pathlib.Path) -> Iterator[str]:
+    """JSON note paths, streamed from the directory in a stable order."""
+    try:
+        names = sorted(e.name for e in os.scandir(notes_dir) if e.name.endswith(".json") and e.is_file())
+    except FileNotFoundError:
+        return
+    for name in names:
+        yield os.path.join(str(notes_dir), name)
+
+
+def _write_json(path: str, obj: Any):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def rescore_file(path: str, weights: Dict[str, float], label: str, in_place: bool) -> Dict[str, Any]:
+    """Worker: re-score one note file. Never raises; errors come back in the result."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            note = json.load(f)
+        if not isinstance(note, dict):
+            raise ValueError("note is not a JSON object")
+        old = note.get("score") if isinstance(note.get("score"), dict) else {}
+        result = score_note(note, weights)
+        feats = result.pop("features")
+        score = {**result, "bullets": template_bullets(result, feats), "rescore": label}
+        max_risk, n_high = risk_summary(note)
+        if in_place and old.get("rescore") != label:     # already rewritten by a run that died before its checkpoint
+            history = note.get("score_history") if isinstance(note.get("score_history"), list) else []
+            if old:
+                history.append({k: v for k, v in old.items() if k != "bullets"})
+            note["score"], note["score_history"] = score, history
+            _write_json(path, note)
+        return {"path": path, "run_id": str(note.get("run_id") or pathlib.Path(path).stem), "score": score,
+                "old_total": old.get("total"), "max_risk": max_risk, "n_high_risks": n_high}
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+class Checkpoint:
+    """Append-only list of finished note files for one job."""
+
+    def __init__(self, name: str, root: str | pathlib.Path = RESCORE_DIR):
+        self.path = pathlib.Path(root) / f"{name}.done"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.endswith("\n")}
+        except FileNotFoundError:
+            self.done = set()
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def mark(self, names):
+        self._f.write("".join(f"{n}\n" for n in names))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.done.update(names)
+
+    def close(self):
+        self._f.close()
+
+
+def run(notes_dir: str | pathlib.Path = "outputs/notes", weights: Optional[Mapping[str, float]] = None,
+        label: Optional[str] = None, in_place: bool = False, workers: Optional[int] = RESCORE_WORKERS,
+        store: Optional[NoteStore] = None, restart: bool = False, progress=None) -> Dict[str, Any]:
+    """Re-score every note under notes_dir; returns counts and the label used."""
+    if weights is None:
+        from tools.feedback import get_feedback_store
+        weights = get_feedback_store().weights()
+    weights = {k: float(weights.get(k, DEFAULT_WEIGHTS[k])) for k in SCORE_KEYS}
+    label = label or default_label(weights)
+    ckpt_name = f"{label}.in_place" if in_place else label
+    if restart:
+        (pathlib.Path(RESCORE_DIR) / f"{ckpt_name}.done").unlink(missing_ok=True)
+    ckpt = Checkpoint(ckpt_name)
+    store = store or NoteStore()
+    workers = workers or os.cpu_count() or 1
+    stats = {"label": label, "weights": weights, "in_place": in_place,
+             "scored": 0, "skipped": 0, "errors": 0, "delta_sum": 0.0, "n_delta": 0}
+    t0 = time.perf_counter()
+    if not in_place:
+        store.sync_dir(notes_dir)        # versioned scores join the notes table; import any note it lacks
+
+    def collect(results):
+        rows, names = [], []
+        for r in results:
+            names.append(os.path.basename(r["path"]))
+            if "error" in r:
+                stats["errors"] += 1
+                print(f"rescore: {r['path']}: {r['error']}", file=sys.stderr)
+                continue
+            stats["scored"] += 1
+            if isinstance(r["old_total"], (int, float)):
+                stats["delta_sum"] += r["score"]["total"] - r["old_total"]
+                stats["n_delta"] += 1
+            rows.append((r["run_id"], r["score"], r["max_risk"], r["n_high_risks"]))
+        if rows and not in_place:
+            store.put_scores(label, rows)
+        ckpt.mark(names)                 # only after the results are stored
+        if progress:
+            progress(stats)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for path in iter_notes(notes_dir):
+                if os.path.basename(path) in ckpt.done:
+                    stats["skipped"] += 1
+                    continue
+                pending.add(pool.submit(rescore_file, path, weights, label, in_place))
+                if len(pending) >= workers * RESCORE_INFLIGHT:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(f.result() for f in finished)
+            if pending:
+                finished, _ = wait(pending)
+                collect(f.result() for f in finished)
+    finally:
+        ckpt.close()
+    if in_place:
+        store.sync_dir(notes_dir)        # rewritten files have new mtimes
+    delta_sum, n_delta = stats.pop("delta_sum"), stats.pop("n_delta")
+    stats["mean_delta"] = round(delta_sum / n_delta, 2) if n_delta else None
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    return stats
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Re-score stored deal notes without re-running the pipeline")
+    ap.add_argument("--notes-dir", default="outputs/notes")
+    ap.add_argument("--weights", default=None,
+                    help="JSON weights, e.g. '{\"founders\": 0.4}' (unset keys use the defaults); "
+                         "default: the learned weights from analyst feedback")
+    ap.add_argument("--default-weights", action="store_true", help="use the rubric's default weights")
+    ap.add_argument("--label", default=None, help="version label (default: rubric version + weights hash)")
+    ap.add_argument("--in-place", action="store_true", help="rewrite each note's score instead of storing a version")
+    ap.add_argument("--workers", type=int, default=RESCORE_WORKERS)
+    ap.add_argument("--restart", action="store_true", help="ignore the checkpoint and re-score everything")
+    ap.add_argument("--list", action="store_true", help="show stored score versions and exit")
+    args = ap.parse_args()
+
+    if args.list:
+        for v in NoteStore().score_versions():
+            print(f"{v['version']:<24} {v['notes']:>6} notes  mean {v['mean_total']}")
+        sys.exit(0)
+    w = DEFAULT_WEIGHTS if args.default_weights else (json.loads(args.weights) if args.weights else None)
+    out = run(args.notes_dir, weights=w, label=args.label, in_place=args.in_place, workers=args.workers,
+              restart=args.restart,
+              progress=lambda s: print(f"\r{s['scored'] + s['errors']} scored, {s['skipped']} skipped",
+                                       end="", file=sys.stderr))
+    print(file=sys.stderr)
+    print(json.dumps(out, indent=2))
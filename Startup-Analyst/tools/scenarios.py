@@ -0,0 +1,257 @@
+# tools/scenarios.py
+"""
+Scenario sensitivity grids for a deal.
+
+A `Baseline` holds one company's current numbers (cash, monthly revenue and net
+burn, proposed round) taken from a deal note: the finance agent's table-derived
+signals first, then the facts extracted by IngestionAgent.llm_extract_facts, then
+the term-sheet round. `run_grid` sweeps any subset of PARAMS over ranges and
+returns ownership, post-raise runway, break-even month and default-alive grids:
+
+    base = Baseline.from_note(note)
+    res = run_grid(base, {"raise_amt": {"min": 2, "max": 10, "steps": 9},
+                          "revenue_growth_mo": [0.02, 0.05, 0.08], "churn_mo": [0.01, 0.03]})
+    res["grids"]["runway_months"]   # ndarray of res["shape"], axes in res["axes"] order
+    to_json(res)                    # the same with nested lists, for the HTTP API
+
+Everything is numpy broadcasting over orthogonal axes (one month-by-month cash
+simulation over SCENARIO_HORIZON_MO for the whole grid); nothing calls the LLM.
+Ownership only depends on pre-money / raise / ESOP and runway not on pre-money or
+ESOP, so each is computed on its own axes and broadcast at the end.
+"""
+from __future__ import annotations
+import math
+import re
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, Mapping
+
+from config import SCENARIO_HORIZON_MO, SCENARIO_MAX_CELLS
+from tools import finmath
+from tools.extractors import FINANCIAL_KEYS, parse_value
+from tools.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# sweepable parameters, in axis order; amounts in ₹ crore, rates per month as fractions
+PARAMS = ("pre_money", "raise_amt", "esop_refresh", "net_burn_mo",
+          "burn_growth_mo", "revenue_growth_mo", "churn_mo")
+METRICS = ("founders_pct", "investor_pct", "esop_pct", "post_money", "runway_months",
+           "breakeven_month", "default_alive")
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+@dataclass
+class Baseline:
+    cash: float = 0.0                 # ₹ Cr in the bank before the round
+    revenue_mo: float = 0.0           # ₹ Cr per month
+    net_burn_mo: float = 0.0          # ₹ Cr per month (expenses - revenue)
+    pre_money: float = 25.0
+    raise_amt: float = 4.0
+    esop_refresh: float = 0.10
+    burn_growth_mo: float = 0.0       # monthly growth of expenses
+    revenue_growth_mo: float = 0.0    # monthly gross revenue growth
+    churn_mo: float = 0.0             # monthly revenue churn
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> "Baseline":
+        if d is not None and not isinstance(d, Mapping):
+            raise ScenarioError(f"baseline must be an object of numbers, got {d!r}")
+        known = {f.name for f in fields(cls)}
+        out = cls()
+        for k, v in (d or {}).items():
+            if k in known and v is not None:
+                try:
+                    value = float(v)
+                except (TypeError, ValueError, OverflowError):
+                    raise ScenarioError(f"baseline.{k} must be a number, got {v!r}")
+                if not math.isfinite(value):
+                    raise ScenarioError(f"baseline.{k} must be a finite number, got {v!r}")
+                setattr(out, k, value)
+        return out
+
+    @classmethod
+    def from_note(cls, note: Mapping[str, Any]) -> "Baseline":
+        base = cls()
+        found = _from_facts(note.get("facts") or {})
+        fin = note.get("finance") if isinstance(note.get("finance"), dict) else {}
+        signals = (fin.get("computed") or {}).get("signals") or {}
+        for key, attr in (("cash", "cash"), ("revenue", "revenue_mo"), ("net_burn", "net_burn_mo")):
+            s = signals.get(key)
+            if s and s.get("unit") == "inr_cr":
+                found[attr] = s["value"]          # already monthly for flows
+        if "net_burn_mo" not in found and isinstance(fin.get("metrics"), dict):
+            burn = fin["metrics"].get("net_burn_mo")
+            if isinstance(burn, (int, float)) and fin["metrics"].get("net_burn_unit") == "inr_cr":
+                found["net_burn_mo"] = float(burn)
+        rnd = (note.get("term_sheet") or {}).get("round") if isinstance(note.get("term_sheet"), dict) else None
+        for src, attr in (("pre_money_cr", "pre_money"), ("raise_cr", "raise_amt"), ("esop_refresh", "esop_refresh")):
+            if rnd and isinstance(rnd.get(src), (int, float)):
+                found[attr] = float(rnd[src])
+        for k, v in found.items():
+            setattr(base, k, float(v))
+        return base
+
+
+_GROWTH = re.compile(r"\bgrowth\b|\bgrow", re.I)
+_CHURN = re.compile(r"\bchurn\b", re.I)
+_ANNUAL = re.compile(r"\b(?:yoy|annual|yearly|per year|p\.?a\.?|arr)\b", re.I)
+_KEYS = {k: re.compile(r"\b(?:" + "|".join(re.escape(w) for w in ws) + r")\b", re.I)
+         for k, ws in FINANCIAL_KEYS.items() if k in ("revenue", "net_burn", "cash")}
+
+
+def _monthly_rate(pct: float, annual: bool) -> float:
+    r = pct / 100.0
+    return (1.0 + r) ** (1.0 / 12.0) - 1.0 if annual and r > -1 else r
+
+
+def _from_facts(facts: Mapping[str, Any]) -> Dict[str, float]:
+    """Baseline fields from llm_extract_facts output ({"metric", "value"} lists)."""
+    out: Dict[str, float] = {}
+    for section in ("traction", "unit_economics"):
+        for it in facts.get(section) or []:
+            if not isinstance(it, dict):
+                continue
+            metric, text = str(it.get("metric") or ""), str(it.get("value") or "")
+            value, unit = parse_value(text)
+            if value is None:
+                continue
+            label = f"{metric} {text}"
+            annual = bool(_ANNUAL.search(label))
+            if unit == "pct":
+                if _CHURN.search(label):
+                    out.setdefault("churn_mo", _monthly_rate(value, annual))
+                elif _GROWTH.search(label):
+                    out.setdefault("revenue_growth_mo", _monthly_rate(value, annual))
+                continue
+            if unit != "inr_cr":
+                continue
+            if _KEYS["cash"].search(metric):
+                out.setdefault("cash", value)
+            elif _KEYS["net_burn"].search(metric):
+                out.setdefault("net_burn_mo", value / 12.0 if annual else value)
+            elif _KEYS["revenue"].search(metric):
+                out.setdefault("revenue_mo", value / 12.0 if annual else value)
+    return out
+
+
+def expand(name: str, spec: Any, max_size: int = SCENARIO_MAX_CELLS):
+    """
+    A range spec as a 1-D array: a number, a list, or {"min", "max", "steps"}.
+    More than `max_size` values is an error, raised before anything is allocated.
+    """
+    if isinstance(spec, Mapping):
+        try:
+            lo, hi = float(spec["min"]), float(spec["max"])
+            steps = int(spec.get("steps") or 5)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            raise ScenarioError(f"{name}: expected {{'min', 'max', 'steps'}}, got {spec!r}")
+        if not (math.isfinite(lo) and math.isfinite(hi)):
+            raise ScenarioError(f"{name}: min and max must be finite numbers")
+        if steps < 1:
+            raise ScenarioError(f"{name}: steps must be >= 1")
+        if steps > max_size:
+            raise ScenarioError(f"{name}: {steps} steps would put the grid over the scenario limit")
+        return np.linspace(lo, hi, steps)
+    if isinstance(spec, (list, tuple)) and len(spec) > max_size:
+        raise ScenarioError(f"{name}: {len(spec)} values would put the grid over the scenario limit")
+    try:
+        arr = np.atleast_1d(np.asarray(spec, dtype=float))
+    except (TypeError, ValueError, OverflowError):
+        raise ScenarioError(f"{name}: expected a number, a list of numbers or a min/max/steps range, got {spec!r}")
+    if arr.ndim != 1 or arr.size == 0 or not np.isfinite(arr).all():
+        raise ScenarioError(f"{name}: expected a number, a list of numbers or a min/max/steps range")
+    return arr
+
+
+def _cash_paths(b: Baseline, ax: Dict[str, Any], horizon: int):
+    """Runway and break-even month by simulating cash month by month over the grid."""
+    t = np.arange(horizon, dtype=float)        # month 1 runs at the baseline rates
+    rev0 = b.revenue_mo
+    exp0 = ax["net_burn_mo"] + rev0
+    rev = rev0 * (1.0 + ax["revenue_growth_mo"][..., None] - ax["churn_mo"][..., None]) ** t
+    exp = exp0[..., None] * (1.0 + ax["burn_growth_mo"][..., None]) ** t
+    net = exp - rev                                            # per-month net burn
+    cash = (b.cash + ax["raise_amt"])[..., None] - np.cumsum(net, axis=-1)
+
+    out_of_cash = cash < 0
+    ran_out = out_of_cash.any(axis=-1)
+    i = out_of_cash.argmax(axis=-1)
+    before = np.where(i > 0, np.take_along_axis(cash, np.maximum(i - 1, 0)[..., None], -1)[..., 0],
+                      (b.cash + ax["raise_amt"]) + np.zeros(i.shape))
+    spent = np.take_along_axis(net, i[..., None], -1)[..., 0]
+    runway = np.where(ran_out, i + np.clip(before / np.where(spent > 0, spent, 1.0), 0.0, 1.0), np.inf)
+
+    profitable = net <= 0
+    be = profitable.any(axis=-1)
+    breakeven = np.where(be, profitable.argmax(axis=-1) + 1.0, np.nan)
+    alive = be & (~ran_out | (breakeven <= runway))
+    return runway, breakeven, alive
+
+
+def run_grid(baseline: Baseline, ranges: Mapping[str, Any], horizon: int = SCENARIO_HORIZON_MO,
+             max_cells: int = SCENARIO_MAX_CELLS) -> Dict[str, Any]:
+    """
+    Evaluate every combination of `ranges` (unset PARAMS stay at the baseline).
+    Returns {"axes", "shape", "baseline", "horizon_months", "summary", "grids"},
+    where grids maps each of METRICS to an ndarray of `shape` (read-only broadcast
+    views). Runway beyond the horizon is inf; a break-even that never comes is NaN.
+    """
+    if ranges is not None and not isinstance(ranges, Mapping):
+        raise ScenarioError(f"ranges must be an object of parameter ranges, got {ranges!r}")
+    unknown = set(ranges or {}) - set(PARAMS)
+    if unknown:
+        raise ScenarioError(f"unknown parameters: {sorted(unknown)}; expected any of {list(PARAMS)}")
+    values, cells = {}, 1
+    for p in PARAMS:
+        if p in (ranges or {}):
+            # each axis is checked against what the axes before it leave of the budget
+            values[p] = expand(p, ranges[p], max_size=max_cells // cells)
+        else:
+            values[p] = np.array([getattr(baseline, p)])
+        cells *= values[p].size
+    shape = tuple(v.size for v in values.values())
+
+    ax = finmath.grid(**values)
+    split = finmath.round_split(ax["pre_money"], ax["raise_amt"], ax["esop_refresh"])
+    runway, breakeven, alive = _cash_paths(baseline, ax, horizon)
+    grids = {
+        "founders_pct": split["Founders"] * 100, "investor_pct": split["NewInvestor"] * 100,
+        "esop_pct": split["ESOP"] * 100, "post_money": split["post_money"],
+        "runway_months": runway, "breakeven_month": breakeven, "default_alive": alive,
+    }
+    grids = {k: np.broadcast_to(v, shape) for k, v in grids.items()}
+
+    summary: Dict[str, Any] = {}
+    for k, g in grids.items():
+        if g.dtype == bool:
+            summary[k] = {"share": round(float(g.mean()), 4)}
+            continue
+        finite = g[np.isfinite(g)]
+        summary[k] = ({"min": round(float(finite.min()), 2), "p50": round(float(np.median(finite)), 2),
+                       "max": round(float(finite.max()), 2), "n_open_ended": int(g.size - finite.size)}
+                      if finite.size else {"n_open_ended": int(g.size)})
+    return {
+        "axes": {p: v.round(6).tolist() for p, v in values.items()},
+        "shape": list(shape),
+        "baseline": asdict(baseline),
+        "horizon_months": horizon,
+        "summary": summary,
+        "grids": grids,
+    }
+
+
+def to_json(result: Dict[str, Any], metrics=METRICS) -> Dict[str, Any]:
+    """run_grid output with the requested grids as nested lists (inf / NaN -> null)."""
+    out = {k: v for k, v in result.items() if k != "grids"}
+    for k in metrics:
+        g = result["grids"][k]
+        if g.dtype == bool:
+            out[k] = g.tolist()
+            continue
+        a = g.round(2).astype(object)
+        a[~np.isfinite(g)] = None
+        out[k] = a.tolist()
+    return out
@@ -0,0 +1,259 @@
+# tools/scoring.py
+"""
+Deterministic deal scoring.
+
+`extract_features` turns the structured parts of a deal (IngestionAgent facts,
+DeepResearchAgent verification checks, RiskFlaggingAgent risks and the finance
+agent's table-derived numbers) into a flat dict of numeric features;
+`score_features` maps them to the four 0..100 sub-scores and a weighted total:
+
+    feats = extract_features(facts, verification, risks, finance)
+    result = score_features(feats, weights)     # {"breakdown", "total", "risk_penalty"}
+
+No LLM is involved, so a stored note can be re-scored (`score_note`) whenever
+weights or the rubric change. Missing evidence scores conservatively: every
+sub-score starts from a low base and only gains points for features that are
+actually present.
+"""
+from __future__ import annotations
+import math
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from config import INR_CR_PER_USD_M
+from tools.extractors import parse_value
+
+SCORE_KEYS = ("founders", "traction", "unit_econ", "market")
+DEFAULT_WEIGHTS = {"founders": 0.30, "traction": 0.25, "unit_econ": 0.25, "market": 0.20}
+RUBRIC_VERSION = 1            # bump when features or points change; stored with every score
+
+_STATUS = {"supported": 1.0, "mixed": 0.5, "unknown": 0.0, "refuted": -1.0}
+_SEVERITY_PENALTY = {"high": 8.0, "medium": 3.0, "low": 0.0}
+MAX_RISK_PENALTY = 25.0
+
+# claim topics, for per-dimension verification shares
+_TOPIC = {
+    "founders": re.compile(r"\b(?:founder|ceo|cto|team|ex-|alumn|iit|iim|experience|background)", re.I),
+    "traction": re.compile(r"\b(?:revenue|arr|mrr|gmv|growth|customers?|users?|orders|clients|sales)\b", re.I),
+    "unit_econ": re.compile(r"\b(?:cac|ltv|churn|margin|payback|burn|runway|retention|aov|contribution)\b", re.I),
+    "market": re.compile(r"\b(?:tam|sam|som|market|industry|sector|cagr)\b", re.I),
+}
+_PEDIGREE = re.compile(
+    r"\b(?:iit|iim|bits|isb|stanford|harvard|mit|wharton|insead|phd|mckinsey|bcg|bain|google|microsoft|amazon|"
+    r"meta|flipkart|paytm|zomato|swiggy|razorpay|ola|exit|exited|acquired|serial|founded|co-?founded)\b", re.I)
+_YEARS = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)", re.I)
+
+_METRICS = {
+    "revenue_mo": re.compile(r"\b(?:revenue|mrr|arr|gmv|sales|run[- ]?rate)\b", re.I),
+    "growth_mo_pct": re.compile(r"\b(?:growth|grow\w*|mom|yoy|cagr)\b", re.I),
+    "customers": re.compile(r"\b(?:customers?|users?|clients?|merchants?|subscribers?|orders)\b", re.I),
+    "gross_margin_pct": re.compile(r"\b(?:gross margin|contribution margin|gm)\b", re.I),
+    "ltv_cac": re.compile(r"\bltv\s*[:/]\s*cac\b|\bltv to cac\b", re.I),
+    "cac_payback_mo": re.compile(r"\bpayback\b", re.I),
+    "churn_mo_pct": re.compile(r"\bchurn\b", re.I),
+    "tam_cr": re.compile(r"\b(?:tam|total addressable|market size)\b", re.I),
+}
+_ANNUAL = re.compile(r"\b(?:yoy|annual|yearly|per year|p\.?a\.?|arr|cagr)\b", re.I)
+
+
+def _clip(x: float, lo: float = 0.0, hi: float = 100.0) -> float:
+    return max(lo, min(hi, x))
+
+
+def _log_points(x: Optional[float], full_at: float, points: float) -> float:
+    """0 at x <= 0, `points` at x >= full_at, logarithmic in between."""
+    if not x or x <= 0:
+        return 0.0
+    return points * min(1.0, math.log10(1.0 + x) / math.log10(1.0 + full_at))
+
+
+def _as_list(v) -> list:
+    if isinstance(v, list):
+        return v
+    if isinstance(v, dict):
+        return [{"metric": k, "value": x} for k, x in v.items()]
+    return []
+
+
+def _metric_items(facts: Mapping[str, Any]) -> Iterable[tuple]:
+    for section in ("traction", "unit_economics", "market"):
+        for it in _as_list(facts.get(section)):
+            if isinstance(it, dict):
+                metric, value = str(it.get("metric") or it.get("name") or ""), it.get("value")
+                if isinstance(value, dict):           # {"Y1": "..", "Y2": ".."}: latest period
+                    value = list(value.values())[-1] if value else ""
+                yield metric, str(value if value is not None else "")
+            elif isinstance(it, str):
+                yield it, it
+
+
+def _metric_features(facts: Mapping[str, Any]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for metric, text in _metric_items(facts):
+        label = f"{metric} {text}"
+        value, unit = parse_value(text)
+        if value is None:
+            continue
+        annual = bool(_ANNUAL.search(label))
+        for key, rx in _METRICS.items():
+            if key in out or not rx.search(metric or label):
+                continue
+            if key == "ltv_cac" and unit in ("x", "num"):
+                out[key] = value
+            elif key in ("growth_mo_pct", "churn_mo_pct", "gross_margin_pct") and unit == "pct":
+                if key != "gross_margin_pct" and annual:
+                    value = ((1 + value / 100.0) ** (1 / 12.0) - 1) * 100.0
+                out[key] = value
+            elif key == "cac_payback_mo" and unit in ("months", "num"):
+                out[key] = value
+            elif key == "customers" and unit == "num":
+                out[key] = value
+            elif key in ("revenue_mo", "tam_cr") and unit in ("inr_cr", "usd_m"):
+                cr = value * INR_CR_PER_USD_M if unit == "usd_m" else value
+                out[key] = cr / 12.0 if key == "revenue_mo" and annual else cr
+            else:
+                continue
+            break
+    return out
+
+
+def _founder_features(facts: Mapping[str, Any]) -> Dict[str, float]:
+    founders = [f for f in _as_list(facts.get("founders")) if isinstance(f, dict) and (f.get("name") or f.get("background"))]
+    text = [" ".join(str(f.get(k) or "") for k in ("background", "education", "experience", "role")) for f in founders]
+    years = [max([int(y) for y in _YEARS.findall(t)] or [0]) for t in text]
+    return {
+        "n_founders": float(len(founders)),
+        "founder_pedigree": float(sum(min(3, len(set(m.lower() for m in _PEDIGREE.findall(t)))) for t in text)),
+        "founder_years": float(max(years or [0])),
+        "founder_background_chars": float(sum(len(t.strip()) for t in text)),
+    }
+
+
+def _verification_features(verification: Mapping[str, Any]) -> Dict[str, float]:
+    checks = [c for c in (verification or {}).get("checks") or [] if isinstance(c, dict)]
+    out: Dict[str, float] = {"n_checks": float(len(checks))}
+    by_topic: Dict[str, List[float]] = {k: [] for k in _TOPIC}
+    statuses = []
+    for c in checks:
+        st = _STATUS.get(str(c.get("status") or "unknown").lower().strip(), 0.0)
+        statuses.append(st)
+        for k, rx in _TOPIC.items():
+            if rx.search(str(c.get("claim") or "")):
+                by_topic[k].append(st)
+    out["verified_score"] = sum(statuses) / len(statuses) if statuses else 0.0
+    out["refuted_share"] = sum(1 for s in statuses if s < 0) / len(statuses) if statuses else 0.0
+    for k, sts in by_topic.items():
+        out[f"verified_{k}"] = sum(sts) / len(sts) if sts else 0.0
+    return out
+
+
+def _risk_features(risks: Optional[Iterable[Any]]) -> Dict[str, float]:
+    sev = [str(r.get("severity") or "").lower() for r in (risks or []) if isinstance(r, dict)]
+    return {"risks_high": float(sev.count("high")), "risks_medium": float(sev.count("medium")),
+            "risks_low": float(sev.count("low"))}
+
+
+def _finance_features(finance: Optional[Mapping[str, Any]]) -> Dict[str, float]:
+    if not isinstance(finance, Mapping):
+        return {}
+    out: Dict[str, float] = {}
+    computed = finance.get("computed") or {}
+    signals = computed.get("signals") or {}
+    rev = signals.get("revenue")
+    if rev and rev.get("unit") == "inr_cr" and rev.get("period") == "month":
+        out["revenue_mo"] = float(rev["value"])
+    gm = signals.get("gross_margin")
+    if gm and gm.get("unit") == "pct":
+        out["gross_margin_pct"] = float(gm["value"])
+    runway = computed.get("runway_months")
+    if runway is None and isinstance(finance.get("metrics"), Mapping):
+        runway = finance["metrics"].get("runway_months")
+    if isinstance(runway, (int, float)) and runway > 0:
+        out["runway_months"] = float(runway)
+    return out
+
+
+def extract_features(facts: Mapping[str, Any], verification: Mapping[str, Any],
+                     risks: Optional[Iterable[Any]] = None,
+                     finance: Optional[Mapping[str, Any]] = None) -> Dict[str, float]:
+    facts = facts if isinstance(facts, Mapping) else {}
+    feats: Dict[str, float] = {}
+    feats.update(_metric_features(facts))
+    feats.update(_finance_features(finance))       # numbers read from deck tables beat LLM-extracted text
+    feats.update(_founder_features(facts))
+    feats.update(_verification_features(verification if isinstance(verification, Mapping) else {}))
+    feats.update(_risk_features(risks))
+    feats["n_market_facts"] = float(len(_as_list(facts.get("market"))))
+    return {k: round(float(v), 4) for k, v in feats.items()}
+
+
+def subscores(f: Mapping[str, float]) -> Dict[str, int]:
+    g = f.get
+    founders = (25 + 10 * min(g("n_founders", 0), 3) + 6 * min(g("founder_pedigree", 0), 5)
+                + min(g("founder_years", 0), 15) + (5 if g("founder_background_chars", 0) > 200 else 0)
+                + 15 * g("verified_founders", 0))
+    traction = (20 + _log_points(g("revenue_mo"), 1.0, 30) + _clip(g("growth_mo_pct", 0) * 1.5, 0, 20)
+                + _log_points(g("customers"), 10_000, 10) + 20 * g("verified_traction", 0))
+    unit_econ = 25.0
+    if "gross_margin_pct" in f:
+        unit_econ += _clip((g("gross_margin_pct") - 20) * 0.5, -10, 25)
+    if "ltv_cac" in f:
+        unit_econ += _clip((g("ltv_cac") - 1) * 7.5, -10, 20)
+    if "cac_payback_mo" in f:
+        unit_econ += _clip((24 - g("cac_payback_mo")) * 0.75, -10, 12)
+    if "churn_mo_pct" in f:
+        unit_econ += _clip((5 - g("churn_mo_pct")) * 2.5, -10, 10)
+    if "runway_months" in f:
+        unit_econ += _clip((g("runway_months") - 6) * 0.75, -10, 12)
+    unit_econ += 15 * g("verified_unit_econ", 0)
+    market = (30 + _log_points(g("tam_cr"), 100_000, 35) + 3 * min(g("n_market_facts", 0), 5)
+              + 20 * g("verified_market", 0))
+    raw = {"founders": founders, "traction": traction, "unit_econ": unit_econ, "market": market}
+    return {k: int(round(_clip(v))) for k, v in raw.items()}
+
+
+def risk_penalty(f: Mapping[str, float]) -> float:
+    pen = sum(_SEVERITY_PENALTY[s] * f.get(f"risks_{s}", 0) for s in ("high", "medium"))
+    return min(MAX_RISK_PENALTY, pen + 10 * f.get("refuted_share", 0))
+
+
+def score_features(features: Mapping[str, float], weights: Optional[Mapping[str, float]] = None) -> Dict[str, Any]:
+    w = {k: float((weights or DEFAULT_WEIGHTS).get(k, DEFAULT_WEIGHTS[k])) for k in SCORE_KEYS}
+    breakdown = subscores(features)
+    wsum = sum(w.values()) or 1.0
+    weighted = sum(w[k] * breakdown[k] for k in SCORE_KEYS) / wsum
+    penalty = risk_penalty(features)
+    return {
+        "breakdown": breakdown,
+        "total": round(_clip(weighted - penalty), 1),
+        "risk_penalty": round(penalty, 1),
+        "weights": {k: round(v / wsum, 4) for k, v in w.items()},
+        "rubric_version": RUBRIC_VERSION,
+    }
+
+
+def score_note(note: Mapping[str, Any], weights: Optional[Mapping[str, float]] = None) -> Dict[str, Any]:
+    """Re-score a stored deal note from its facts, verification, risks and finance."""
+    feats = extract_features(note.get("facts") or {}, note.get("verification") or {},
+                             note.get("risks") if isinstance(note.get("risks"), list) else [],
+                             note.get("finance") if isinstance(note.get("finance"), Mapping) else None)
+    return {**score_features(feats, weights), "features": feats}
+
+
+def template_bullets(result: Mapping[str, Any], features: Mapping[str, float]) -> List[str]:
+    """Plain bullets from the numbers, used when LLM bullets are off or fail."""
+    b = result["breakdown"]
+    strongest = max(SCORE_KEYS, key=lambda k: b[k])
+    weakest = min(SCORE_KEYS, key=lambda k: b[k])
+    out = [f"Total {result['total']} / 100 ({', '.join(f'{k} {b[k]}' for k in SCORE_KEYS)}).",
+           f"Strongest: {strongest.replace('_', ' ')}; weakest: {weakest.replace('_', ' ')}."]
+    n = int(features.get("n_checks", 0))
+    if n:
+        out.append(f"{n} claims checked; net verification {features.get('verified_score', 0):+.2f} "
+                   f"({features.get('refuted_share', 0):.0%} refuted).")
+    if result.get("risk_penalty"):
+        out.append(f"Risk penalty -{result['risk_penalty']} ({int(features.get('risks_high', 0))} high, "
+                   f"{int(features.get('risks_medium', 0))} medium).")
+    if "runway_months" in features:
+        out.append(f"Runway about {features['runway_months']:.0f} months.")
+    return out
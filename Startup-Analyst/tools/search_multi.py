@@ -1,13 +1,33 @@
 # tools/search_multi.py
 from __future__ import annotations
-import os, requests, time
+import os, functools
 from typing import List, Dict, Any, Tuple
-from tenacity import retry, stop_after_attempt, wait_exponential
-from urllib.parse import urlparse
 from config import (
     TAVILY_API_KEY, SERPER_API_KEY, EXA_API_KEY,
     SEARCH_TIMEOUT, SEARCH_TOPK_PER_BACKEND, SEARCH_MERGED_TOPK
 )
+from tools.tracing import span
+from tools.neardup import collapse
+from tools.urls import canonical_url, get_authority, registrable_domain
+from tools.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+def _retry(fn):
+    """tenacity @retry(2 attempts, exponential wait), applied on first call so importing this module stays cheap."""
+    wrapped = None
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        nonlocal wrapped
+        if wrapped is None:
+            from tenacity import retry, stop_after_attempt, wait_exponential
+            wrapped = retry(stop=stop_after_attempt(2), wait=wait_exponential(min=1, max=6))(fn)
+        try:
+            return wrapped(*args, **kwargs)
+        finally:
+            call.statistics = wrapped.statistics
+    return call
 
 def _norm(item: Dict[str, Any]) -> Dict[str, Any]:
     return {
@@ -19,14 +39,8 @@ def _norm(item: Dict[str, Any]) -> Dict[str, Any]:
         "published": item.get("published") or item.get("date") or "",
     }
 
-def _domain(u: str) -> str:
-    try:
-        return urlparse(u).netloc.lower()
-    except Exception:
-        return ""
-
 # --- Tavily ---
-@retry(stop=stop_after_attempt(2), wait=wait_exponential(min=1, max=6))
+@_retry
 def _tavily(q: str, k=SEARCH_TOPK_PER_BACKEND) -> List[Dict]:
     if not TAVILY_API_KEY: return []
     r = requests.post(
@@ -39,7 +53,7 @@ def _tavily(q: str, k=SEARCH_TOPK_PER_BACKEND) -> List[Dict]:
     return [_norm(x) for x in res]
 
 # --- Serper (Google SERP) ---
-@retry(stop=stop_after_attempt(2), wait=wait_exponential(min=1, max=6))
+@_retry
 def _serper(q: str, k=SEARCH_TOPK_PER_BACKEND) -> List[Dict]:
     if not SERPER_API_KEY: return []
     r = requests.post(
@@ -60,7 +74,7 @@ def _serper(q: str, k=SEARCH_TOPK_PER_BACKEND) -> List[Dict]:
     return [_norm(x) for x in items][:k]
 
 # --- Exa (semantic) ---
-@retry(stop=stop_after_attempt(2), wait=wait_exponential(min=1, max=6))
+@_retry
 def _exa(q: str, k=SEARCH_TOPK_PER_BACKEND) -> List[Dict]:
     if not EXA_API_KEY: return []
     r = requests.post(
@@ -81,46 +95,53 @@ def _exa(q: str, k=SEARCH_TOPK_PER_BACKEND) -> List[Dict]:
     return [_norm(x) for x in items]
 
 # --- Merge/rank utilities ---
-HIGH_AUTH = {
-    # boost official / high-signal domains
-    "www.mca.gov.in", "www.sec.gov", "www.sebi.gov.in", "rbi.org.in",
-    "www.bseindia.com", "www.nseindia.com", "www.ft.com", "www.wsj.com",
-    "www.bloomberg.com", "www.reuters.com", "www.economist.com",
-    "www.crunchbase.com", "www.pitchbook.com", "tracxn.com",
-    "www.statista.com", "www.oecd.org", "www.worldbank.org",
-}
-
 def _rank(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    # Deduplicate by URL (closest to canonical)
-    seen, dedup = set(), []
+    # Deduplicate by canonical URL (scheme, www/m./amp, tracking params, AMP paths);
+    # the copy with the best backend score is kept
+    by_url: Dict[str, Dict[str, Any]] = {}
     for x in items:
-        u = x.get("url","")
-        if not u or u in seen: 
+        u = canonical_url(x.get("url", ""))
+        if not u:
             continue
-        seen.add(u)
-        dedup.append(x)
+        if u not in by_url or float(x.get("score", 0.0)) > float(by_url[u].get("score", 0.0)):
+            by_url[u] = {**x, "canonical_url": u}
+    dedup = list(by_url.values())
     # Score heuristic: backend score + domain authority + freshness
     ranked = []
-    now = time.time()
+    authority = get_authority()
     for x in dedup:
         base = float(x.get("score", 0.0))
-        dom = _domain(x.get("url",""))
-        auth = 1.0 if dom in HIGH_AUTH else 0.0
+        # domain authority: most specific suffix in SEARCH_AUTHORITY_FILE, 0..1
+        auth = authority.score(x["canonical_url"])
         # crude recency: prefer if date-like string present
         recent = 0.3 if any(ch.isdigit() for ch in (x.get("published") or "")) else 0.0
         backend = 0.2 if x.get("source","").startswith("serper") else 0.1 if x.get("source")=="tavily" else 0.15 if x.get("source")=="exa" else 0.0
         ranked.append((base + auth + recent + backend, x))
     ranked.sort(key=lambda t: t[0], reverse=True)
-    return [x for _, x in ranked][:SEARCH_MERGED_TOPK]
+    # Collapse syndicated copies of one story (best-ranked copy kept); independent
+    # outlets carrying it count as corroboration
+    kept = collapse([{**x, "_score": s} for s, x in ranked], text=lambda x: f"{x.get('title', '')} {x.get('snippet', '')}",
+                    domain=lambda x: registrable_domain(x["canonical_url"]))
+    kept.sort(key=lambda x: -(x.pop("_score") + min(0.3, 0.1 * (x["corroborating_domains"] - 1))))
+    return kept[:SEARCH_MERGED_TOPK]
 
 # --- Public facade ---
+def _attempts(fn) -> int:
+    """Attempts tenacity made on the last call of a @retry-wrapped backend."""
+    stats = getattr(fn, "statistics", None) or {}
+    return int(stats.get("attempt_number", 1))
+
 def multi_search(query: str, k_total: int = SEARCH_MERGED_TOPK) -> List[Dict]:
-    results = []
-    try:   results += _tavily(query)
-    except Exception: pass
-    try:   results += _serper(query)
-    except Exception: pass
-    try:   results += _exa(query)
-    except Exception: pass
-    ranked = _rank(results)
-    return ranked[:k_total]
+    with span("search_call", query=query[:200], k_total=k_total) as sp:
+        results = []
+        for name, fn in (("tavily", _tavily), ("serper", _serper), ("exa", _exa)):
+            try:
+                got = fn(query)
+                results += got
+                sp.set(**{f"{name}.results": len(got)})
+            except Exception as e:
+                sp.add_event("backend_error", backend=name, error=f"{type(e).__name__}: {e}"[:300])
+            sp.set(**{f"{name}.attempts": _attempts(fn)})
+        ranked = _rank(results)
+        sp.set(n_raw=len(results), n_results=min(len(ranked), k_total))
+        return ranked[:k_total]
@@ -0,0 +1,234 @@
+# tools/sector_store.py
+"""
+Versioned sector knowledge store (SQLite, stdlib only).
+
+Sector KPIs and baselines, regulatory requirements and sector market sizing do
+not depend on the company being analysed, so they are built once per
+(kind, sector, geo) by the owning agent and served from here:
+
+    store = get_store()
+    kb = store.get_or_build("legal_requirements", "fintech", "India", builder)
+
+Every build is stored as a new version; reads go through an in-process dict, so
+a warm lookup is a single dict hit. Entries older than SECTOR_KB_TTL_DAYS are
+still served, and rebuilt once in the background. Refresh on a schedule (cron)
+or on demand with:
+
+    python -m tools.sector_store --refresh [--kind legal_requirements] [--sector fintech] [--geo India]
+    python -m tools.sector_store --list
+"""
+from __future__ import annotations
+import argparse, importlib, json, pathlib, sqlite3, sys, threading, time, zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import SECTOR_KB_DB, SECTOR_KB_TTL_DAYS, SECTOR_KB_KEEP_VERSIONS
+
+# kind -> (module, agent class, builder method); the builder takes (sector, geo)
+# and returns a JSON-serialisable dict. Bump the format when a builder's prompt
+# or output shape changes, so older entries are rebuilt instead of served.
+KINDS: Dict[str, Tuple[str, str, str, int]] = {
+    "sector_insight": ("agents.sector_insight", "SectorInsightAgent", "build_knowledge", 1),
+    "legal_requirements": ("agents.legal_compliance", "LegalComplianceAgent", "build_requirements", 1),
+    "market_sizing": ("agents.market_validation", "MarketValidationAgent", "build_sector_market", 1),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sector_kb(
+    kind     TEXT NOT NULL,
+    sector   TEXT NOT NULL,
+    geo      TEXT NOT NULL,
+    version  INTEGER NOT NULL,
+    format   INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    body     BLOB NOT NULL,
+    PRIMARY KEY(kind, sector, geo, version)
+);
+"""
+
+Builder = Callable[[str, str], dict]
+
+
+def _norm(s: str) -> str:
+    return " ".join((s or "").lower().split())
+
+
+@dataclass
+class Entry:
+    kind: str
+    sector: str
+    geo: str
+    version: int
+    created: float
+    body: dict
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.created > SECTOR_KB_TTL_DAYS * 86400
+
+    def meta(self) -> dict:
+        return {"kind": self.kind, "sector": self.sector, "geo": self.geo, "version": self.version,
+                "built": time.strftime("%Y-%m-%d", time.gmtime(self.created))}
+
+
+class SectorStore:
+    def __init__(self, db_path: str | pathlib.Path = SECTOR_KB_DB):
+        self.db_path = str(db_path)
+        pathlib.Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+        self._mem: Dict[Tuple[str, str, str], Entry] = {}
+        self._lock = threading.Lock()
+        self._building: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.db_path, timeout=30)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    # --- reads ------------------------------------------------------------------
+    def get(self, kind: str, sector: str, geo: str) -> Optional[Entry]:
+        """Current entry for the key (memory first, then SQLite); None if never built."""
+        key = (kind, _norm(sector), _norm(geo))
+        e = self._mem.get(key)
+        if e is not None:
+            return e
+        r = self._conn().execute(
+            "SELECT version, created, body FROM sector_kb WHERE kind=? AND sector=? AND geo=? AND format=? "
+            "ORDER BY version DESC LIMIT 1", (*key, KINDS[kind][3]),
+        ).fetchone()
+        if r is None:
+            return None
+        e = Entry(*key, r[0], r[1], json.loads(zlib.decompress(r[2])))
+        with self._lock:
+            self._mem[key] = e
+        return e
+
+    def preload(self) -> int:
+        """Load the current version of every entry into memory (worker warm-up)."""
+        rows = self._conn().execute(
+            "SELECT kind, sector, geo, MAX(version) FROM sector_kb GROUP BY kind, sector, geo").fetchall()
+        return sum(1 for k, s, g, _ in rows if k in KINDS and self.get(k, s, g) is not None)
+
+    def entries(self) -> List[dict]:
+        rows = self._conn().execute(
+            "SELECT kind, sector, geo, MAX(version), MAX(created) FROM sector_kb GROUP BY kind, sector, geo "
+            "ORDER BY kind, sector, geo").fetchall()
+        return [{"kind": k, "sector": s, "geo": g, "version": v,
+                 "built": time.strftime("%Y-%m-%d", time.gmtime(c)),
+                 "stale": time.time() - c > SECTOR_KB_TTL_DAYS * 86400} for k, s, g, v, c in rows]
+
+    # --- writes -----------------------------------------------------------------
+    def put(self, kind: str, sector: str, geo: str, body: dict) -> Entry:
+        key = (kind, _norm(sector), _norm(geo))
+        c = self._conn()
+        now = time.time()
+        with c:
+            (v,) = c.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM sector_kb WHERE kind=? AND sector=? AND geo=?",
+                             key).fetchone()
+            c.execute("INSERT INTO sector_kb(kind, sector, geo, version, format, created, body) VALUES (?,?,?,?,?,?,?)",
+                      (*key, v, KINDS[kind][3], now,
+                       zlib.compress(json.dumps(body, ensure_ascii=False).encode("utf-8"), 6)))
+            c.execute("DELETE FROM sector_kb WHERE kind=? AND sector=? AND geo=? AND version<=?",
+                      (*key, v - SECTOR_KB_KEEP_VERSIONS))
+        e = Entry(*key, v, now, body)
+        with self._lock:
+            self._mem[key] = e
+        return e
+
+    def refresh(self, kind: str, sector: str, geo: str, builder: Optional[Builder] = None) -> Entry:
+        """Rebuild one entry now (single-flight per key) and store it as a new version."""
+        key = (kind, _norm(sector), _norm(geo))
+        with self._lock:
+            gate = self._building.setdefault(key, threading.Lock())
+        with gate:
+            builder = builder or default_builder(kind)
+            return self.put(kind, sector, geo, builder(sector, geo))
+
+    def get_or_build(self, kind: str, sector: str, geo: str, builder: Optional[Builder] = None) -> Entry:
+        """
+        Current entry; built synchronously when missing, refreshed in the background
+        when stale (the stale copy is served meanwhile).
+        """
+        e = self.get(kind, sector, geo)
+        if e is None:
+            key = (kind, _norm(sector), _norm(geo))
+            with self._lock:
+                gate = self._building.setdefault(key, threading.Lock())
+            with gate:
+                e = self.get(kind, sector, geo)      # another thread may have built it
+                if e is None:
+                    e = self.put(kind, sector, geo, (builder or default_builder(kind))(sector, geo))
+            return e
+        if e.stale:
+            self._refresh_later(kind, sector, geo, builder)
+        return e
+
+    def _refresh_later(self, kind: str, sector: str, geo: str, builder: Optional[Builder]):
+        key = (kind, _norm(sector), _norm(geo))
+        with self._lock:
+            gate = self._building.setdefault(key, threading.Lock())
+        if not gate.acquire(blocking=False):
+            return                                    # already being rebuilt
+
+        def run():
+            try:
+                self.put(kind, sector, geo, (builder or default_builder(kind))(sector, geo))
+            except Exception:
+                pass                                  # keep serving the stale version
+            finally:
+                gate.release()
+        threading.Thread(target=run, name=f"sector-kb-{kind}", daemon=True).start()
+
+
+def default_builder(kind: str) -> Builder:
+    module, cls, method, _ = KINDS[kind]
+    agent = getattr(importlib.import_module(module), cls)()
+    return getattr(agent, method)
+
+
+_store: Optional[SectorStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> SectorStore:
+    """Process-wide store, shared by every Orchestrator (and worker thread)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SectorStore()
+    return _store
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Sector knowledge store")
+    ap.add_argument("--list", action="store_true", help="show stored entries")
+    ap.add_argument("--refresh", action="store_true", help="rebuild entries now")
+    ap.add_argument("--stale-only", action="store_true", help="with --refresh: only entries past the TTL")
+    ap.add_argument("--kind", choices=sorted(KINDS), default=None)
+    ap.add_argument("--sector", default=None, help="with --refresh: build this sector even if not stored yet")
+    ap.add_argument("--geo", default="India")
+    args = ap.parse_args()
+
+    store = get_store()
+    if args.refresh:
+        kinds = [args.kind] if args.kind else sorted(KINDS)
+        if args.sector:
+            targets = [(k, _norm(args.sector), _norm(args.geo)) for k in kinds]
+        else:
+            targets = [(e["kind"], e["sector"], e["geo"]) for e in store.entries()
+                       if e["kind"] in kinds and (e["stale"] or not args.stale_only)]
+        for kind, sector, geo in targets:
+            try:
+                e = store.refresh(kind, sector, geo)
+                print(f"refreshed {kind} {sector}/{geo} -> v{e.version}")
+            except Exception as ex:
+                print(f"failed {kind} {sector}/{geo}: {type(ex).__name__}: {ex}", file=sys.stderr)
+    if args.list or not args.refresh:
+        for e in store.entries():
+            print(f"{e['kind']:<20} {e['sector']:<20} {e['geo']:<10} v{e['version']:<4} "
+                  f"built {e['built']}{'  (stale)' if e['stale'] else ''}")
@@ -0,0 +1,267 @@
+# tools/tracing.py
+"""
+Lightweight nested timing spans (run -> agent -> llm_call / search_call / embed_call).
+
+    with span("llm_call", model=m) as sp:
+        ...
+        sp.set(prompt_chars=len(prompt))
+
+Spans nest through a ContextVar, so tools don't need a tracer passed in. When a
+root span ends, its whole tree is appended to TRACE_DIR/spans.jsonl, one span per
+line in the OpenTelemetry (OTLP/JSON) span shape, and can be summarised with
+`critical_path(spans)` or `python -m tools.tracing [spans.jsonl] [--run RUN_ID]`.
+"""
+from __future__ import annotations
+import contextvars, json, os, pathlib, sys, threading, time, traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from config import TRACE_DIR, TRACE_ENABLED
+except Exception:
+    TRACE_DIR, TRACE_ENABLED = "outputs/traces", True
+
+SPANS_FILE = "spans.jsonl"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_lock = threading.Lock()
+_open: Dict[str, List["Span"]] = {}   # trace_id -> finished spans awaiting the root
+_recent: "OrderedDict[str, List[Span]]" = OrderedDict()   # last few completed traces
+_RECENT_MAX = 32
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "status", "status_message")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {k: v for k, v in attributes.items() if v is not None}
+        self.events: List[dict] = []
+        self.status = "STATUS_CODE_UNSET"
+        self.status_message = ""
+
+    def set(self, **attrs):
+        self.attributes.update({k: v for k, v in attrs.items() if v is not None})
+
+    def add_event(self, name: str, **attrs):
+        self.events.append({"name": name, "timeUnixNano": time.time_ns(), "attributes": attrs})
+
+    def record_exception(self, exc: BaseException):
+        self.status = "STATUS_CODE_ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", **{
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc),
+            "exception.stacktrace": "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))[-4000:],
+        })
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attrs(self.attributes),
+            "events": [{**e, "timeUnixNano": str(e["timeUnixNano"]), "attributes": _otlp_attrs(e["attributes"])}
+                       for e in self.events],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+def _otlp_value(v: Any) -> dict:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    if isinstance(v, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(x) for x in v]}}
+    return {"stringValue": str(v)}
+
+
+def _otlp_attrs(attrs: Dict[str, Any]) -> List[dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attrs.items()]
+
+
+def _from_otlp_attrs(items: List[dict]) -> Dict[str, Any]:
+    out = {}
+    for it in items or []:
+        v = it.get("value", {})
+        if "intValue" in v:
+            out[it["key"]] = int(v["intValue"])
+        else:
+            out[it["key"]] = next(iter(v.values()), None)
+    return out
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Open a child of the current span (or a new trace); exceptions are recorded and re-raised."""
+    parent = _current.get()
+    sp = Span(name, parent, attributes)
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        sp.end_ns = time.time_ns()
+        if sp.status == "STATUS_CODE_UNSET":
+            sp.status = "STATUS_CODE_OK"
+        _finish(sp)
+
+
+def _finish(sp: Span):
+    with _lock:
+        _open.setdefault(sp.trace_id, []).append(sp)
+        if sp.parent_id:
+            return
+        spans = _open.pop(sp.trace_id)
+        _recent[sp.trace_id] = spans
+        while len(_recent) > _RECENT_MAX:
+            _recent.popitem(last=False)
+    if TRACE_ENABLED:
+        export_jsonl(spans)
+
+
+def get_trace(trace_id: str) -> List[Span]:
+    """Spans of a recently completed trace (kept in memory for the last few runs)."""
+    with _lock:
+        return list(_recent.get(trace_id, []))
+
+
+def export_jsonl(spans: List[Span], path: str | pathlib.Path | None = None):
+    p = pathlib.Path(path) if path else pathlib.Path(TRACE_DIR) / SPANS_FILE
+    p.parent.mkdir(parents=True, exist_ok=True)
+    lines = "".join(json.dumps(s.to_otlp(), ensure_ascii=False) + "\n" for s in spans)
+    with _lock:
+        with open(p, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+# --- Reporting ----------------------------------------------------------------
+
+def _as_dicts(spans) -> List[dict]:
+    out = []
+    for s in spans:
+        d = s.to_otlp() if isinstance(s, Span) else s
+        out.append({
+            "id": d["spanId"], "parent": d.get("parentSpanId") or "", "name": d["name"],
+            "start": int(d["startTimeUnixNano"]), "end": int(d["endTimeUnixNano"]),
+            "attrs": _from_otlp_attrs(d.get("attributes")),
+            "error": (d.get("status") or {}).get("code") == "STATUS_CODE_ERROR",
+        })
+    return out
+
+
+def critical_path(spans) -> dict:
+    """
+    Summarise one trace: the chain of spans that bounds the root's wall time
+    (walking back from each parent's end through the last-finishing child),
+    plus time and call counts per span name.
+    """
+    nodes = _as_dicts(spans)
+    if not nodes:
+        return {}
+    kids: Dict[str, List[dict]] = {}
+    for n in nodes:
+        kids.setdefault(n["parent"], []).append(n)
+    root = next((n for n in nodes if not n["parent"]), nodes[0])
+    total = max(1, root["end"] - root["start"])
+
+    path: List[dict] = []
+    def walk(node: dict, depth: int):
+        children = kids.get(node["id"], [])
+        busy = 0
+        cursor = node["end"]
+        chain = []
+        while True:
+            cands = [c for c in children if c["end"] <= cursor and c not in chain]
+            if not cands:
+                break
+            c = max(cands, key=lambda x: x["end"])
+            chain.append(c)
+            busy += c["end"] - c["start"]
+            cursor = c["start"]
+        path.append({
+            "name": node["name"], "depth": depth,
+            "ms": round((node["end"] - node["start"]) / 1e6, 1),
+            "self_ms": round(max(0, (node["end"] - node["start"]) - busy) / 1e6, 1),
+            "pct": round(100.0 * (node["end"] - node["start"]) / total, 1),
+            "error": node["error"],
+        })
+        for c in reversed(chain):
+            walk(c, depth + 1)
+    walk(root, 0)
+
+    by_name: Dict[str, dict] = {}
+    for n in nodes:
+        agg = by_name.setdefault(n["name"], {"n": 0, "ms": 0.0, "errors": 0})
+        agg["n"] += 1
+        agg["ms"] = round(agg["ms"] + (n["end"] - n["start"]) / 1e6, 1)
+        agg["errors"] += int(n["error"])
+    return {
+        "run_id": root["attrs"].get("run_id"),
+        "total_ms": round(total / 1e6, 1),
+        "critical_path": path,
+        "by_name": dict(sorted(by_name.items(), key=lambda kv: -kv[1]["ms"])),
+    }
+
+
+def format_report(rep: dict) -> str:
+    lines = [f"run {rep.get('run_id')} total {rep.get('total_ms', 0):.0f} ms", "critical path:"]
+    for p in rep.get("critical_path", []):
+        flag = "  !" if p["error"] else ""
+        lines.append(f"  {'  ' * p['depth']}{p['name']:<{40 - 2 * p['depth']}} {p['ms']:>9.1f} ms "
+                     f"(self {p['self_ms']:.1f}, {p['pct']:.0f}%){flag}")
+    lines.append("by span name:")
+    for k, v in rep.get("by_name", {}).items():
+        lines.append(f"  {k:<40} n={v['n']:<4} {v['ms']:>9.1f} ms  errors={v['errors']}")
+    return "\n".join(lines)
+
+
+def load_traces(path: str | pathlib.Path | None = None) -> Dict[str, List[dict]]:
+    p = pathlib.Path(path) if path else pathlib.Path(TRACE_DIR) / SPANS_FILE
+    traces: Dict[str, List[dict]] = {}
+    with open(p, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                d = json.loads(line)
+                traces.setdefault(d["traceId"], []).append(d)
+    return traces
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Critical-path report for traced runs")
+    ap.add_argument("path", nargs="?", default=None)
+    ap.add_argument("--run", default=None, help="run_id to report (default: latest run)")
+    args = ap.parse_args()
+    traces = load_traces(args.path)
+    reports = [critical_path(t) for t in traces.values()]
+    if args.run:
+        reports = [r for r in reports if r.get("run_id") == args.run]
+    if not reports:
+        sys.exit("no matching traces")
+    print(format_report(reports[-1]))
@@ -0,0 +1,164 @@
+# tools/urls.py
+"""
+URL canonicalization and domain authority.
+
+`canonical_url` maps the variants search backends return for one page to a
+single string: https, no www / m. / amp. host prefix, no default port, no
+tracking parameters (utm_*, gclid, fbclid, ...), no fragment, AMP paths and the
+Google AMP cache unwrapped, remaining query parameters sorted:
+
+    canonical_url("http://www.x.com/a/amp/?utm_source=t&id=3#top") == "https://x.com/a?id=3"
+
+`registrable_domain` and `AuthorityIndex` walk a label trie of host suffixes
+(last label first), so "www.sec.gov", "sec.gov" and "edgar.sec.gov" all match
+the "sec.gov" entry and "foo.gov.in" falls back to "gov.in". Authority scores
+are read from SEARCH_AUTHORITY_FILE ({"domains": {suffix: 0..1}}); a relative
+path is resolved against the project root, since it ships with the code.
+"""
+from __future__ import annotations
+import json, os, re, threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import SEARCH_AUTHORITY_FILE
+
+_HOST_PREFIXES = ("www", "www1", "www2", "www3", "m", "mobile", "amp")
+# only parameters that never select content: generic names such as ref, src, source or share
+# are real parameters on many sites (a git ref, a feed source) and are kept
+_TRACKING = re.compile(
+    r"^(?:utm_\w+|gclid|dclid|gbraid|wbraid|fbclid|msclkid|yclid|mc_cid|mc_eid|igshid|_ga|_gl|ref_src|"
+    r"ref_url|cmpid|spm|s_cid|__twitter_impression|amp|outputtype)$", re.I)
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*:(?!\d)", re.I)
+_AMP_CACHE = re.compile(r"(?:^|\.)cdn\.ampproject\.org$")
+
+# multi-label public suffixes the registrable domain must go one label past;
+# single-label TLDs need no entry (every host keeps at least two labels)
+PUBLIC_SUFFIXES = (
+    "co.in", "net.in", "org.in", "gov.in", "nic.in", "ac.in", "edu.in", "res.in", "firm.in", "gen.in", "ind.in",
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "com.au", "net.au", "org.au", "gov.au", "edu.au",
+    "co.jp", "ne.jp", "or.jp", "com.sg", "gov.sg", "edu.sg", "com.my", "com.br", "com.cn", "com.hk",
+    "co.za", "co.nz", "co.id", "com.mx", "co.kr", "com.tr", "com.ng", "co.ke", "github.io",
+    "blogspot.com", "substack.com", "medium.com",
+)
+
+
+class SuffixTrie:
+    """Values keyed by domain suffix; lookups return the most specific suffix of a host."""
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]] = ()):
+        self._root: Dict[str, Any] = {}
+        for suffix, value in entries:
+            self.insert(suffix, value)
+
+    def insert(self, suffix: str, value: Any):
+        node = self._root
+        for label in reversed(suffix.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node["$"] = value
+
+    def longest(self, host: str) -> Tuple[int, Any]:
+        """(labels matched, value) for the most specific stored suffix of host; (0, None) if none."""
+        node, best = self._root, (0, None)
+        for depth, label in enumerate(reversed(host.lower().strip(".").split(".")), 1):
+            node = node.get(label)
+            if node is None:
+                break
+            if "$" in node:
+                best = (depth, node["$"])
+        return best
+
+
+_PUBLIC = SuffixTrie((s, True) for s in PUBLIC_SUFFIXES)
+
+
+def _strip_host(host: str) -> str:
+    host = host.lower().strip(".")
+    labels = host.split(".")
+    while len(labels) > 2 and labels[0] in _HOST_PREFIXES:
+        labels = labels[1:]
+    return ".".join(labels)
+
+
+def host_of(url: str) -> str:
+    try:
+        return (urlsplit(url if "//" in url else f"//{url}").hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def registrable_domain(url_or_host: str) -> str:
+    """'https://news.economictimes.indiatimes.com/x' -> 'indiatimes.com'; 'a.b.co.in' -> 'b.co.in'."""
+    host = host_of(url_or_host) if ("/" in url_or_host or ":" in url_or_host) else url_or_host.lower()
+    labels = host.strip(".").split(".")
+    if len(labels) <= 2:
+        return host
+    n, _ = _PUBLIC.longest(host)
+    return ".".join(labels[-(max(n, 1) + 1):])
+
+
+def canonical_url(url: str) -> str:
+    """Canonical form of an http(s) URL (see module docstring); other strings are returned stripped."""
+    url = (url or "").strip()
+    if not url or ("://" not in url and _SCHEME.match(url)):
+        return url                                  # empty, or mailto:, tel:, data: ...
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+            return url
+        host, path = parts.hostname, parts.path or "/"
+        if _AMP_CACHE.search(host):
+            # https://www-x-com.cdn.ampproject.org/c/s/www.x.com/story -> https://x.com/story
+            m = re.match(r"^/[cv]/(?:s/)?([^/]+)(/.*)?$", path)
+            if m:
+                host, path = m.group(1), m.group(2) or "/"
+        port = parts.port
+    except ValueError:
+        return url
+    host = _strip_host(host)
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", path)
+    path = re.sub(r"(?:/amp)+/?$", "/", path)                  # /story/amp, /story/amp/
+    path = re.sub(r"^/amp(?=/)", "", path)                      # /amp/story
+    path = re.sub(r"\.amp(?=\.html?$|$)", "", path)             # story.amp.html
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _TRACKING.match(k)))
+    return urlunsplit(("https", netloc, path, query, ""))
+
+
+class AuthorityIndex:
+    """Authority score (0..1) per URL, from the most specific matching domain suffix."""
+
+    def __init__(self, scores: Optional[Dict[str, float]] = None):
+        self._trie = SuffixTrie((d, float(s)) for d, s in (scores or {}).items())
+
+    @classmethod
+    def from_file(cls, path: str = SEARCH_AUTHORITY_FILE) -> "AuthorityIndex":
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        scores = data.get("domains", data) if isinstance(data, dict) else {}
+        return cls({d: s for d, s in scores.items() if isinstance(s, (int, float))})
+
+    def score(self, url: str) -> float:
+        host = _strip_host(host_of(url))
+        return (self._trie.longest(host)[1] or 0.0) if host else 0.0
+
+
+_authority: Optional[AuthorityIndex] = None
+_authority_lock = threading.Lock()
+
+def get_authority() -> AuthorityIndex:
+    """Process-wide index, loaded from SEARCH_AUTHORITY_FILE on first use."""
+    global _authority
+    if _authority is None:
+        with _authority_lock:
+            if _authority is None:
+                _authority = AuthorityIndex.from_file()
+    return _authority
@@ -1,59 +1,152 @@
 # tools/vectorstore.py
 from __future__ import annotations
-from typing import List
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings.base import Embeddings  # <-- important
+import threading
+from functools import lru_cache
+from typing import List, Tuple
+
+from config import CHUNK_MAX_CHARS, RETRIEVAL_FETCH_K, RETRIEVAL_RRF_K
+
+# langchain / FAISS are imported on first use, not when the pipeline is imported.
+# The adapters must subclass langchain's Embeddings (FAISS checks isinstance), so
+# they are defined inside _adapters() and exposed lazily via module __getattr__.
 
 # --- Embedding adapters -------------------------------------------------------
 
-class VertexEmbeddings(Embeddings):
-    """LangChain-compatible wrapper around Vertex AI text-embedding-004."""
-    def __init__(self):
-        # lazy import so app still runs if Vertex isn't configured
-        from tools.vertex_embed import embed_texts
-        self._embed_texts = embed_texts
+@lru_cache(maxsize=None)
+def _adapters() -> Tuple[type, type, type]:
+    from langchain.embeddings.base import Embeddings  # <-- important
+
+    class VertexEmbeddings(Embeddings):
+        """LangChain-compatible wrapper around Vertex AI text-embedding-004."""
+        def __init__(self):
+            # lazy import so app still runs if Vertex isn't configured
+            from tools.vertex_embed import embed_texts
+            self._embed_texts = embed_texts
+
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            return self._embed_texts(texts)
+
+        def embed_query(self, text: str) -> List[float]:
+            return self._embed_texts([text])[0]
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return self._embed_texts(texts)
+    class HFEmbeddings(Embeddings):
+        """Fallback to local HuggingFace embeddings (no GCP auth needed)."""
+        def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+            # langchain-huggingface replaces deprecated import path
+            from langchain_huggingface import HuggingFaceEmbeddings
+            self._emb = HuggingFaceEmbeddings(model_name=model_name)
 
-    def embed_query(self, text: str) -> List[float]:
-        return self._embed_texts([text])[0]
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            return self._emb.embed_documents(texts)
 
+        def embed_query(self, text: str) -> List[float]:
+            return self._emb.embed_query(text)
 
-class HFEmbeddings(Embeddings):
-    """Fallback to local HuggingFace embeddings (no GCP auth needed)."""
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        # langchain-huggingface replaces deprecated import path
-        from langchain_huggingface import HuggingFaceEmbeddings
-        self._emb = HuggingFaceEmbeddings(model_name=model_name)
+    return Embeddings, VertexEmbeddings, HFEmbeddings
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return self._emb.embed_documents(texts)
 
-    def embed_query(self, text: str) -> List[float]:
-        return self._emb.embed_query(text)
+def __getattr__(name: str):
+    # keeps `from tools.vectorstore import VertexEmbeddings` working
+    if name in ("Embeddings", "VertexEmbeddings", "HFEmbeddings"):
+        return dict(zip(("Embeddings", "VertexEmbeddings", "HFEmbeddings"), _adapters()))[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def _get_embeddings() -> Embeddings:
+_emb = None
+_emb_lock = threading.Lock()
+
+def _get_embeddings():
     """
     Try Vertex first; if ADC/Vertex not set up, fall back to local HF.
-    Returns an Embeddings subclass instance.
+    Returns an Embeddings subclass instance, built once per process (the HF
+    fallback loads a model from disk, so rebuilding it per deal is expensive).
+    """
+    global _emb
+    if _emb is None:
+        with _emb_lock:
+            if _emb is None:
+                _, VertexEmbeddings, HFEmbeddings = _adapters()
+                try:
+                    # quick sanity import to detect Vertex availability
+                    from tools.vertex_embed import embed_texts  # noqa: F401
+                    _emb = VertexEmbeddings()
+                except Exception:
+                    _emb = HFEmbeddings()
+    return _emb
+
+# --- Hybrid retrieval -----------------------------------------------------------
+
+class HybridIndex:
     """
-    try:
-        # quick sanity import to detect Vertex availability
-        from tools.vertex_embed import embed_texts  # noqa: F401
-        return VertexEmbeddings()
-    except Exception:
-        return HFEmbeddings()
+    Dense FAISS and sparse BM25 (tools/bm25.py) over the same chunks, fused by
+    reciprocal rank: score(chunk) = sum over both rankings of 1 / (RETRIEVAL_RRF_K + rank).
+    Keyword-list queries get their exact term matches (metric tables) while
+    paraphrases still come from the embeddings. Drop-in for the FAISS store:
+    `similarity_search(query, k)` keeps its signature and anything else is
+    delegated to the FAISS object.
+
+    `filter` restricts both rankings by chunk metadata: {"page": [1, 2]},
+    {"loader": "docai_table"} (a value or a list of allowed values per key), or a
+    callable taking the metadata dict.
+    """
+
+    def __init__(self, dense, splits):
+        from tools.bm25 import BM25Index
+        self.dense = dense
+        self.splits = splits
+        self.bm25 = BM25Index([d.page_content for d in splits])
+
+    def __getattr__(self, name):
+        return getattr(self.dense, name)
+
+    def _allowed(self, flt):
+        if flt is None:
+            return None
+        if callable(flt):
+            return [bool(flt(d.metadata)) for d in self.splits]
+        def ok(md):
+            for key, want in flt.items():
+                have = md.get(key)
+                if isinstance(want, (list, tuple, set, frozenset)):
+                    if have not in want:
+                        return False
+                elif have != want:
+                    return False
+            return True
+        return [ok(d.metadata) for d in self.splits]
+
+    def similarity_search(self, query: str, k: int = 4, filter=None, fetch_k: int | None = None, **kwargs):
+        n = len(self.splits)
+        if n == 0:
+            return []
+        allowed = self._allowed(filter)
+        fetch = min(n, max(k, fetch_k or RETRIEVAL_FETCH_K))
+        # a flat per-deal index is cheap to rank in full when a filter may discard most hits
+        dense = self.dense.similarity_search(query, k=n if allowed is not None else fetch)
+        dense_ids = [d.metadata["chunk_idx"] for d in dense
+                     if allowed is None or allowed[d.metadata["chunk_idx"]]][:fetch]
+        sparse_ids, _ = self.bm25.search(query, k=fetch, mask=allowed)
+
+        fused: dict = {}
+        for ranking in (dense_ids, sparse_ids.tolist()):
+            for rank, i in enumerate(ranking, 1):
+                fused[i] = fused.get(i, 0.0) + 1.0 / (RETRIEVAL_RRF_K + rank)
+        best = sorted(fused, key=lambda i: (-fused[i], i))[:k]
+        return [self.splits[i] for i in best]
+
 
 # --- Index builder ------------------------------------------------------------
 
-def build_index(docs, chunk_size: int = 1400, overlap: int = 200):
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap)
-    splits = splitter.split_documents(docs)
+def build_index(docs, chunk_size: int = CHUNK_MAX_CHARS, overlap: int = 200):
+    from langchain_community.vectorstores import FAISS
+    from tools.chunking import chunk_documents
+
+    # one chunk per slide / table / page section (tools/chunking.py), not a fixed window
+    splits = chunk_documents(docs, max_chars=chunk_size, overlap=overlap)
+    for i, d in enumerate(splits):
+        d.metadata = {**d.metadata, "chunk_idx": i}      # position in splits, for rank fusion
     texts = [d.page_content for d in splits]
     metadatas = [d.metadata for d in splits]
 
     emb = _get_embeddings()  # proper Embeddings object
-    return FAISS.from_texts(texts, embedding=emb, metadatas=metadatas)
+    return HybridIndex(FAISS.from_texts(texts, embedding=emb, metadatas=metadatas), splits)
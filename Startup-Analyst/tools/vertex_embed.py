@@ -8,12 +8,23 @@ from config import (
     VERTEX_LOCATION,
     GCP_PROJECT,
 )
+from tools.tracing import span
 
 # Conservative per-chunk char cap to avoid hitting 20k token per request limits.
 # 4000 chars ~ 1000-1500 tokens roughly; well under model limits.
 _HARD_CHUNK_CHARS = 4000
 _MAX_BATCH = 16  # small batches = fewer gRPC payloads
 
+_model = None
+def _model_once():
+    # loaded once per process; long-lived workers reuse it across deals
+    global _model
+    if _model is None:
+        _model = TextEmbeddingModel.from_pretrained(VERTEX_EMBED_MODEL,
+                                                    location=VERTEX_LOCATION,
+                                                    project=GCP_PROJECT)
+    return _model
+
 def _chunk_text(t: str, max_chars: int = _HARD_CHUNK_CHARS) -> List[str]:
     if not t:
         return [""]
@@ -49,9 +60,7 @@ def embed_texts(texts: List[str]) -> List[List[float]]:
       - embed chunks in small batches,
       - average chunk vectors back to a single vector per original text.
     """
-    model = TextEmbeddingModel.from_pretrained(VERTEX_EMBED_MODEL, 
-                                               location=VERTEX_LOCATION, 
-                                               project=GCP_PROJECT)
+    model = _model_once()
 
     # Pre-chunk every text aggressively to prevent 20k token errors.
     # Keep a mapping so we can pool chunk vectors per original text.
@@ -69,17 +78,19 @@ def embed_texts(texts: List[str]) -> List[List[float]]:
 
     # Embed chunks in small batches
     chunk_embeddings: List[List[float]] = []
-    for b in range(0, len(all_chunks), _MAX_BATCH):
-        batch = all_chunks[b:b+_MAX_BATCH]
-        # Vertex SDK expects a list of strings
-        pred = model.get_embeddings(batch)  # returns list of Embedding
-        # Extract floats (Embedding.values) for each chunk
-        for emb in pred:
-            # Some SDK versions expose "values", others "embedding.values"
-            vec = getattr(emb, "values", None)
-            if vec is None and hasattr(emb, "embedding"):
-                vec = getattr(emb.embedding, "values", None)
-            chunk_embeddings.append(list(vec or []))
+    with span("embed_call", model=VERTEX_EMBED_MODEL, n_texts=len(texts), n_chunks=len(all_chunks),
+              n_batches=-(-len(all_chunks) // _MAX_BATCH), chars=sum(len(c) for c in all_chunks)):
+        for b in range(0, len(all_chunks), _MAX_BATCH):
+            batch = all_chunks[b:b+_MAX_BATCH]
+            # Vertex SDK expects a list of strings
+            pred = model.get_embeddings(batch)  # returns list of Embedding
+            # Extract floats (Embedding.values) for each chunk
+            for emb in pred:
+                # Some SDK versions expose "values", others "embedding.values"
+                vec = getattr(emb, "values", None)
+                if vec is None and hasattr(emb, "embedding"):
+                    vec = getattr(emb.embedding, "values", None)
+                chunk_embeddings.append(list(vec or []))
 
     # Pool back to one vector per original text
     out: List[List[float]] = []
@@ -1,27 +1,28 @@
 import json
 import logging
 import os
-import glob
-from gemini_llm import call_gemini_llm
+from typing import Optional
+from gemini_llm import call_gemini_llm  # also puts Startup-Analyst on sys.path
+from tools.note_store import NoteStore
+from tools.note_query import NoteQuery, QUERY_SCHEMA, parse_rules, run_query
 
 # --- Basic Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # --- Data Loading ---
-def load_deal_notes(path: str = "notes") -> list:
-    deal_notes = []
-    json_files = glob.glob(os.path.join(path, '*.json'))
-    if not json_files:
+def load_deal_notes(path: str = "notes") -> NoteStore:
+    """
+    Open the indexed deal-note store kept next to the JSON notes in `path`.
+    Only new or changed files are parsed; note bodies are loaded lazily per match.
+    """
+    store = NoteStore(os.path.join(path, "index.sqlite"))
+    added = store.sync_dir(path)
+    if not store.count():
         logger.warning(f"No JSON files found in the '{path}' directory.")
-        return []
-    for file_path in json_files:
-        try:
-            with open(file_path, 'r') as f:
-                deal_notes.append(json.load(f))
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Failed to load or parse {file_path}. Error: {e}")
-    return deal_notes
+    elif added:
+        logger.info(f"Indexed {added} new or changed deal notes from '{path}'.")
+    return store
 
 # --- Helper function for robust revenue access ---
 def get_y1_revenue(deal):
@@ -31,19 +32,25 @@ def get_y1_revenue(deal):
         return traction_data.get('revenue', {}).get('Y1', 'N/A')
     return 'N/A' # Return 'N/A' if traction is a list (like Naario's) or not found
 
-# --- Chatbot Core Logic ---
-def run_deal_screener_chatbot(user_query: str, all_deals: list):
-    if not all_deals:
-        logger.warning("Cannot run the chatbot as no deal notes were loaded.")
-        return "No deal notes available to search through."
-    
-    logger.info(f"Investor Query: '{user_query}'")
+# --- Query translation ---
+def translate_query(user_query: str, store: NoteStore) -> Optional[NoteQuery]:
+    """
+    Natural language -> NoteQuery. Simple phrasings are parsed deterministically;
+    only queries the rules can't fully explain cost one Gemini call.
+    """
+    q = parse_rules(user_query, store.sectors())
+    if q is not None:
+        logger.info(f"Rule-parsed query: {q.to_dict()}")
+        return q
     extraction_prompt = f"""
-    You are a data extraction expert. From the user's query, extract search criteria into a JSON object.
-    Only use these keys: 'sector', 'min_y1_revenue_cr', 'founder_education_contains'.
-    - 'sector' must be one of ["foodtech", "lifestyle"]. If not mentioned, the value should be null.
-    - 'min_y1_revenue_cr' must be a number. If not mentioned, the value should be null.
-    - 'founder_education_contains' must be a string. If not mentioned, the value should be null.
+    You are a data extraction expert. Translate the user's query into a JSON search query with this shape:
+    {QUERY_SCHEMA}
+    - 'sector' must be one of {store.sectors()} or null.
+    - 'stage' must be one of {store.stages() or ["pre_seed", "seed", "series_a", "series_b"]} or null.
+    - Scores are 0-100. 'max_risk' excludes deals with any risk more severe than it.
+    - 'ranges' maps a numeric field to [min, max] (use null for an open end). Known fields:
+      {["y1_revenue_cr"] + store.fact_keys(30)}
+    - 'founder_contains' matches founder name, education or background text.
     User Query: "{user_query}"
     Respond with ONLY the JSON object and nothing else.
     """
@@ -51,58 +58,57 @@ def run_deal_screener_chatbot(user_query: str, all_deals: list):
     try:
         json_start = structured_query_str.find('{')
         json_end = structured_query_str.rfind('}') + 1
-        query_params = json.loads(structured_query_str[json_start:json_end])
-        logger.info(f"Extracted Query Params: {query_params}")
+        q = NoteQuery.from_dict(json.loads(structured_query_str[json_start:json_end]))
+        logger.info(f"Extracted Query Params: {q.to_dict()}")
+        return q
     except (json.JSONDecodeError, IndexError):
         logger.error(f"Failed to parse LLM response for query extraction: {structured_query_str}")
-        return "Sorry, I had trouble understanding your criteria. Please try a different phrasing."
+        return None
 
-    # Filtering logic
-    matching_deals = []
-    for deal in all_deals:
-        match = True
-        if 'min_y1_revenue_cr' in query_params and query_params['min_y1_revenue_cr'] is not None:
-            y1_revenue = get_y1_revenue(deal) # Use the helper function
-            if y1_revenue == 'N/A' or y1_revenue < query_params['min_y1_revenue_cr']:
-                match = False
-        if 'sector' in query_params and query_params['sector'] is not None:
-            deal_sector = ""
-            kpis_str = " ".join(deal.get('sector', {}).get('kpis', [])).lower()
-            if "food safety" in kpis_str: deal_sector = "foodtech"
-            elif "customer acquisition" in kpis_str: deal_sector = "lifestyle"
-            if deal_sector != query_params['sector']: match = False
-        if 'founder_education_contains' in query_params and query_params['founder_education_contains'] is not None:
-            founders = deal.get('facts', {}).get('founders', [])
-            search_term = query_params['founder_education_contains'].lower()
-            if not any(search_term in (f.get('education') or '').lower() for f in founders): match = False
-        if match:
-            matching_deals.append(deal)
+# --- Chatbot Core Logic ---
+def run_deal_screener_chatbot(user_query: str, store: NoteStore, top_n: int = 10):
+    if not store.count():
+        logger.warning("Cannot run the chatbot as no deal notes were loaded.")
+        return "No deal notes available to search through."
+    
+    logger.info(f"Investor Query: '{user_query}'")
+    query = translate_query(user_query, store)
+    if query is None:
+        return "Sorry, I had trouble understanding your criteria. Please try a different phrasing."
+    query.limit = min(query.limit, top_n)
 
-    if not matching_deals:
+    # Filtering runs on the store's precomputed columns; only the top-N bodies are loaded
+    rows, total = run_query(store, query)
+    if not rows:
         return "No companies found matching your criteria."
+    matching_deals = store.get_many(r.run_id for r in rows)
 
     # Use the helper function in the summary creation
     results_context = json.dumps([
         {
             "company": d.get("company"),
+            "sector": r.sector,
+            "stage": r.stage,
+            "score": r.score,
             "summary": f"Y1 Revenue: {get_y1_revenue(d)} Cr.",
             "founders": [(f.get('name'), f.get('education')) for f in d.get('facts', {}).get('founders', [])]
-        } for d in matching_deals
+        } for r, d in zip(rows, matching_deals)
     ])
     
     presentation_prompt = f"""
     Based on the provided data, present the search results to the investor. The user's original query was: "{user_query}". For each company, provide a brief, compelling summary.
+    {f"These are the top {len(rows)} of {total} matching companies, ranked by score; say so." if total > len(rows) else ""}
     """
     final_response = call_gemini_llm(user_prompt=presentation_prompt, context=results_context)
     return final_response
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
-    all_deal_notes = load_deal_notes()
-    if all_deal_notes:
+    deal_store = load_deal_notes()
+    if deal_store.count():
         print("="*50)
-        print(run_deal_screener_chatbot("Find me companies that made over 20 Cr in their first year", all_deal_notes))
+        print(run_deal_screener_chatbot("Find me companies that made over 20 Cr in their first year", deal_store))
         print("\n" + "="*50)
-        print(run_deal_screener_chatbot("Show me startups with founders from NIT Warangal", all_deal_notes))
+        print(run_deal_screener_chatbot("Show me startups with founders from NIT Warangal", deal_store))
         print("\n" + "="*50)
-        print(run_deal_screener_chatbot("Which companies are in the foodtech sector?", all_deal_notes))
+        print(run_deal_screener_chatbot("Which companies are in the foodtech sector?", deal_store))
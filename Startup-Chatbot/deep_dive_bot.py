@@ -1,51 +1,47 @@
-import json
 import logging
 import os
-import glob
-from gemini_llm import call_gemini_llm
+from gemini_llm import call_gemini_llm  # also puts Startup-Analyst on sys.path
+from tools.note_store import NoteStore
+from tools.note_sections import get_section_index
 
 # --- Basic Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # --- Data Loading ---
-def load_deal_notes(path: str = "notes") -> list:
-    deal_notes = []
-    json_files = glob.glob(os.path.join(path, '*.json'))
-    if not json_files:
+def load_deal_notes(path: str = "notes") -> NoteStore:
+    """
+    Open the indexed deal-note store kept next to the JSON notes in `path`.
+    Only new or changed files are parsed; note bodies are loaded lazily per match.
+    """
+    store = NoteStore(os.path.join(path, "index.sqlite"))
+    added = store.sync_dir(path)
+    if not store.count():
         logger.warning(f"No JSON files found in the '{path}' directory.")
-        return []
-    for file_path in json_files:
-        try:
-            with open(file_path, 'r') as f:
-                deal_notes.append(json.load(f))
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Failed to load or parse {file_path}. Error: {e}")
-    return deal_notes
+    elif added:
+        logger.info(f"Indexed {added} new or changed deal notes from '{path}'.")
+    return store
 
 # --- Chatbot Core Logic ---
-def run_deep_dive_chatbot(user_question: str, company_name: str, all_deals: list):
+def run_deep_dive_chatbot(user_question: str, company_name: str, store: NoteStore):
     """
     Answers deep-dive questions about a specific company using its deal note as context.
     """
     logger.info(f"Deep Dive on {company_name} - Question: '{user_question}'")
     
-    # 1. Retrieve the correct deal note
-    target_deal_note = None
-    for deal in all_deals:
-        if deal.get('company', '').lower() == company_name.lower():
-            target_deal_note = deal
-            break
+    # 1. Retrieve the correct deal note (indexed lookup; latest run wins)
+    target_deal_note = store.latest_for_company(company_name)
             
     if not target_deal_note:
         return f"Sorry, I could not find a deal note for '{company_name}'."
         
-    # 2. Augment the prompt with the full deal note as context
-    context = json.dumps(target_deal_note, indent=2)
+    # 2. Augment the prompt with only the sections relevant to the question
+    #    (the section index is cached per note, so follow-up questions reuse it)
+    context = get_section_index(target_deal_note).context(user_question)
     
     # 3. Generate the answer with a strict prompt to prevent hallucination
     qa_prompt = f"""
-    You are a meticulous VC analyst assistant. Your task is to answer the user's question based *strictly* and *only* on the provided context (the company's deal note).
+    You are a meticulous VC analyst assistant. Your task is to answer the user's question based *strictly* and *only* on the provided context (the relevant sections of the company's deal note).
     - If the answer is in the context, provide it clearly and concisely. You can quote specific numbers or facts.
     - If the information is not present in the context, you MUST respond with: "This information is not available in the provided deal note."
     - Do not use any external knowledge or make assumptions.
@@ -58,17 +54,17 @@ def run_deep_dive_chatbot(user_question: str, company_name: str, all_deals: list
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
-    all_deal_notes = load_deal_notes()
-    if all_deal_notes:
+    deal_store = load_deal_notes()
+    if deal_store.count():
         # Example 1: A question where the answer is clearly in the Hexafun JSON
-        print(run_deep_dive_chatbot("What is the vesting period for founders at Hexafun?", "Hexafun", all_deal_notes))
+        print(run_deep_dive_chatbot("What is the vesting period for founders at Hexafun?", "Hexafun", deal_store))
         
         print("\n" + "="*50)
         
         # Example 2: A question about a founder from the Naario JSON
-        print(run_deep_dive_chatbot("Tell me about Anamika Pandey's background", "Naario", all_deal_notes))
+        print(run_deep_dive_chatbot("Tell me about Anamika Pandey's background", "Naario", deal_store))
         
         print("\n" + "="*50)
 
         # Example 3: A question where the answer is NOT in the JSON, to test the "I don't know" response
-        print(run_deep_dive_chatbot("What is Naario's month-over-month revenue growth?", "Naario", all_deal_notes))
+        print(run_deep_dive_chatbot("What is Naario's month-over-month revenue growth?", "Naario", deal_store))
@@ -9,6 +9,11 @@ import sys
 import requests
 from urllib.parse import urlparse
 import base64
+import datetime
+import threading
+import time
+from note_index import Embedder, NoteIndex
+from session_cache import SessionCache, SESSION_TTL_S
 
 # Add path to import from Startup-Analyst
 sys.path.append('/app/Startup-Analyst')
@@ -41,16 +46,45 @@ app = Flask(__name__)
 
 # Backend API URL
 BACKEND_API_URL = os.environ.get("BACKEND_API_URL", "https://analyst-backend-549120538825.us-central1.run.app")
+# one pooled HTTP session for backend calls, so chat turns reuse the TLS connection
+_backend = requests.Session()
 
-def call_gemini_llm(prompt: str, context: str = "") -> str:
-    """Call Gemini API with the given prompt and context."""
+# Deal-note retrieval for the screener (note_index.py)
+SCREENER_TOP_N = int(os.environ.get("SCREENER_TOP_N", "8"))            # notes sent to the LLM per query
+DEEP_DIVE_SECTIONS_K = int(os.environ.get("DEEP_DIVE_SECTIONS_K", "8"))  # note sections per deep-dive question
+DEEP_DIVE_CONTEXT_CHARS = int(os.environ.get("DEEP_DIVE_CONTEXT_CHARS", "8000"))
+NOTE_INDEX_REFRESH_S = float(os.environ.get("NOTE_INDEX_REFRESH_S", "60"))  # backend re-sync interval
+
+# Gemini context caching for the static part of a session's prompt (a large deal note)
+GEMINI_CONTEXT_CACHE = os.environ.get("GEMINI_CONTEXT_CACHE", "1") not in ("0", "false", "False")
+GEMINI_CACHE_MIN_CHARS = int(os.environ.get("GEMINI_CACHE_MIN_CHARS", "16000"))  # below the API's token minimum
+
+_sessions = SessionCache()
+_note_index = None
+_note_index_synced = 0.0
+_note_index_lock = threading.Lock()
+
+def call_gemini_llm(prompt: str, context: str = "", history: str = "", cached_content=None) -> str:
+    """
+    Call Gemini API with the given prompt and context. `history` is the session's
+    earlier turns; `cached_content` is a Gemini cache already holding static context.
+    """
     try:
         if not GEMINI_API_KEY:
             logger.warning("Using mock response because GEMINI_API_KEY is not set")
             return f"Mock response for: {prompt[:50]}..."
         
         # Create a model instance
-        model = genai.GenerativeModel(GEMINI_MODEL_ID)
+        if cached_content is not None:
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        else:
+            model = genai.GenerativeModel(GEMINI_MODEL_ID)
+        
+        if history:
+            prompt = f"""CONVERSATION SO FAR:
+            {history}
+            
+            {prompt}"""
         
         # Generate a response with context if provided
         if context:
@@ -74,6 +108,37 @@ def call_gemini_llm(prompt: str, context: str = "") -> str:
         logger.error(f"ERROR: Could not invoke Gemini LLM. Reason: {e}")
         return f"ERROR: Gemini LLM invocation failed. Details: {e}"
 
+def gemini_session_cache(session, static_text, system_instruction):
+    """
+    A Gemini cached-content entry holding `static_text` for this session, created on
+    first use, its TTL extended on every later use, and deleted when the session is
+    evicted. None when caching is off, the text is below the API minimum, or the SDK /
+    model does not support it.
+    """
+    if not (GEMINI_API_KEY and GEMINI_CONTEXT_CACHE and session.id) or session.gemini_cache_failed \
+            or len(static_text) < GEMINI_CACHE_MIN_CHARS:
+        return None
+    if session.gemini_cache is not None:
+        # the session's TTL slides with every message; keep the cache alive as long
+        try:
+            session.gemini_cache.update(ttl=datetime.timedelta(seconds=SESSION_TTL_S))
+        except Exception as e:
+            logger.info(f"Gemini context cache for session {session.id} is gone, recreating it: {e}")
+            session.gemini_cache = None
+    if session.gemini_cache is None:
+        try:
+            from google.generativeai import caching
+            session.gemini_cache = caching.CachedContent.create(
+                model=GEMINI_MODEL_ID, display_name=f"{session.kind}-{session.id}"[:120],
+                system_instruction=system_instruction, contents=[static_text],
+                ttl=datetime.timedelta(seconds=SESSION_TTL_S))
+            logger.info(f"Created Gemini context cache for session {session.id} ({len(static_text)} chars)")
+        except Exception as e:
+            logger.info(f"Gemini context caching unavailable for session {session.id}: {e}")
+            session.gemini_cache_failed = True
+            return None
+    return session.gemini_cache
+
 def download_pdf_from_url(url):
     """Download a PDF from a URL."""
     try:
@@ -114,7 +179,7 @@ def search_deal_notes(query):
         logger.info(f"Headers: {headers}")
         logger.info(f"Payload: {payload}")
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = _backend.post(url, headers=headers, json=payload)
         logger.info(f"RAG endpoint response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -149,7 +214,7 @@ def get_pitch_deck_download_url(pitch_deck_id):
         }
         
         logger.info(f"Fetching signed URL from: {url}")
-        response = requests.get(url, headers=headers)
+        response = _backend.get(url, headers=headers)
         logger.info(f"Download URL response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -165,7 +230,10 @@ def get_pitch_deck_download_url(pitch_deck_id):
         return None
 
 def get_all_deal_notes():
-    """Get all deal notes from the backend."""
+    """
+    Get all deal notes from the backend; None when the fetch fails, so a backend
+    error is not mistaken for an empty portfolio.
+    """
     try:
         url = f"{BACKEND_API_URL}/v1/deal-notes"
         headers = {
@@ -175,26 +243,78 @@ def get_all_deal_notes():
         
         logger.info(f"Fetching all deal notes from {url}")
         
-        response = requests.get(url, headers=headers)
+        response = _backend.get(url, headers=headers)
         logger.info(f"Deal notes response status: {response.status_code}")
         
         if response.status_code == 200:
             result = response.json()
-            num_results = len(result.get('dealNotes', []))
+            deal_notes = result.get('dealNotes', []) if isinstance(result, dict) else None
+            if not isinstance(deal_notes, list):
+                logger.error(f"Unexpected deal notes response: {str(result)[:200]}")
+                return None
+            num_results = len(deal_notes)
             logger.info(f"Got {num_results} deal notes")
             
             if num_results > 0:
-                logger.info(f"First deal note company: {result.get('dealNotes', [])[0].get('dealNote', {}).get('company', 'Unknown')}")
+                logger.info(f"First deal note company: {deal_notes[0].get('dealNote', {}).get('company', 'Unknown')}")
             else:
                 logger.info("No deal notes found")
                 
-            return result.get('dealNotes', [])
+            return deal_notes
         else:
             logger.error(f"Failed to get deal notes: {response.status_code} - {response.text}")
-            return []
+            return None
     except Exception as e:
         logger.error(f"Error getting deal notes: {e}")
-        return []
+        return None
+
+def get_note_index(sync=True):
+    """
+    The process-wide deal-note index, re-synced with the backend at most every
+    NOTE_INDEX_REFRESH_S seconds; only new or changed notes are embedded.
+    """
+    global _note_index, _note_index_synced
+    with _note_index_lock:
+        if _note_index is None:
+            _note_index = NoteIndex.load(embedder=Embedder(bool(GEMINI_API_KEY)))
+        if sync and time.time() - _note_index_synced >= NOTE_INDEX_REFRESH_S:
+            try:
+                deal_notes = get_all_deal_notes()
+                if deal_notes is None:
+                    # backend unavailable: keep the notes embedded so far and retry on the next message
+                    return _note_index
+                if _note_index.sync(deal_notes):
+                    _note_index.save()
+                _note_index_synced = time.time()
+            except Exception as e:
+                # keep serving the notes embedded so far; the next message retries
+                logger.error(f"Error syncing deal-note index: {e}")
+        return _note_index
+
+def format_screener_context(hits, stats):
+    """Summary plus the best-matching sections of each retrieved deal note."""
+    if not stats["total"]:
+        return "No startups found in our database."
+    if not hits:
+        return (f"None of the {stats['total']} startups in our database match the criteria "
+                f"{stats['filters']}.")
+    context = (f"Our database has {stats['total']} startups; {stats['matched']} match the query's criteria. "
+               f"The {len(hits)} most relevant are:\n\n")
+    for idx, hit in enumerate(hits):
+        f = hit["fields"]
+        score = f["score"] if f["score"] is not None else "N/A"
+        context += f"{idx+1}. {f['company']} (Score: {score})\n"
+        if f["sector"]:
+            context += f"   Sector: {f['sector']}" + (f", Stage: {f['stage']}" if f["stage"] else "") + "\n"
+        if f["description"]:
+            context += f"   Description: {f['description'][:200]}...\n"
+        if f["revenue_y1"] is not None or f["revenue_y5"] is not None:
+            context += f"   Revenue: Y1: {f['revenue_y1'] if f['revenue_y1'] is not None else 'N/A'}, " \
+                       f"Y5: {f['revenue_y5'] if f['revenue_y5'] is not None else 'N/A'}\n"
+        for _, text in hit["sections"]:
+            context += f"   {text[:300]}\n"
+        context += "\n"
+    return context
 
 @app.route('/api/generate-questionnaire', methods=['POST'])
 def generate_questionnaire():
@@ -321,43 +441,20 @@ def deal_screener():
         session_id = data.get('sessionId')
         
         logger.info(f"Deal screener received message: {message}")
-        
-        # Get all deal notes instead of using RAG
-        deal_notes = get_all_deal_notes()
-        logger.info(f"Retrieved {len(deal_notes)} deal notes for processing")
-        
-        # Format the deal notes as context for the LLM
-        context = ""
-        if deal_notes:
-            context = "Here are all the startups in our database:\n\n"
-            for idx, deal_note in enumerate(deal_notes):
-                try:
-                    # Extract essential information
-                    company_name = deal_note.get('dealNote', {}).get('company', 'Unknown Company')
-                    description = deal_note.get('dealNote', {}).get('description', 'No description available')
-                    score = deal_note.get('dealNote', {}).get('score', {}).get('total', 'N/A')
-                    
-                    context += f"{idx+1}. {company_name} (Score: {score})\n"
-                    if description:
-                        context += f"   Description: {description[:200]}...\n"
-                    
-                    # Add key metrics if available
-                    facts = deal_note.get('dealNote', {}).get('facts', {})
-                    if facts:
-                        traction = facts.get('traction', {})
-                        if isinstance(traction, dict) and "revenue" in traction:
-                            revenue = traction["revenue"]
-                            if isinstance(revenue, dict):
-                                y1_rev = revenue.get("Y1", "N/A")
-                                y5_rev = revenue.get("Y5", "N/A")
-                                context += f"   Revenue: Y1: {y1_rev}, Y5: {y5_rev}\n"
-                    
-                    context += "\n"
-                except Exception as e:
-                    logger.error(f"Error processing deal note {idx}: {e}")
-                    continue
-        else:
-            context = "No startups found in our database."
+        session = _sessions.get(session_id, "screener")
+        
+        # Retrieve only the most relevant deal notes from the local index; follow-up
+        # turns skip the backend re-sync and carry the previous question's topic
+        index = get_note_index(sync=not session.turns)
+        previous = session.data.get("last_query")
+        query = f"{previous} {message}" if previous else message
+        # filters (sector, stage, score bounds) come from this message alone; a follow-up
+        # that names none keeps the previous question's, the earlier text only widens ranking
+        criteria = message if index.filters(message) or not previous else session.data.get("last_criteria", previous)
+        hits, stats = index.search(query, top_n=SCREENER_TOP_N, filter_query=criteria)
+        logger.info(f"Retrieved {len(hits)} of {stats['total']} deal notes "
+                    f"({stats['matched']} match filters {stats['filters']})")
+        context = format_screener_context(hits, stats)
         
         logger.info(f"Context for LLM (first 200 chars): {context[:200]}...")
         
@@ -365,12 +462,17 @@ def deal_screener():
         prompt = f"""You are a helpful VC analyst assistant. The investor is asking about startups: "{message}"
         
 Based on the context provided about our startups, provide a concise and relevant response.
+The context lists only the startups most relevant to the query, not the whole database.
 If the query mentions specific criteria (like sector, revenue range, etc.), filter the startups accordingly.
 If no startups match the criteria, clearly state that no matching startups were found.
 """
         logger.info(f"Calling LLM with prompt about: {message}")
-        response = call_gemini_llm(prompt, context)
+        response = call_gemini_llm(prompt, context, history=session.history())
         logger.info(f"LLM response (first 200 chars): {response[:200]}...")
+        session.set("last_query", message)
+        session.set("last_criteria", criteria)
+        session.add_turn(message, response)
+        _sessions.update(session)
         
         return jsonify({
             'reply': response,
@@ -391,11 +493,13 @@ def deep_dive():
         deal_note_id = data.get('dealNoteId')
         
         logger.info(f"Deep dive received message: {message}")
+        session = _sessions.get(session_id, "deep-dive")
+        if deal_note_id and session.data.get("deal_note_id") != deal_note_id:
+            session.reset()
+            _sessions.update(session)     # re-account the emptied session's size now
         
-        context = ""
-        
-        # If deal note ID is provided, try to get the deal note
-        if deal_note_id:
+        # If deal note ID is provided, fetch the deal note once per session
+        if deal_note_id and "deal_note" not in session.data:
             logger.info(f"Getting deal note with ID: {deal_note_id}")
             try:
                 url = f"{BACKEND_API_URL}/v1/startups/deal-notes/{deal_note_id}"
@@ -404,32 +508,56 @@ def deep_dive():
                     "x-debug-role": "investor"
                 }
                 
-                response = requests.get(url, headers=headers)
+                response = _backend.get(url, headers=headers)
                 logger.info(f"Deal note response status: {response.status_code}")
                 
                 if response.status_code == 200:
                     deal_note = response.json()
                     if deal_note and "dealNote" in deal_note:
-                        company_name = deal_note['dealNote'].get('company', 'Unknown Company')
-                        logger.info(f"Found deal note for company: {company_name}")
-                        context = f"Deal Note for {company_name}:\n"
-                        context += json.dumps(deal_note["dealNote"], indent=2)
+                        logger.info(f"Found deal note for company: {deal_note['dealNote'].get('company', 'Unknown Company')}")
+                        session.set("deal_note_id", deal_note_id)
+                        session.set("deal_note", deal_note["dealNote"])
                 else:
                     logger.error(f"Failed to get deal note: {response.status_code} - {response.text}")
             except Exception as e:
                 logger.error(f"Error fetching deal note {deal_note_id}: {e}")
+        elif deal_note_id:
+            logger.info(f"Reusing deal note {deal_note_id} from session {session_id}")
+        
+        context, cached = "", None
+        note = session.data.get("deal_note")
+        if note is not None:
+            company_name = note.get('company', 'Unknown Company')
+            # A large note goes into a Gemini context cache once per session, so each
+            # question sends only itself; otherwise only the sections relevant to it
+            static = f"Deal Note for {company_name}:\n" + json.dumps(note, separators=(",", ":"), default=str)
+            cached = gemini_session_cache(
+                session, static, "You are a helpful VC analyst assistant doing a deep dive on a startup. "
+                                 "Answer strictly from the deal note provided.")
+            if cached is None:
+                # the note's section vectors are computed once and reused by follow-up questions
+                index = get_note_index(sync=False)
+                note_id = session.data["deal_note_id"]
+                if str(note_id) not in index.notes:
+                    index.upsert(note_id, note)
+                context = f"Relevant sections of the Deal Note for {company_name}:\n\n"
+                context += index.note_context(note_id, message, k=DEEP_DIVE_SECTIONS_K,
+                                              max_chars=DEEP_DIVE_CONTEXT_CHARS)
         
         # If no context was set, provide a message
-        if not context:
+        if note is None:
             context = "No deal note found with the provided ID."
             
         logger.info(f"Context for LLM (first 200 chars): {context[:200]}...")
         
         # Call LLM with the deal note as context
-        prompt = f"You are a helpful VC analyst assistant doing a deep dive on a startup. Answer this investor query: {message}"
+        prompt = (f"You are a helpful VC analyst assistant doing a deep dive on a startup. Answer this investor query: {message}\n"
+                  f"If the deal note provided does not contain the answer, say that it does not cover it.")
         logger.info(f"Calling LLM with prompt: {prompt}")
-        response = call_gemini_llm(prompt, context)
+        response = call_gemini_llm(prompt, context, history=session.history(), cached_content=cached)
         logger.info(f"LLM response (first 200 chars): {response[:200]}...")
+        session.add_turn(message, response)
+        _sessions.update(session)
         
         return jsonify({
             'reply': response,
@@ -512,7 +640,8 @@ def health():
         'status': 'ok', 
         'service': 'gemini-agent-server',
         'model': GEMINI_MODEL_ID,
-        'api_key_configured': bool(GEMINI_API_KEY)
+        'api_key_configured': bool(GEMINI_API_KEY),
+        'sessions': _sessions.stats()
     })
 
 @app.route('/api/test-rag', methods=['GET'])
@@ -532,7 +661,7 @@ def test_rag():
         logger.info(f"Test RAG: Headers: {headers}")
         logger.info(f"Test RAG: Payload: {payload}")
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = _backend.post(url, headers=headers, json=payload)
         logger.info(f"Test RAG: RAG endpoint response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -0,0 +1,378 @@
+"""
+Local retrieval index over deal notes for the Gemini agent server.
+
+Every deal note is split into addressable sections ("brief", "facts.traction",
+"term_sheet", "risks[2]", ...) by the same rules as the pipeline's deep-dive
+retrieval (Startup-Analyst/tools/note_split.py). Each section is embedded once, when its note is
+first seen or its content changes (`sync` compares a content hash per note), so
+a screener query costs one query embedding and a matrix product instead of
+pasting the whole portfolio into the prompt:
+
+    index = NoteIndex.load()                 # precomputed vectors from NOTE_INDEX_PATH, if any
+    index.sync(get_all_deal_notes())         # embeds only new / changed notes, drops deleted ones
+    hits, stats = index.search("fintech with score above 70 and strong revenue", top_n=8)
+    index.upsert(note_id, note)              # one note, e.g. fetched for a deep dive
+    context = index.note_context(note_id, "What is the founder vesting period?")
+
+The same section vectors serve deep-dive questions on one note: `note_context`
+returns only the sections that answer the question instead of the whole note.
+
+Queries are also parsed for structured criteria (sector, stage, score bounds),
+which filter notes before ranking. A note's relevance is its best-matching
+section plus a keyword-overlap bonus, and a boost when the query names the
+company.
+
+Embeddings come from the Gemini embedding model (EMBED_MODEL_ID) when an API
+key is configured, and from hashed word features otherwise, so the server
+still ranks by keywords offline. A query whose embedding call fails is ranked
+by keyword overlap alone.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+
+# section rules are shared with the pipeline (Startup-Analyst/tools/note_split.py, stdlib only):
+# the image ships it under /app/Startup-Analyst, a checkout has it two levels up
+sys.path.append("/app/Startup-Analyst")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Startup-Analyst"))
+from tools.note_split import is_header, split_note  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+EMBED_MODEL_ID = os.environ.get("EMBED_MODEL_ID", "models/text-embedding-004")
+NOTE_INDEX_PATH = os.environ.get("NOTE_INDEX_PATH", "/tmp/note_index.npz")
+SECTION_MAX_CHARS = 1500      # text embedded per section (the full section is kept for prompts)
+HASH_DIM = 512                # dimension of the offline hashed-feature embedding
+EMBED_BATCH = 100
+
+_WORD = re.compile(r"[a-z0-9]+(?:[.%][a-z0-9]+)*")
+_STOP = {
+    "a", "an", "and", "are", "any", "as", "at", "be", "by", "do", "does", "for", "from", "give", "have", "how",
+    "i", "in", "is", "it", "list", "me", "of", "on", "or", "our", "show", "startups", "startup", "companies",
+    "company", "that", "the", "their", "them", "there", "these", "this", "to", "what", "which", "who", "with",
+    "we", "you", "all", "about", "tell", "find", "deals", "deal",
+}
+_STAGES = {
+    "pre_seed": ("pre-seed", "pre seed", "preseed"),
+    "seed": ("seed",),
+    "series_a": ("series a", "series-a"),
+    "series_b": ("series b", "series-b"),
+    "series_c": ("series c", "series-c"),
+}
+_NUM = r"(\d+(?:\.\d+)?)"
+_SCORE_MIN = re.compile(r"score\s*(?:of\s*|is\s*)?(?:above|over|greater than|more than|higher than|at least|>=?)\s*" + _NUM)
+_SCORE_MAX = re.compile(r"score\s*(?:of\s*|is\s*)?(?:below|under|less than|lower than|at most|<=?)\s*" + _NUM)
+
+
+def tokenize(text):
+    return _WORD.findall((text or "").lower())
+
+
+def note_sections(note):
+    """[(path, "path: text")] for a deal note, cut by the pipeline's shared split_note rules."""
+    return [(path, f"{path}: {text}") for path, text in split_note(note)]
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def note_fields(note):
+    """Structured columns used for filtering and for the prompt summary."""
+    facts = note.get("facts") if isinstance(note.get("facts"), dict) else {}
+    traction = facts.get("traction") if isinstance(facts.get("traction"), dict) else {}
+    revenue = traction.get("revenue") if isinstance(traction.get("revenue"), dict) else {}
+    score = note.get("score") if isinstance(note.get("score"), dict) else {}
+    brief = note.get("brief")
+    description = note.get("description") or (brief.get("brief_1_2_sentences") if isinstance(brief, dict) else brief)
+    stage = str(facts.get("stage") or note.get("stage") or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return {
+        "company": str(note.get("company") or "Unknown Company"),
+        "sector": str(note.get("sector") or facts.get("sector") or "").strip().lower(),
+        "stage": stage,
+        "score": _num(score.get("total")),
+        "description": str(description or ""),
+        "revenue_y1": revenue.get("Y1"),
+        "revenue_y5": revenue.get("Y5"),
+    }
+
+
+# --- embeddings --------------------------------------------------------------------------
+def _hash_embed(texts):
+    out = np.zeros((len(texts), HASH_DIM), dtype=np.float32)
+    for i, t in enumerate(texts):
+        for tok in tokenize(t):
+            h = int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=8).digest(), "little")
+            out[i, h % HASH_DIM] += 1.0 if (h >> 63) else -1.0
+    return out
+
+
+class Embedder:
+    """Gemini embeddings when configured, hashed word features otherwise."""
+
+    def __init__(self, use_gemini):
+        self.use_gemini = bool(use_gemini)
+        self.name = EMBED_MODEL_ID if self.use_gemini else f"hash{HASH_DIM}"
+
+    def embed(self, texts, task_type="retrieval_document"):
+        texts = [t[:SECTION_MAX_CHARS] for t in texts]
+        if self.use_gemini:
+            import google.generativeai as genai
+            vecs = []
+            for lo in range(0, len(texts), EMBED_BATCH):
+                res = genai.embed_content(model=EMBED_MODEL_ID, content=texts[lo:lo + EMBED_BATCH],
+                                          task_type=task_type)
+                vecs.extend(res["embedding"])
+            v = np.asarray(vecs, dtype=np.float32)
+        else:
+            v = _hash_embed(texts)
+        return v / np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+
+
+# --- the index ---------------------------------------------------------------------------
+class NoteIndex:
+    def __init__(self, embedder=None):
+        self.embedder = embedder or Embedder(os.environ.get("GEMINI_API_KEY"))
+        self.notes = {}           # id -> {"hash", "fields", "sections": [(path, text)], "vecs", "tokens", "note"}
+        self._cached = {}         # id -> (hash, paths, vecs) loaded from disk, claimed by the next sync
+        self._lock = threading.RLock()
+        self._stack = None        # (matrix of all section vectors, owner note position, note ids)
+
+    # persistence: vectors are the expensive part; note bodies come back with the next sync
+    def save(self, path=NOTE_INDEX_PATH):
+        with self._lock:
+            ids = list(self.notes)
+            if not ids:
+                return
+            meta = {"embedder": self.embedder.name,
+                    "notes": [{"id": i, "hash": self.notes[i]["hash"],
+                               "paths": [p for p, _ in self.notes[i]["sections"]]} for i in ids]}
+            vecs = np.concatenate([self.notes[i]["vecs"] for i in ids]).astype(np.float16)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(tmp, meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8), vecs=vecs)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save note index to {path}: {e}")
+
+    @classmethod
+    def load(cls, path=NOTE_INDEX_PATH, embedder=None):
+        index = cls(embedder)
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                vecs = data["vecs"].astype(np.float32)
+        except (OSError, ValueError, KeyError):
+            return index
+        if meta.get("embedder") != index.embedder.name:
+            logger.info(f"Note index at {path} was built with {meta.get('embedder')}; re-embedding")
+            return index
+        row = 0
+        for n in meta["notes"]:
+            index._cached[n["id"]] = (n["hash"], n["paths"], vecs[row:row + len(n["paths"])])
+            row += len(n["paths"])
+        logger.info(f"Loaded precomputed vectors for {len(index._cached)} deal notes from {path}")
+        return index
+
+    def sync(self, deal_notes):
+        """
+        Bring the index in line with the backend's deal notes ([{"id", "dealNote": {...}}]).
+        Only new or changed notes are embedded; returns the number embedded.
+        """
+        incoming = {}
+        for item in deal_notes or []:
+            note = item.get("dealNote") if isinstance(item.get("dealNote"), dict) else item
+            if not isinstance(note, dict):
+                continue
+            nid = str(item.get("id") or note.get("run_id") or note.get("company"))
+            incoming[nid] = note
+        todo = []
+        with self._lock:
+            for nid in [i for i in self.notes if i not in incoming]:
+                del self.notes[nid]
+                self._stack = None
+            for nid, note in incoming.items():
+                entry = self._stage(nid, note)
+                if entry is not None:
+                    todo.append((nid, entry))
+        self._cached = {}
+        return self._embed(todo)
+
+    def upsert(self, nid, note):
+        """Add or refresh one note (embedding it only if it is new or changed); returns its entry."""
+        with self._lock:
+            entry = self._stage(str(nid), note)
+        if entry is not None:
+            self._embed([(str(nid), entry)])
+        return self.notes[str(nid)]
+
+    def _stage(self, nid, note):
+        """Install an unchanged or disk-cached note directly; otherwise return a new entry to embed."""
+        h = hashlib.sha1(json.dumps(note, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        cur = self.notes.get(nid)
+        if cur is not None and cur["hash"] == h:
+            cur["note"] = note
+            return None
+        sections = note_sections(note) or [("company", f"company: {note.get('company', '')}")]
+        entry = {"hash": h, "fields": note_fields(note), "sections": sections, "note": note,
+                 "tokens": set(tokenize(" ".join(t for _, t in sections)))}
+        pre = self._cached.pop(nid, None)
+        if pre is not None and pre[0] == h and pre[1] == [p for p, _ in sections]:
+            entry["vecs"] = pre[2]
+            self.notes[nid] = entry
+            self._stack = None
+            return None
+        return entry
+
+    def _embed(self, todo):
+        texts = [t for _, entry in todo for _, t in entry["sections"]]
+        if not todo:
+            return 0
+        t0 = time.time()
+        vecs = self.embedder.embed(texts)
+        with self._lock:
+            row = 0
+            for nid, entry in todo:
+                entry["vecs"] = vecs[row:row + len(entry["sections"])]
+                row += len(entry["sections"])
+                self.notes[nid] = entry
+            self._stack = None
+        logger.info(f"Embedded {len(texts)} sections of {len(todo)} new or changed deal notes "
+                    f"in {time.time() - t0:.1f}s")
+        return len(todo)
+
+    def note_context(self, nid, question, k=8, max_chars=8000):
+        """
+        The sections of one indexed note that answer the question, as '## path' blocks
+        in note order. Header sections (company, sector, brief, score) always go in.
+        """
+        with self._lock:
+            entry = self.notes[str(nid)]
+            sections, vecs = entry["sections"], entry["vecs"]
+            if "section_tokens" not in entry:
+                entry["section_tokens"] = [set(tokenize(f"{p.replace('_', ' ')} {t}")) for p, t in sections]
+            section_tokens = entry["section_tokens"]
+        try:
+            sims = vecs @ self.embedder.embed([question], task_type="retrieval_query")[0]
+        except Exception as e:
+            logger.error(f"Question embedding failed, ranking sections by keywords only: {e}")
+            sims = np.zeros(len(sections), dtype=np.float32)
+        terms = {t for t in tokenize(question) if t not in _STOP}
+        if terms:
+            sims = sims + 0.5 * np.array([len(terms & toks) / len(terms) for toks in section_tokens],
+                                         dtype=np.float32)
+        header = [i for i, (p, _) in enumerate(sections) if is_header(p)]
+        ranked = [int(i) for i in np.argsort(-sims, kind="stable") if int(i) not in header][:k]
+        chosen, used = set(), 0
+        for i in header + ranked:
+            text = sections[i][1]
+            if used + len(text) > max_chars and chosen:
+                continue
+            chosen.add(i)
+            used += len(text)
+        return "\n\n".join(f"## {p}\n{t.split(': ', 1)[-1]}" for i, (p, t) in enumerate(sections) if i in chosen)
+
+    def _matrix(self):
+        if self._stack is None:
+            ids = list(self.notes)
+            if not ids:
+                return None
+            mat = np.concatenate([self.notes[i]["vecs"] for i in ids])
+            owner = np.repeat(np.arange(len(ids)), [len(self.notes[i]["vecs"]) for i in ids])
+            self._stack = (mat, owner, ids)
+        return self._stack
+
+    def filters(self, query):
+        """Structured criteria named in the query: sector, stage, min_score, max_score."""
+        q = (query or "").lower()
+        out = {}
+        with self._lock:
+            sectors = {e["fields"]["sector"] for e in self.notes.values() if e["fields"]["sector"]}
+        named = [s for s in sectors
+                 if any(re.search(rf"\b{re.escape(name)}\b", q) for name in {s, s.replace("_", " ")})]
+        if named:
+            out["sector"] = set(named)
+        stages = [s for s, words in _STAGES.items() if any(re.search(rf"\b{w}\b", q) for w in words)]
+        if "pre_seed" in stages and "seed" in stages and not re.search(r"(?<!pre[- ])\bseed\b", q):
+            stages.remove("seed")
+        if stages:
+            out["stage"] = set(stages)
+        m = _SCORE_MIN.search(q)
+        if m:
+            out["min_score"] = float(m.group(1))
+        m = _SCORE_MAX.search(q)
+        if m:
+            out["max_score"] = float(m.group(1))
+        return out
+
+    @staticmethod
+    def _passes(fields, f):
+        if "sector" in f and fields["sector"] not in f["sector"]:
+            return False
+        if "stage" in f and fields["stage"] not in f["stage"]:
+            return False
+        if "min_score" in f and (fields["score"] is None or fields["score"] < f["min_score"]):
+            return False
+        if "max_score" in f and (fields["score"] is None or fields["score"] > f["max_score"]):
+            return False
+        return True
+
+    def search(self, query, top_n=8, sections_per_note=2, filter_query=None):
+        """
+        Top-N notes for the query, best first: [{"id", "fields", "note", "relevance",
+        "sections": [(path, text), ...]}], plus {"total", "matched", "filters"}.
+        Criteria are parsed from `filter_query` when given (e.g. only the latest chat
+        message), and from `query` otherwise.
+        """
+        with self._lock:
+            stack = self._matrix()
+            f = self.filters(query if filter_query is None else filter_query)
+            stats = {"total": len(self.notes), "matched": 0, "filters": {k: sorted(v) if isinstance(v, set) else v
+                                                                          for k, v in f.items()}}
+            if stack is None:
+                return [], stats
+            mat, owner, ids = stack
+            keep = np.array([self._passes(self.notes[i]["fields"], f) for i in ids], dtype=bool)
+            stats["matched"] = int(keep.sum())
+            if not keep.any():
+                return [], stats
+            try:
+                qv = self.embedder.embed([query], task_type="retrieval_query")[0]
+                sims = mat @ qv
+            except Exception as e:
+                logger.error(f"Query embedding failed, ranking by keywords only: {e}")
+                sims = np.zeros(len(mat), dtype=np.float32)
+            best = np.full(len(ids), -1.0, dtype=np.float32)
+            np.maximum.at(best, owner, sims)
+            terms = {t for t in tokenize(query) if t not in _STOP}
+            q = (query or "").lower()
+            for pos, nid in enumerate(ids):
+                entry = self.notes[nid]
+                if terms:
+                    best[pos] += 0.3 * len(terms & entry["tokens"]) / len(terms)
+                name = entry["fields"]["company"].lower()
+                if len(name) > 2 and re.search(rf"(?<![a-z0-9]){re.escape(name)}(?![a-z0-9])", q):
+                    best[pos] += 1.0
+            best[~keep] = -np.inf
+            order = np.argsort(-best, kind="stable")[:min(top_n, int(keep.sum()))]
+            hits = []
+            for pos in order:
+                nid = ids[pos]
+                entry = self.notes[nid]
+                rows = np.flatnonzero(owner == pos)
+                top = rows[np.argsort(-sims[rows], kind="stable")[:sections_per_note]] - rows[0]
+                hits.append({"id": nid, "fields": entry["fields"], "note": entry["note"],
+                             "relevance": round(float(best[pos]), 4),
+                             "sections": [entry["sections"][i] for i in top]})
+            return hits, stats
+
@@ -0,0 +1,166 @@
+"""
+Per-session state for the chatbot endpoints.
+
+`/api/bots/screener` and `/api/bots/deep-dive` receive a sessionId with every
+message. A Session keeps what the first turn had to fetch or build (the deal
+note, the last retrieval, a Gemini cached-content handle for the static part of
+the prompt) plus the conversation turns, so follow-up turns skip the backend
+fetch and most of the prompt preparation:
+
+    sessions = SessionCache()
+    s = sessions.get(session_id, "deep-dive")      # new or existing; None id -> throwaway session
+    note = s.data.get("deal_note")
+    s.set("deal_note", fetched_note)              # sized once, when stored
+    s.add_turn(message, reply)
+    sessions.update(s)                             # re-account its size, evict if over the caps
+
+Sessions expire SESSION_TTL_S after their last use. The least recently used ones
+are evicted when there are more than SESSION_MAX of them or their estimated
+size passes SESSION_MAX_BYTES. Eviction also deletes the session's Gemini cache.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_S = float(os.environ.get("SESSION_TTL_S", "1800"))
+SESSION_MAX = int(os.environ.get("SESSION_MAX", "500"))
+SESSION_MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_MAX_TURNS = int(os.environ.get("SESSION_MAX_TURNS", "10"))     # turns kept (and replayed) per session
+SESSION_HISTORY_CHARS = int(os.environ.get("SESSION_HISTORY_CHARS", "4000"))
+
+
+def _size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class Session:
+    def __init__(self, session_id, kind):
+        self.id, self.kind = session_id, kind
+        self.created = self.touched = time.time()
+        self.turns = []               # [(user message, reply)], newest last
+        self.data = {}                # endpoint-specific: deal note, last retrieval, ... (write via set())
+        self._data_bytes = {}
+        self.gemini_cache = None      # google.generativeai CachedContent for the static prompt
+        self.gemini_cache_failed = False
+        self.nbytes = 0
+
+    def set(self, key, value):
+        self.data[key] = value
+        self._data_bytes[key] = _size(value)
+
+    def add_turn(self, message, reply):
+        self.turns.append((message or "", reply or ""))
+        del self.turns[:-SESSION_MAX_TURNS]
+
+    def history(self, max_chars=SESSION_HISTORY_CHARS):
+        """The latest turns as 'Investor: / Assistant:' lines, newest kept when trimming."""
+        lines, used = [], 0
+        for message, reply in reversed(self.turns):
+            block = f"Investor: {message}\nAssistant: {reply}"
+            if used + len(block) > max_chars:
+                if not lines:
+                    lines.append(block[-max_chars:])
+                break
+            lines.append(block)
+            used += len(block)
+        return "\n\n".join(reversed(lines))
+
+    def reset(self):
+        """Drop turns, fetched data and the Gemini cache (e.g. the session moved to another deal note)."""
+        self.close()
+        self.turns.clear()
+        self.data.clear()
+        self._data_bytes.clear()
+        self.gemini_cache_failed = False
+
+    def close(self):
+        if self.gemini_cache is not None:
+            try:
+                self.gemini_cache.delete()
+            except Exception as e:
+                logger.info(f"Could not delete Gemini cache for session {self.id}: {e}")
+            self.gemini_cache = None
+
+    def size(self):
+        return sum(len(m) + len(r) for m, r in self.turns) + sum(self._data_bytes.values())
+
+
+class SessionCache:
+    def __init__(self, ttl_s=SESSION_TTL_S, max_sessions=SESSION_MAX, max_bytes=SESSION_MAX_BYTES):
+        self.ttl_s, self.max_sessions, self.max_bytes = ttl_s, max_sessions, max_bytes
+        self._sessions = OrderedDict()     # (kind, id) -> Session, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, session_id, kind):
+        """The live session for (kind, session_id), or a new one; without an id, a throwaway session."""
+        if not session_id:
+            return Session(None, kind)
+        key = (kind, str(session_id))
+        now = time.time()
+        expired = []
+        with self._lock:
+            s = self._sessions.get(key)
+            if s is not None and now - s.touched > self.ttl_s:
+                expired.append(self._pop(key))
+                s = None
+            if s is None:
+                self.misses += 1
+                s = self._sessions[key] = Session(str(session_id), kind)
+            else:
+                self.hits += 1
+                self._sessions.move_to_end(key)
+            s.touched = now
+            # expired sessions sit at the LRU end
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if now - oldest.touched <= self.ttl_s:
+                    break
+                expired.append(self._pop((oldest.kind, oldest.id)))
+        for old in expired:
+            old.close()
+        return s
+
+    def update(self, session):
+        """Re-account a session's size after a turn and evict LRU sessions over the caps."""
+        if session.id is None:
+            session.close()
+            return
+        evicted = []
+        with self._lock:
+            key = (session.kind, session.id)
+            if self._sessions.get(key) is not session:
+                return
+            new = session.size()
+            self._bytes += new - session.nbytes
+            session.nbytes = new
+            while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions
+                                               or self._bytes > self.max_bytes):
+                oldest = next(iter(self._sessions))
+                if oldest == key:
+                    break
+                evicted.append(self._pop(oldest))
+                self.evictions += 1
+        for old in evicted:
+            old.close()
+
+    def _pop(self, key):
+        s = self._sessions.pop(key)
+        self._bytes -= s.nbytes
+        return s
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._sessions), "bytes": self._bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Long-lived Startup-Analyst worker.
+
+Spawning backend_startup_analyst_integration.py per deal pays the full cold start
+every time (langchain/FAISS, Document AI, Vertex and Gemini imports, client setup,
+embedding model load). This worker pays it once, keeps the clients warm, and runs
+deals from a local job queue on a small thread pool:
+
+    POST /jobs          {"startupId", "companyName", "companyWebsite",
+                         "pitchDeckId"?, "questionnaireId"?, "sector"?,
+                         "inputs"?: [paths or URLs], "options"?: {"upload": true}}
+                        -> 202 {"jobId", "status"}
+    GET  /jobs/<jobId>  -> {"status": queued|running|done|failed, "progress", "result", ...}
+    GET  /health        -> {"ok", "warm", "queued", "running", "concurrency"}
+    POST /scenarios     {"runId"? | "baseline"?: {...}, "ranges": {param: [..] | {"min","max","steps"}},
+                         "metrics"?: [...]}
+                        -> {"axes", "shape", "summary", <metric grids>}   (tools/scenarios.py)
+    POST /feedback      {"runId", "thumbsUp", "reason"?}
+                        -> {"weights", "counts"}   (learned scoring weights, tools/feedback.py)
+    POST /corpus/search {"query", "k"?, "company"?}
+                        -> {"hits": [{"score", "company", "runId", "source", "page", "text"}]}
+                        (every deck chunk ingested so far, tools/corpus_index.py;
+                         503 while the index or the embedding backend is unavailable)
+
+Usage:
+    python3 analyst_worker.py [--host 127.0.0.1] [--port 8765] [--concurrency 3]
+
+Point the backend (or the integration script) at it with ANALYST_WORKER_URL.
+"""
+
+import sys
+import os
+import json
+import time
+import uuid
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add Startup-Analyst to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'Startup-Analyst'))
+
+from config import WORKER_HOST, WORKER_PORT, WORKER_CONCURRENCY, WORKER_QUEUE_MAX, WORKER_JOB_HISTORY
+import backend_startup_analyst_integration as integration
+
+REQUIRED_FIELDS = ("startupId", "companyName", "companyWebsite")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, payload):
+        self.id = uuid.uuid4().hex[:12]
+        self.payload = payload
+        self.status = "queued"
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = {"stage": None, "done": 0, "total": None}
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "startupId": self.payload.get("startupId"),
+            "companyName": self.payload.get("companyName"),
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsedSeconds": round((self.finished or time.time()) - (self.started or self.created), 1),
+        }
+
+
+class JobQueue:
+    """Bounded in-process job queue drained by a thread pool."""
+
+    def __init__(self, concurrency=WORKER_CONCURRENCY, max_queued=WORKER_QUEUE_MAX, history=WORKER_JOB_HISTORY):
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="deal")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, payload):
+        job = Job(payload)
+        with self._lock:
+            if self._count("queued") >= self.max_queued:
+                raise QueueFull()
+            self._jobs[job.id] = job
+            self._trim()
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def stats(self):
+        with self._lock:
+            return {"queued": self._count("queued"), "running": self._count("running"),
+                    "concurrency": self.concurrency}
+
+    def _count(self, status):
+        return sum(1 for j in self._jobs.values() if j.status == status)
+
+    def _trim(self):
+        # drop the oldest finished jobs beyond the history limit
+        finished = [k for k, j in self._jobs.items() if j.status in ("done", "failed")]
+        for k in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[k]
+
+    def _set_progress(self, job, stage, done, total):
+        with self._lock:
+            job.progress = {"stage": stage, "done": done, "total": total}
+
+    def _run(self, job):
+        p = job.payload
+        with self._lock:
+            job.status, job.started = "running", time.time()
+        self._set_progress(job, "fetch_inputs", 0, None)
+        try:
+            result = integration.process_deal(
+                p["startupId"], p["companyName"], p["companyWebsite"],
+                pitch_deck_id=p.get("pitchDeckId") or None,
+                questionnaire_id=p.get("questionnaireId") or None,
+                sector=p.get("sector") or "technology",
+                extra_inputs=p.get("inputs") or [],
+                upload=(p.get("options") or {}).get("upload", True),
+                progress=lambda stage, done, total: self._set_progress(job, stage, done, total),
+            )
+            error = result.get("error")
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        with self._lock:
+            job.result, job.error = result, error
+            job.status = "done" if result and result.get("ok") else "failed"
+            job.finished = time.time()
+
+
+def run_scenarios(payload):
+    """Sensitivity grid for a stored deal note (runId) and/or an explicit baseline."""
+    from tools.note_store import NoteStore
+    from tools import scenarios
+
+    base = scenarios.Baseline()
+    if payload.get("runId"):
+        note = NoteStore().get(str(payload["runId"]))
+        if note is None:
+            raise LookupError(payload["runId"])
+        base = scenarios.Baseline.from_note(note)
+    overrides = payload.get("baseline") or {}
+    if not isinstance(overrides, dict):
+        raise scenarios.ScenarioError(f"baseline must be an object of numbers, got {overrides!r}")
+    base = scenarios.Baseline.from_dict({**vars(base), **overrides})
+    metrics = payload.get("metrics") or scenarios.METRICS
+    if not isinstance(metrics, (list, tuple)):
+        raise scenarios.ScenarioError(f"metrics must be a list, got {metrics!r}")
+    bad = [m for m in metrics if m not in scenarios.METRICS]
+    if bad:
+        raise scenarios.ScenarioError(f"unknown metrics: {bad}; expected any of {list(scenarios.METRICS)}")
+    return scenarios.to_json(scenarios.run_grid(base, payload.get("ranges") or {}), metrics)
+
+
+def record_feedback(payload):
+    """Thumbs up/down on a stored deal note; its score breakdown moves the weights."""
+    from tools.note_store import NoteStore
+    from tools.feedback import get_feedback_store
+
+    run_id = str(payload["runId"])
+    note = NoteStore().get(run_id)
+    if note is None:
+        raise LookupError(run_id)
+    score = note.get("score") if isinstance(note.get("score"), dict) else {}
+    return get_feedback_store().record(bool(payload["thumbsUp"]), str(payload.get("reason") or ""),
+                                       run_id=run_id, breakdown=score.get("breakdown"))
+
+
+def search_corpus(payload):
+    """Nearest deck chunks across every ingested deal."""
+    from tools.corpus_index import get_corpus_index
+
+    k = max(1, min(int(payload.get("k") or 10), 100))
+    hits = get_corpus_index().search_text(str(payload["query"]), k=k, company=payload.get("company") or None)
+    return {"hits": [{"score": h["score"], "company": h.get("company"), "runId": h.get("run_id"),
+                      "chunkId": h.get("chunk_id"), "source": h.get("source"), "page": h.get("page"),
+                      "text": h.get("text")} for h in hits]}
+
+
+def warm_up():
+    """Import the pipeline and build the shared clients once; returns per-component status."""
+    status = {}
+    steps = [
+        ("orchestrator", lambda: __import__("orchestration.orchestrator")),
+        # SDKs the pipeline only imports on first use (tools/lazy.py)
+        ("langchain_faiss", lambda: (__import__("langchain_community.vectorstores", fromlist=["FAISS"]).FAISS,
+                                     __import__("langchain.text_splitter"), __import__("langchain.schema"))),
+        ("pdf", lambda: __import__("fitz")),
+        ("gemini", lambda: __import__("tools.llm_router", fromlist=["_client_once"])._client_once()),
+        ("docai", lambda: __import__("tools.docai_ocr", fromlist=["_client_once"])._client_once()),
+        ("embeddings", lambda: __import__("tools.vectorstore", fromlist=["_get_embeddings"])._get_embeddings()),
+        ("vertex_model", lambda: __import__("tools.vertex_embed", fromlist=["_model_once"])._model_once()),
+        ("sector_kb", lambda: __import__("tools.sector_store", fromlist=["get_store"]).get_store().preload()),
+        ("corpus_index", lambda: __import__("tools.corpus_index", fromlist=["get_corpus_index"])
+                                 .get_corpus_index().load()),
+    ]
+    for name, fn in steps:
+        t0 = time.time()
+        try:
+            fn()
+            status[name] = f"ok ({time.time() - t0:.1f}s)"
+        except Exception as e:
+            status[name] = f"unavailable: {type(e).__name__}: {e}"
+        print(f"🔥 warm-up {name}: {status[name]}")
+    return status
+
+
+class WorkerHandler(BaseHTTPRequestHandler):
+    queue = None        # set by serve()
+    warm = {}
+
+    def _send(self, code, obj):
+        body = json.dumps(obj, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(200, {"ok": True, "warm": self.warm, **self.queue.stats()})
+        if self.path.startswith("/jobs/"):
+            job = self.queue.get(self.path[len("/jobs/"):].strip("/"))
+            return self._send(200, job) if job else self._send(404, {"error": "job_not_found"})
+        self._send(404, {"error": "not_found"})
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path not in ("/jobs", "/scenarios", "/feedback", "/corpus/search"):
+            return self._send(404, {"error": "not_found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            return self._send(400, {"error": "invalid_json"})
+        if path == "/scenarios":
+            return self._scenarios(payload)
+        if path == "/feedback":
+            return self._feedback(payload)
+        if path == "/corpus/search":
+            return self._corpus_search(payload)
+        if not isinstance(payload, dict) or not all(payload.get(k) for k in REQUIRED_FIELDS):
+            return self._send(400, {"error": "startupId_companyName_companyWebsite_required"})
+        try:
+            job = self.queue.submit(payload)
+        except QueueFull:
+            return self._send(503, {"error": "queue_full"})
+        self._send(202, {"jobId": job.id, "status": job.status})
+
+    def _scenarios(self, payload):
+        # computed inline: a grid takes milliseconds and never touches the LLM
+        from tools.scenarios import ScenarioError
+        if not isinstance(payload, dict):
+            return self._send(400, {"error": "invalid_json"})
+        try:
+            return self._send(200, run_scenarios(payload))
+        except LookupError:
+            return self._send(404, {"error": "deal_note_not_found"})
+        except ScenarioError as e:
+            return self._send(400, {"error": "invalid_scenario", "message": str(e)})
+        except Exception as e:
+            print(f"❌ scenarios failed: {type(e).__name__}: {e}")
+            return self._send(500, {"error": "internal_error", "message": f"{type(e).__name__}: {e}"})
+
+    def _feedback(self, payload):
+        if not isinstance(payload, dict) or not payload.get("runId") or "thumbsUp" not in payload:
+            return self._send(400, {"error": "runId_thumbsUp_required"})
+        if not isinstance(payload["thumbsUp"], bool):
+            # "false" or 0 must not count as a thumbs up and move the weights the wrong way
+            return self._send(400, {"error": "invalid_thumbsUp", "message": "thumbsUp must be true or false"})
+        try:
+            return self._send(200, record_feedback(payload))
+        except LookupError:
+            return self._send(404, {"error": "deal_note_not_found"})
+        except Exception as e:
+            print(f"❌ feedback failed: {type(e).__name__}: {e}")
+            return self._send(500, {"error": "internal_error", "message": f"{type(e).__name__}: {e}"})
+
+    def _corpus_search(self, payload):
+        if not isinstance(payload, dict) or not str(payload.get("query") or "").strip():
+            return self._send(400, {"error": "query_required"})
+        try:
+            int(payload.get("k") or 10)
+        except (TypeError, ValueError):
+            return self._send(400, {"error": "invalid_k", "message": "k must be an integer"})
+        try:
+            return self._send(200, search_corpus(payload))
+        except Exception as e:
+            # no index on disk yet, or the embedding backend is down
+            print(f"❌ corpus search failed: {type(e).__name__}: {e}")
+            return self._send(503, {"error": "corpus_unavailable", "message": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, fmt, *args):
+        # job polling is chatty; only log submissions and errors
+        if self.command != "GET" or (args and not str(args[1]).startswith("2")):
+            super().log_message(fmt, *args)
+
+
+def serve(host=WORKER_HOST, port=WORKER_PORT, concurrency=WORKER_CONCURRENCY):
+    WorkerHandler.warm = warm_up()
+    WorkerHandler.queue = JobQueue(concurrency=concurrency)
+    server = ThreadingHTTPServer((host, port), WorkerHandler)
+    server.daemon_threads = True
+    print(f"🚀 Startup-Analyst worker listening on http://{host}:{port} (concurrency {concurrency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Long-lived Startup-Analyst worker")
+    ap.add_argument("--host", default=WORKER_HOST)
+    ap.add_argument("--port", type=int, default=WORKER_PORT)
+    ap.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY)
+    args = ap.parse_args()
+    serve(args.host, args.port, args.concurrency)
@@ -3,6 +3,8 @@ import { colUsers, colDealNotes, colPitchDecks, colQuestionnaires, colFounderAns
 import { Timestamp } from "@google-cloud/firestore";
 import { spawn } from "child_process";
 import path from "path";
+import axios from "axios";
+import { env } from "../config/env";
 
 export const startupAnalystRouter = Router();
 
@@ -33,6 +35,65 @@ startupAnalystRouter.post("/run", async (req: Request, res: Response) => {
     const startupData = startupDoc.data();
     console.log(`Found startup: ${startupData?.name}`);
 
+    // Hand the deal to the long-lived worker when one is configured (no per-deal cold start)
+    if (env.analystWorkerUrl) {
+      const submit = await axios.post(`${env.analystWorkerUrl}/jobs`, {
+        startupId,
+        companyName,
+        companyWebsite,
+        pitchDeckId: pitchDeckId || null,
+        questionnaireId: questionnaireId || null,
+        sector: sector || undefined
+      });
+      const jobId = submit.data.jobId;
+      console.log(`Submitted Startup-Analyst job ${jobId} to worker`);
+
+      let job: any = submit.data;
+      const deadline = Date.now() + env.analystWorkerTimeoutMs;
+      while (job.status !== "done" && job.status !== "failed") {
+        if (Date.now() >= deadline) {
+          // the job keeps running on the worker; the client can follow it on /jobs/:jobId
+          return res.status(504).json({
+            success: false,
+            error: "startup_analyst_timeout",
+            message: `Startup-Analyst job ${jobId} is still ${job.status}; poll /v1/startup-analyst/jobs/${jobId}`,
+            startupId,
+            companyName,
+            jobId
+          });
+        }
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        try {
+          job = (await axios.get(`${env.analystWorkerUrl}/jobs/${jobId}`)).data;
+        } catch (err: any) {
+          if (err?.response?.status !== 404) throw err;
+          // the worker restarted and its in-memory queue lost the job
+          job = { status: "failed", error: "job no longer known to the analyst worker (worker restarted?)" };
+        }
+      }
+
+      if (job.status === "done") {
+        return res.json({
+          success: true,
+          message: `Startup-Analyst completed successfully for ${companyName}`,
+          startupId,
+          companyName,
+          companyWebsite,
+          jobId,
+          result: job.result,
+          sector: sector || "vr"
+        });
+      }
+      return res.status(500).json({
+        success: false,
+        error: "startup_analyst_failed",
+        message: `Startup-Analyst job ${jobId} failed: ${job.error}`,
+        startupId,
+        companyName,
+        jobId
+      });
+    }
+
     // Prepare the command to run Startup-Analyst
     const scriptPath = path.join(__dirname, "../../../backend_startup_analyst_integration.py");
     const args = [
@@ -112,6 +173,58 @@ startupAnalystRouter.post("/run", async (req: Request, res: Response) => {
   }
 });
 
+// GET /v1/startup-analyst/jobs/:jobId - Progress of a deal running on the analyst worker
+startupAnalystRouter.get("/jobs/:jobId", async (req: Request, res: Response) => {
+  if (!env.analystWorkerUrl) {
+    return res.status(404).json({ error: "analyst_worker_not_configured" });
+  }
+  try {
+    const job = await axios.get(`${env.analystWorkerUrl}/jobs/${encodeURIComponent(req.params.jobId)}`);
+    res.json(job.data);
+  } catch (err: any) {
+    res.status(err?.response?.status || 500).json(err?.response?.data || { error: "internal_error", message: err?.message || String(err) });
+  }
+});
+
+// POST /v1/startup-analyst/scenarios - Sensitivity grid (raise, valuation, burn, growth, churn) from the analyst worker
+startupAnalystRouter.post("/scenarios", async (req: Request, res: Response) => {
+  if (!env.analystWorkerUrl) {
+    return res.status(404).json({ error: "analyst_worker_not_configured" });
+  }
+  try {
+    const grid = await axios.post(`${env.analystWorkerUrl}/scenarios`, req.body || {});
+    res.json(grid.data);
+  } catch (err: any) {
+    res.status(err?.response?.status || 500).json(err?.response?.data || { error: "internal_error", message: err?.message || String(err) });
+  }
+});
+
+// POST /v1/startup-analyst/feedback - Analyst thumbs up/down on a deal note; tunes the scoring weights
+startupAnalystRouter.post("/feedback", async (req: Request, res: Response) => {
+  if (!env.analystWorkerUrl) {
+    return res.status(404).json({ error: "analyst_worker_not_configured" });
+  }
+  try {
+    const out = await axios.post(`${env.analystWorkerUrl}/feedback`, req.body || {});
+    res.json(out.data);
+  } catch (err: any) {
+    res.status(err?.response?.status || 500).json(err?.response?.data || { error: "internal_error", message: err?.message || String(err) });
+  }
+});
+
+// POST /v1/startup-analyst/corpus/search - Nearest deck chunks across every analysed deal
+startupAnalystRouter.post("/corpus/search", async (req: Request, res: Response) => {
+  if (!env.analystWorkerUrl) {
+    return res.status(404).json({ error: "analyst_worker_not_configured" });
+  }
+  try {
+    const out = await axios.post(`${env.analystWorkerUrl}/corpus/search`, req.body || {});
+    res.json(out.data);
+  } catch (err: any) {
+    res.status(err?.response?.status || 500).json(err?.response?.data || { error: "internal_error", message: err?.message || String(err) });
+  }
+});
+
 // POST /v1/startup-analyst/trigger-after-call - Trigger after scheduled call completion
 startupAnalystRouter.post("/trigger-after-call", async (req: Request, res: Response) => {
   try {
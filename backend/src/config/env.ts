@@ -17,6 +17,12 @@ const gcsBucket = process.env.GCS_BUCKET || "startup-analyst-uploads";
 // Get the Pub/Sub topic for ingestion from environment variable or use a default
 const pubsubTopicIngestion = process.env.PUBSUB_TOPIC_INGESTION || "startup-analyst-ingestion";
 
+// Long-lived Startup-Analyst worker (analyst_worker.py); empty = spawn the integration script per deal
+const analystWorkerUrl = process.env.ANALYST_WORKER_URL || "";
+
+// How long /v1/startup-analyst/run waits on a worker job before answering 504 (the job keeps running)
+const analystWorkerTimeoutMs = Number(process.env.ANALYST_WORKER_TIMEOUT_MS || 15 * 60 * 1000);
+
 // Export the environment configuration
 export const env = {
   projectId,
@@ -24,4 +30,6 @@ export const env = {
   chatbotBaseUrl,
   gcsBucket,
   pubsubTopicIngestion,
+  analystWorkerUrl,
+  analystWorkerTimeoutMs,
 };
@@ -7,32 +7,71 @@ This script integrates the Startup-Analyst with the backend by:
 2. Fetching questionnaire answers from Firestore
 3. Running Startup-Analyst with all data
 4. Uploading the generated deal note back to the backend
+
+When ANALYST_WORKER_URL is set (e.g. http://127.0.0.1:8765), the deal is handed
+to a running analyst_worker.py instead, which keeps the pipeline imported and
+its clients warm between deals.
 """
 
 import sys
 import os
 import json
+import time
+import mmap
+import threading
 import requests
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Add Startup-Analyst to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'Startup-Analyst'))
 
-try:
-    from orchestration.orchestrator import Orchestrator
-    print("✅ Successfully imported Startup-Analyst Orchestrator")
-except ImportError as e:
-    print(f"❌ Failed to import Startup-Analyst: {e}")
-    sys.exit(1)
-
 # Backend API configuration
 BACKEND_API_URL = os.environ.get("BACKEND_API_URL", "https://analyst-backend-549120538825.us-central1.run.app")
+ANALYST_WORKER_URL = os.environ.get("ANALYST_WORKER_URL", "")
+
+# (connect, read) seconds for every backend / GCS request
+HTTP_TIMEOUT = (float(os.environ.get("BACKEND_CONNECT_TIMEOUT", "5")),
+                float(os.environ.get("BACKEND_READ_TIMEOUT", "60")))
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Shared keep-alive session: pooled connections, retries on transient GET failures."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504),
+                              allowed_methods=frozenset({"GET"}))
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def load_orchestrator():
+    """Import the Startup-Analyst Orchestrator (the slow part of a cold start)."""
+    try:
+        from orchestration.orchestrator import Orchestrator
+        print("✅ Successfully imported Startup-Analyst Orchestrator")
+        return Orchestrator
+    except ImportError as e:
+        print(f"❌ Failed to import Startup-Analyst: {e}")
+        return None
 
 def get_pitch_deck_download_url(pitch_deck_id):
     """Get signed download URL for pitch deck from backend."""
     try:
-        response = requests.get(f"{BACKEND_API_URL}/v1/files/pitch-deck/{pitch_deck_id}/download-url")
+        response = get_session().get(f"{BACKEND_API_URL}/v1/files/pitch-deck/{pitch_deck_id}/download-url",
+                                     timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             return data.get('downloadUrl')
@@ -44,17 +83,22 @@ def get_pitch_deck_download_url(pitch_deck_id):
         return None
 
 def download_pitch_deck(download_url, temp_dir):
-    """Download pitch deck PDF to temporary directory."""
+    """Stream the pitch deck PDF to the temporary directory in chunks."""
     try:
         print(f"📥 Downloading pitch deck from: {download_url[:100]}...")
-        response = requests.get(download_url)
-        response.raise_for_status()
-        
         pdf_path = os.path.join(temp_dir, "pitch_deck.pdf")
-        with open(pdf_path, 'wb') as f:
-            f.write(response.content)
+        size = 0
+        with get_session().get(download_url, stream=True, timeout=HTTP_TIMEOUT) as response:
+            response.raise_for_status()
+            with open(pdf_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+                    size += len(chunk)
         
-        print(f"✅ Downloaded pitch deck: {pdf_path}")
+        if not size:
+            print("❌ Downloaded pitch deck is empty")
+            return None
+        print(f"✅ Downloaded pitch deck: {pdf_path} ({size} bytes)")
         return pdf_path
     except Exception as e:
         print(f"❌ Error downloading pitch deck: {e}")
@@ -64,7 +108,8 @@ def get_questionnaire_answers(questionnaire_id):
     """Fetch questionnaire answers from backend."""
     try:
         print(f"📋 Fetching questionnaire answers for ID: {questionnaire_id}")
-        response = requests.get(f"{BACKEND_API_URL}/v1/startups/questionnaire/{questionnaire_id}")
+        response = get_session().get(f"{BACKEND_API_URL}/v1/startups/questionnaire/{questionnaire_id}",
+                                     timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             answers = data.get('answers', [])
@@ -102,8 +147,9 @@ def create_questionnaire_text_file(answers, temp_dir):
         print(f"❌ Error creating questionnaire answers file: {e}")
         return None
 
-def run_startup_analyst(company_name, company_website, pitch_deck_path, questionnaire_path, temp_dir):
-    """Run Startup-Analyst with all provided data."""
+def run_startup_analyst(company_name, company_website, pitch_deck_path, questionnaire_path, temp_dir,
+                        sector="technology", extra_inputs=None, progress=None, pitch_deck_buffer=None):
+    """Run Startup-Analyst with all provided data (the deck as an in-memory buffer when given)."""
     try:
         print(f"🚀 Running Startup-Analyst for: {company_name}")
         print(f"🌐 Company Website: {company_website}")
@@ -114,7 +160,10 @@ def run_startup_analyst(company_name, company_website, pitch_deck_path, question
         inputs = []
         
         # Add pitch deck if available
-        if pitch_deck_path and os.path.exists(pitch_deck_path):
+        if pitch_deck_buffer is not None:
+            inputs.append((pitch_deck_path or "pitch_deck.pdf", pitch_deck_buffer))
+            print(f"✅ Added pitch deck to inputs (mapped, {len(pitch_deck_buffer)} bytes): {pitch_deck_path}")
+        elif pitch_deck_path and os.path.exists(pitch_deck_path):
             inputs.append(pitch_deck_path)
             print(f"✅ Added pitch deck to inputs: {pitch_deck_path}")
         
@@ -128,16 +177,25 @@ def run_startup_analyst(company_name, company_website, pitch_deck_path, question
             inputs.append(company_website)
             print(f"✅ Added company website to inputs: {company_website}")
         
+        # Any extra paths/URLs supplied with a worker job
+        for extra in extra_inputs or []:
+            inputs.append(extra)
+            print(f"✅ Added extra input: {extra}")
+        
         if not inputs:
             print("❌ No inputs available for Startup-Analyst")
             return None
         
-        # Initialize orchestrator
-        orchestrator = Orchestrator(sector="technology")  # Default sector
+        Orchestrator = load_orchestrator()
+        if Orchestrator is None:
+            return None
+        
+        # Initialize orchestrator (one per deal; imports and clients are shared)
+        orchestrator = Orchestrator(sector=sector or "technology")
         
         # Run Startup-Analyst
         print("🔄 Starting Startup-Analyst analysis...")
-        output_path, deal_note = orchestrator.run(company_name, inputs)
+        output_path, deal_note = orchestrator.run(company_name, inputs, progress=progress)
         
         print(f"✅ Startup-Analyst completed successfully!")
         print(f"📊 Score: {deal_note.get('score', {}).get('total', 'N/A')}")
@@ -161,10 +219,11 @@ def upload_deal_note_to_backend(startup_id, deal_note):
         }
         
         # Upload to backend
-        response = requests.post(
+        response = get_session().post(
             f"{BACKEND_API_URL}/v1/startups/upload-real-deal-note",
             json=deal_note_data,
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            timeout=HTTP_TIMEOUT
         )
         
         if response.status_code == 200:
@@ -181,6 +240,92 @@ def upload_deal_note_to_backend(startup_id, deal_note):
         print(f"❌ Error uploading deal note: {e}")
         return None
 
+def prefetch_inputs(pitch_deck_id, questionnaire_id, temp_dir):
+    """
+    Fetch the deck (signed URL, then streamed download) and the questionnaire
+    answers concurrently. Returns (pitch_deck_path, questionnaire_path).
+    """
+    def fetch_deck():
+        if not pitch_deck_id:
+            return None
+        download_url = get_pitch_deck_download_url(pitch_deck_id)
+        return download_pitch_deck(download_url, temp_dir) if download_url else None
+
+    def fetch_questionnaire():
+        if not questionnaire_id:
+            return None
+        answers = get_questionnaire_answers(questionnaire_id)
+        return create_questionnaire_text_file(answers, temp_dir) if answers else None
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch") as pool:
+        deck = pool.submit(fetch_deck)
+        questionnaire = pool.submit(fetch_questionnaire)
+        return deck.result(), questionnaire.result()
+
+def map_pdf(path, stack):
+    """Read-only mmap view of a downloaded PDF (released by `stack`), so the loader doesn't re-read the file."""
+    f = stack.enter_context(open(path, 'rb'))
+    mm = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    view = memoryview(mm)
+    stack.callback(view.release)
+    return view
+
+def process_deal(startup_id, company_name, company_website, pitch_deck_id=None, questionnaire_id=None,
+                 sector="technology", extra_inputs=None, upload=True, progress=None):
+    """
+    Download inputs, run Startup-Analyst and upload the note for one deal.
+    Returns {"ok", "dealNoteId", "score", "error"}; used by main() and analyst_worker.py.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir, ExitStack() as mapped:
+        print(f"📁 Using temporary directory: {temp_dir}")
+        
+        # Download pitch deck and fetch questionnaire answers in parallel
+        pitch_deck_path, questionnaire_path = prefetch_inputs(pitch_deck_id, questionnaire_id, temp_dir)
+        pitch_deck_buffer = map_pdf(pitch_deck_path, mapped) if pitch_deck_path else None
+        
+        # Run Startup-Analyst
+        deal_note = run_startup_analyst(
+            company_name, 
+            company_website, 
+            pitch_deck_path, 
+            questionnaire_path, 
+            temp_dir,
+            sector=sector,
+            extra_inputs=extra_inputs,
+            progress=progress,
+            pitch_deck_buffer=pitch_deck_buffer,
+        )
+        
+        if not deal_note:
+            return {"ok": False, "dealNoteId": None, "score": None, "error": "startup_analyst_failed"}
+        
+        score = deal_note.get('score', {}).get('total')
+        if not upload:
+            return {"ok": True, "dealNoteId": None, "score": score, "error": None}
+        
+        # Upload deal note to backend
+        deal_note_id = upload_deal_note_to_backend(startup_id, deal_note)
+        if not deal_note_id:
+            return {"ok": False, "dealNoteId": None, "score": score, "error": "upload_failed"}
+        return {"ok": True, "dealNoteId": deal_note_id, "score": score, "error": None}
+
+def run_via_worker(worker_url, job, poll_seconds=2.0):
+    """Submit a job to a running analyst_worker.py and wait for it; returns the job record."""
+    response = get_session().post(f"{worker_url.rstrip('/')}/jobs", json=job, timeout=10)
+    response.raise_for_status()
+    job_id = response.json()["jobId"]
+    print(f"📨 Submitted to analyst worker as job {job_id}")
+    last = None
+    while True:
+        time.sleep(poll_seconds)
+        status = get_session().get(f"{worker_url.rstrip('/')}/jobs/{job_id}", timeout=10).json()
+        progress = status.get("progress") or {}
+        if progress.get("stage") and progress.get("stage") != last:
+            last = progress["stage"]
+            print(f"⏳ {progress.get('done')}/{progress.get('total')} {last}")
+        if status.get("status") in ("done", "failed"):
+            return status
+
 def main():
     """Main integration function."""
     if len(sys.argv) < 4:
@@ -199,49 +344,28 @@ def main():
     print(f"📄 Pitch Deck ID: {pitch_deck_id}")
     print(f"📋 Questionnaire ID: {questionnaire_id}")
     
-    # Create temporary directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        print(f"📁 Using temporary directory: {temp_dir}")
-        
-        pitch_deck_path = None
-        questionnaire_path = None
-        
-        # Download pitch deck if available
-        if pitch_deck_id:
-            download_url = get_pitch_deck_download_url(pitch_deck_id)
-            if download_url:
-                pitch_deck_path = download_pitch_deck(download_url, temp_dir)
-        
-        # Get questionnaire answers if available
-        if questionnaire_id:
-            answers = get_questionnaire_answers(questionnaire_id)
-            if answers:
-                questionnaire_path = create_questionnaire_text_file(answers, temp_dir)
-        
-        # Run Startup-Analyst
-        deal_note = run_startup_analyst(
-            company_name, 
-            company_website, 
-            pitch_deck_path, 
-            questionnaire_path, 
-            temp_dir
-        )
-        
-        if deal_note:
-            # Upload deal note to backend
-            deal_note_id = upload_deal_note_to_backend(startup_id, deal_note)
-            
-            if deal_note_id:
-                print(f"🎉 Integration completed successfully!")
-                print(f"📋 Deal Note ID: {deal_note_id}")
-                print(f"📊 Final Score: {deal_note.get('score', {}).get('total', 'N/A')}")
-                return 0
-            else:
-                print("❌ Failed to upload deal note to backend")
-                return 1
-        else:
-            print("❌ Startup-Analyst failed to generate deal note")
-            return 1
+    if ANALYST_WORKER_URL:
+        status = run_via_worker(ANALYST_WORKER_URL, {
+            "startupId": startup_id,
+            "companyName": company_name,
+            "companyWebsite": company_website,
+            "pitchDeckId": pitch_deck_id,
+            "questionnaireId": questionnaire_id,
+        })
+        result = status.get("result") or {"ok": False, "error": status.get("error")}
+    else:
+        result = process_deal(startup_id, company_name, company_website, pitch_deck_id, questionnaire_id)
+    
+    if result.get("ok"):
+        print(f"🎉 Integration completed successfully!")
+        print(f"📋 Deal Note ID: {result.get('dealNoteId')}")
+        print(f"📊 Final Score: {result.get('score', 'N/A')}")
+        return 0
+    if result.get("error") == "upload_failed":
+        print("❌ Failed to upload deal note to backend")
+    else:
+        print(f"❌ Startup-Analyst failed to generate deal note ({result.get('error')})")
+    return 1
 
 if __name__ == "__main__":
     exit_code = main()
@@ -15,9 +15,12 @@ echo "Building and deploying container to Cloud Run service [${SERVICE_NAME}] in
 # Create a temporary directory for deployment
 mkdir -p tmp_deploy
 cp agents-python/minimal/gemini_agent.py tmp_deploy/gemini_agent.py
+cp agents-python/minimal/note_index.py tmp_deploy/note_index.py
+cp agents-python/minimal/session_cache.py tmp_deploy/session_cache.py
 cp agents-python/minimal/requirements.txt tmp_deploy/requirements.txt
 cp agents-python/minimal/Dockerfile tmp_deploy/Dockerfile
 cp Startup-Analyst/config.py tmp_deploy/config.py # Copy config.py
+cp Startup-Analyst/tools/note_split.py tmp_deploy/note_split.py # section rules shared with the pipeline
 
 # Build and deploy to Cloud Run
 gcloud run deploy "${SERVICE_NAME}" \